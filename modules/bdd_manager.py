@@ -0,0 +1,227 @@
+from collections.abc import Iterator
+
+# the terminal nodes
+FALSE: int = 0
+TRUE: int = 1
+# default number of entries of the computed table (a power of two)
+CACHE_SIZE: int = 1 << 16
+
+
+class bdd_manager:
+    def __init__(self, n_vars: int, order: list[int] | None = None, cache_size: int = CACHE_SIZE) -> None:
+        """
+        Create a manager of reduced ordered binary decision diagrams over the variables `0, ..., n_vars - 1`.
+        A BDD is identified by the id of its root node : as nodes are hash-consed (unique table),
+        two BDDs of the same function are the same node. `FALSE` and `TRUE` are the terminal nodes.
+
+        Parameters
+        ----------
+        n_vars : int
+            The number of variables.
+
+        order : list[int] | None
+            The variables from the root to the leaves. Default to `0, ..., n_vars - 1`.
+
+        cache_size : int
+            The number of entries of the computed table memoising `ite`, rounded up to a power of two.
+            A new result replaces the one stored in its entry. Default to `CACHE_SIZE`.
+
+        Return
+        ----------
+        A new `bdd_manager` holding only the terminal nodes.
+        """
+        order = list(range(n_vars)) if order is None else order
+        if sorted(order) != list(range(n_vars)):
+            raise ValueError(f"The order {order} isn't a permutation of the {n_vars} variables.")
+        self.n_vars: int = n_vars
+        self.order: list[int] = order
+        # the level of each variable, the terminals being below every variable
+        self.level_of: list[int] = [0] * n_vars
+        for k, v in enumerate(order):
+            self.level_of[v] = k
+        # the level, low child and high child of each node
+        self.levels: list[int] = [n_vars, n_vars]
+        self.lows: list[int] = [FALSE, TRUE]
+        self.highs: list[int] = [FALSE, TRUE]
+        self.unique: dict[tuple[int, int, int], int] = {}
+        size: int = 1
+        while size < cache_size:
+            size *= 2
+        self.cache_mask: int = size - 1
+        self.cache: list[tuple[int, int, int, int] | None] = [None] * size
+
+    def __len__(self) -> int:
+        """
+        Return
+        ----------
+        The number of nodes of this manager, terminals included.
+        """
+        return len(self.levels)
+
+    def node(self, level: int, low: int, high: int) -> int:
+        """
+        Return
+        ----------
+        The node testing the variable at `level`, with `low` as child when it is false and `high` when it is true :
+        `low` itself if both children are equal, the existing node if there's one (unique table).
+        """
+        if low == high:
+            return low
+        key: tuple[int, int, int] = (level, low, high)
+        res: int | None = self.unique.get(key)
+        if res is None:
+            res = len(self.levels)
+            self.levels.append(level)
+            self.lows.append(low)
+            self.highs.append(high)
+            self.unique[key] = res
+        return res
+
+    def var(self, v: int) -> int:
+        """
+        Return
+        ----------
+        The BDD of the variable `v`.
+        """
+        return self.node(self.level_of[v], FALSE, TRUE)
+
+    def ite(self, f: int, g: int, h: int) -> int:
+        """
+        If-then-else : the BDD of `(f & g) | (~f & h)`, from which every other operation is derived.
+        The results are memoised in the computed table.
+
+        Parameters
+        ----------
+        f, g, h : int
+            BDDs of this manager.
+
+        Return
+        ----------
+        The resulting BDD.
+        """
+        if f == TRUE:
+            return g
+        if f == FALSE:
+            return h
+        if g == h:
+            return g
+        if g == TRUE and h == FALSE:
+            return f
+        key: tuple[int, int, int] = (f, g, h)
+        slot: int = hash(key) & self.cache_mask
+        entry: tuple[int, int, int, int] | None = self.cache[slot]
+        if entry is not None and entry[0] == f and entry[1] == g and entry[2] == h:
+            return entry[3]
+
+        levels: list[int] = self.levels
+        top: int = min(levels[f], levels[g], levels[h])
+        f0, f1 = (self.lows[f], self.highs[f]) if levels[f] == top else (f, f)
+        g0, g1 = (self.lows[g], self.highs[g]) if levels[g] == top else (g, g)
+        h0, h1 = (self.lows[h], self.highs[h]) if levels[h] == top else (h, h)
+        res: int = self.node(top, self.ite(f0, g0, h0), self.ite(f1, g1, h1))
+        self.cache[slot] = (f, g, h, res)
+        return res
+
+    def neg(self, f: int) -> int:
+        """
+        Return
+        ----------
+        The BDD of `~f`.
+        """
+        return self.ite(f, FALSE, TRUE)
+
+    def conj(self, f: int, g: int) -> int:
+        """
+        Return
+        ----------
+        The BDD of `f & g`.
+        """
+        return self.ite(f, g, FALSE)
+
+    def disj(self, f: int, g: int) -> int:
+        """
+        Return
+        ----------
+        The BDD of `f | g`.
+        """
+        return self.ite(f, TRUE, g)
+
+    def xor(self, f: int, g: int) -> int:
+        """
+        Return
+        ----------
+        The BDD of `f ^ g`.
+        """
+        return self.ite(f, self.neg(g), g)
+
+    def evaluate(self, f: int, values: list[int]) -> int:
+        """
+        Return
+        ----------
+        The value (0 or 1) of `f` when each variable `v` is set to `values[v]`.
+        """
+        while f > TRUE:
+            f = self.highs[f] if values[self.order[self.levels[f]]] else self.lows[f]
+        return f
+
+    def size(self, f: int) -> int:
+        """
+        Return
+        ----------
+        The number of nodes of the BDD `f`, terminals included.
+        """
+        seen: set[int] = {f}
+        stack: list[int] = [f]
+        while stack != []:
+            u: int = stack.pop()
+            if u > TRUE:
+                for c in (self.lows[u], self.highs[u]):
+                    if c not in seen:
+                        seen.add(c)
+                        stack.append(c)
+        return len(seen)
+
+    def count(self, f: int) -> int:
+        """
+        Model counting.
+
+        Return
+        ----------
+        The number of assignments of the `n_vars` variables for which `f` is true.
+        """
+        levels: list[int] = self.levels
+        counts: dict[int, int] = {FALSE: 0, TRUE: 1}
+        # the nodes below another are counted first
+        stack: list[int] = [f]
+        while stack != []:
+            u: int = stack[-1]
+            if u in counts:
+                stack.pop()
+                continue
+            low, high = self.lows[u], self.highs[u]
+            if low in counts and high in counts:
+                stack.pop()
+                counts[u] = (counts[low] << (levels[low] - levels[u] - 1)) + \
+                    (counts[high] << (levels[high] - levels[u] - 1))
+            else:
+                stack += [c for c in (low, high) if c not in counts]
+        return counts[f] << levels[f]
+
+    def satisfying(self, f: int) -> Iterator[dict[int, int]]:
+        """
+        Enumerate the paths of `f` to `TRUE`, lazily. Each of them is a partial assignment (a cube) for which `f` is true,
+        whatever the value of the other variables ; together, they cover every model of `f` once.
+
+        Return
+        ----------
+        An iterator over the assignments, as `{variable : value (0 or 1)}`.
+        """
+        stack: list[tuple[int, dict[int, int]]] = [(f, {})]
+        while stack != []:
+            u, cube = stack.pop()
+            if u == TRUE:
+                yield cube
+            elif u != FALSE:
+                v: int = self.order[self.levels[u]]
+                stack.append((self.highs[u], {**cube, v: 1}))
+                stack.append((self.lows[u], {**cube, v: 0}))
@@ -0,0 +1,394 @@
+import mmap
+import struct
+from collections.abc import Mapping, Iterator
+
+from modules.node import node
+from modules.open_digraph_path_mx import open_digraph_path_mx
+
+# File layout (every integer is little-endian) :
+#   header  : magic, version, index width, number of nodes, then the offsets of the label, input/output and index sections
+#   labels  : varint count, then each label as a varint length followed by its utf-8 bytes
+#   io      : varint count then the (zigzag varint) input ids, same for the outputs
+#   index   : one (id, offset of its record) pair per node, sorted by id, 8-byte aligned,
+#             as (int32, int32) when every value fits, (int64, int64) otherwise (signed, as the reader casts them)
+#   records : per node, the varint label index, then its children and its parents,
+#             each as a varint count followed by (zigzag varint id delta, varint multiplicity) pairs,
+#             the id delta being the difference with the node's own id (neighbours usually have close ids)
+MAGIC: bytes = b"ODGB"
+VERSION: int = 1
+HEADER: struct.Struct = struct.Struct("<4sBB2xQQQQ")
+# index entry format for each width (in bytes)
+INDEX_ENTRIES: dict[int, struct.Struct] = {8: struct.Struct("<ii"), 16: struct.Struct("<qq")}
+
+
+def write_varint(out: bytearray, v: int) -> None:
+    """
+    Append the unsigned integer `v` to `out`, 7 bits per byte, the high bit flagging a following byte.
+
+    Parameters
+    ----------
+    out : bytearray
+        The buffer to write to.
+
+    v : int
+        A positive integer.
+    """
+    while v >= 0x80:
+        out.append((v & 0x7F) | 0x80)
+        v >>= 7
+    out.append(v)
+
+
+def write_zigzag(out: bytearray, v: int) -> None:
+    """
+    Append the signed integer `v` to `out` (`0, -1, 1, -2, ...` being written as `0, 1, 2, 3, ...`).
+
+    Parameters
+    ----------
+    out : bytearray
+        The buffer to write to.
+
+    v : int
+        An integer.
+    """
+    write_varint(out, v << 1 if v >= 0 else ((-v) << 1) - 1)
+
+
+def read_varint(buf, pos: int) -> tuple[int, int]:
+    """
+    Read an unsigned varint.
+
+    Parameters
+    ----------
+    buf : bytes | mmap
+        The buffer to read from.
+
+    pos : int
+        The position of the first byte.
+
+    Return
+    ----------
+    The value and the position following it.
+    """
+    b: int = buf[pos]
+    if b < 0x80:
+        return b, pos + 1
+    res: int = b & 0x7F
+    shift: int = 7
+    while True:
+        pos += 1
+        b = buf[pos]
+        res |= (b & 0x7F) << shift
+        if b < 0x80:
+            return res, pos + 1
+        shift += 7
+
+
+def read_zigzag(buf, pos: int) -> tuple[int, int]:
+    """
+    Read a signed (zigzag) varint.
+
+    Parameters
+    ----------
+    buf : bytes | mmap
+        The buffer to read from.
+
+    pos : int
+        The position of the first byte.
+
+    Return
+    ----------
+    The value and the position following it.
+    """
+    v, pos = read_varint(buf, pos)
+    return (v >> 1) if v & 1 == 0 else -((v + 1) >> 1), pos
+
+
+def write_binary(g, path: str) -> None:
+    """
+    Save `g` to `path` using the binary format described above.
+
+    Parameters
+    ----------
+    g : open_digraph
+        The graph to save.
+
+    path : str
+        The path where the file will be saved.
+    """
+    label_index: dict[str, int] = {}
+    for n in g.nodes.values():
+        label_index.setdefault(n.get_label(), len(label_index))
+
+    labels = bytearray()
+    write_varint(labels, len(label_index))
+    for label in label_index:
+        encoded: bytes = label.encode("utf-8")
+        write_varint(labels, len(encoded))
+        labels += encoded
+
+    io = bytearray()
+    for ids in (g.inputs, g.outputs):
+        write_varint(io, len(ids))
+        for identif in ids:
+            write_zigzag(io, identif)
+
+    ids: list[int] = sorted(g.nodes.keys())
+    labels_offset: int = HEADER.size
+    io_offset: int = labels_offset + len(labels)
+    index_offset: int = (io_offset + len(io) + 7) // 8 * 8
+
+    offsets: list[int] = []
+    records = bytearray()
+    for identif in ids:
+        n: node = g.nodes[identif]
+        offsets += [len(records)]
+        write_varint(records, label_index[n.get_label()])
+        for adj in (n.get_children(), n.get_parents()):
+            write_varint(records, len(adj))
+            for k, m in adj.items():
+                write_zigzag(records, k - identif)
+                write_varint(records, m)
+
+    width: int = 8
+    if ids != [] and (ids[0] < -2**31 or ids[-1] >= 2**31 or index_offset + 8*len(ids) + len(records) >= 2**31):
+        width = 16
+    entry: struct.Struct = INDEX_ENTRIES[width]
+    records_offset: int = index_offset + width * len(ids)
+    index = bytearray(width * len(ids))
+    for i, (identif, offset) in enumerate(zip(ids, offsets)):
+        entry.pack_into(index, width * i, identif, records_offset + offset)
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, width, len(ids), labels_offset, io_offset, index_offset))
+        f.write(labels)
+        f.write(io)
+        f.write(bytes(index_offset - io_offset - len(io)))
+        f.write(index)
+        f.write(records)
+
+
+class binary_node_map(Mapping):
+    def __init__(self, graph) -> None:
+        """
+        Read-only `{node_id : node}` view over a `binary_digraph`, each node being decoded on its first access.
+
+        Parameters
+        ----------
+        graph : binary_digraph
+            The viewed graph.
+        """
+        self.graph = graph
+        self.decoded: dict[int, node] = {}
+
+    def __getitem__(self, identif: int) -> node:
+        """Return the node with `identif` as id."""
+        n: node | None = self.decoded.get(identif)
+        if n is None:
+            n = self.graph.decode_node(identif, self.graph.find(identif))
+            self.decoded[identif] = n
+        return n
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the node ids, in increasing order."""
+        return (self.graph.index[2*i] for i in range(self.graph.n_nodes))
+
+    def __len__(self) -> int:
+        """Return the number of nodes."""
+        return self.graph.n_nodes
+
+    def __contains__(self, identif) -> bool:
+        """Return `True` if there's a node with `identif` as id."""
+        return self.graph.find(identif) != -1
+
+
+class binary_digraph(open_digraph_path_mx):
+    def __init__(self, path: str) -> None:
+        """
+        Open a graph saved with `open_digraph.save_binary` through `mmap`, without decoding it :
+        only the header, the labels and the input/output lists are read, each node being decoded on access.
+        The file stays open until `close` is called (or the end of a `with` block).
+
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+
+        Return
+        ----------
+        A read-only graph backed by the file.
+
+        Raise
+        ----------
+        ValueError if the file isn't in a supported format.
+        """
+        with open(path, "rb") as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, width, self.n_nodes, labels_offset, io_offset, index_offset = HEADER.unpack_from(
+            self.buffer, 0)
+        if magic != MAGIC or version != VERSION or width not in INDEX_ENTRIES:
+            self.buffer.close()
+            raise ValueError(f"{path} isn't a binary graph file (version {VERSION}).")
+
+        count, pos = read_varint(self.buffer, labels_offset)
+        self.labels: list[str] = []
+        for _ in range(count):
+            size, pos = read_varint(self.buffer, pos)
+            self.labels += [self.buffer[pos:pos+size].decode("utf-8")]
+            pos += size
+
+        pos = io_offset
+        io: list[list[int]] = []
+        for _ in range(2):
+            count, pos = read_varint(self.buffer, pos)
+            ids: list[int] = []
+            for _ in range(count):
+                identif, pos = read_zigzag(self.buffer, pos)
+                ids += [identif]
+            io += [ids]
+        self.inputs: list[int] = io[0]
+        self.outputs: list[int] = io[1]
+
+        # (id, offset) pairs, read in place
+        self.index = memoryview(self.buffer)[index_offset:index_offset +
+                                             width * self.n_nodes].cast("i" if width == 8 else "q")
+        self.nodes: binary_node_map = binary_node_map(self)
+        self._topo_cache: tuple[list[set[int]], dict[int, int]] | None = None
+
+    def __enter__(self):
+        """Return this graph, closed at the end of the `with` block."""
+        return self
+
+    def __exit__(self, *args) -> None:
+        """Close this graph."""
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the underlying file. The nodes that were already accessed remain available.
+        """
+        self.index.release()
+        self.buffer.close()
+
+    def find(self, identif: int) -> int:
+        """
+        Find the record of a node by binary search over the index.
+
+        Parameters
+        ----------
+        identif : int
+            The id of the node.
+
+        Return
+        ----------
+        The offset of its record, -1 if there's no such node.
+        """
+        lo: int = 0
+        hi: int = self.n_nodes
+        while lo < hi:
+            mid: int = (lo + hi) // 2
+            if self.index[2*mid] < identif:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.n_nodes and self.index[2*lo] == identif:
+            return self.index[2*lo + 1]
+        return -1
+
+    def decode_node(self, identif: int, pos: int) -> node:
+        """
+        Decode the record of a node.
+
+        Parameters
+        ----------
+        identif : int
+            The id of the node.
+
+        pos : int
+            The offset of its record.
+
+        Return
+        ----------
+        The decoded node.
+
+        Raise
+        ----------
+        KeyError if `pos` is -1 (the node doesn't exist).
+        """
+        if pos == -1:
+            raise KeyError(identif)
+        buf = self.buffer
+        label, pos = read_varint(buf, pos)
+        adj: list[dict[int, int]] = []
+        for _ in range(2):
+            count, pos = read_varint(buf, pos)
+            d: dict[int, int] = {}
+            for _ in range(count):
+                k, pos = read_zigzag(buf, pos)
+                d[identif + k], pos = read_varint(buf, pos)
+            adj += [d]
+        return node(identif, self.labels[label], adj[1], adj[0])
+
+    def decode_all(self) -> list[node]:
+        """
+        Decode every node, in a single sequential pass over the records.
+
+        Return
+        ----------
+        The list of all the nodes.
+        """
+        if self.n_nodes == 0:
+            return []
+        res: list[node] = []
+        buf: bytes = self.buffer[self.index[1]:]
+        pos: int = 0
+        labels: list[str] = self.labels
+        ids: list[int] = self.index[0::2].tolist()
+        for identif in ids:
+            # single byte varints are by far the most common ones : they are decoded inline
+            label: int = buf[pos]
+            pos += 1
+            if label >= 0x80:
+                label, pos = read_varint(buf, pos - 1)
+            adj: list[dict[int, int]] = []
+            for _ in range(2):
+                count: int = buf[pos]
+                pos += 1
+                if count >= 0x80:
+                    count, pos = read_varint(buf, pos - 1)
+                d: dict[int, int] = {}
+                for _ in range(count):
+                    k: int = buf[pos]
+                    if k < 0x80:
+                        pos += 1
+                    else:
+                        k, pos = read_varint(buf, pos)
+                    m: int = buf[pos]
+                    if m < 0x80:
+                        pos += 1
+                    else:
+                        m, pos = read_varint(buf, pos)
+                    d[identif + ((k >> 1) if k & 1 == 0 else -((k + 1) >> 1))] = m
+                adj += [d]
+            res += [node(identif, labels[label], adj[1], adj[0])]
+        return res
+
+    def get_input_ids(self) -> list[int]:
+        """See `open_digraph.get_input_ids`."""
+        return self.inputs
+
+    def get_output_ids(self) -> list[int]:
+        """See `open_digraph.get_output_ids`."""
+        return self.outputs
+
+    def get_node_ids(self) -> list[int]:
+        """See `open_digraph.get_node_ids`."""
+        return list(self.nodes)
+
+    def get_node_by_id(self, identif: int) -> node:
+        """See `open_digraph.get_node_by_id`."""
+        return self.nodes[identif]
+
+    def __getitem__(self, identif: int) -> node:
+        """See `open_digraph.get_node_by_id`."""
+        return self.nodes[identif]
@@ -1,17 +1,35 @@
 from modules.open_digraph import open_digraph
 from modules.node import node
-from random import choice
-
-
-class bool_circ(open_digraph):
-    def __init__(self, g: open_digraph) -> None:
+from modules.circuit_view import circuit_view, circuit_builder, cow_node_map
+from modules.bool_circ_eval_mx import bool_circ_eval_mx
+from modules.bool_circ_rewrite_mx import bool_circ_rewrite_mx
+from modules.bool_circ_strash_mx import bool_circ_strash_mx
+from modules.bool_circ_timing_mx import bool_circ_timing_mx
+from modules.bool_circ_arith_mx import bool_circ_arith_mx
+from modules.bool_circ_equiv_mx import bool_circ_equiv_mx
+from modules.bool_circ_bdd_mx import bool_circ_bdd_mx
+from modules.bool_circ_fault_mx import bool_circ_fault_mx
+from modules.utils import tokenize_formula
+from random import choice, randrange
+
+# precedence of the binary operators of the formulas read by `bool_circ.from_string`, '~' binding tighter than all of them
+PRECEDENCE: dict[str, int] = {'|': 1, '^': 2, '&': 3}
+
+
+class bool_circ(open_digraph, bool_circ_eval_mx, bool_circ_rewrite_mx, bool_circ_strash_mx, bool_circ_timing_mx,
+                bool_circ_arith_mx, bool_circ_equiv_mx, bool_circ_bdd_mx, bool_circ_fault_mx):
+    def __init__(self, g: open_digraph, validate: bool = True) -> None:
         """
         Create a `bool_circ` with the corresponding parameters.
 
         Parameters
         ----------
         g: `open_digraph`
-            The `open_digraph` we want to create a `bool_circ` from
+            The `open_digraph` we want to create a `bool_circ` from. The nodes of a `circuit_builder` are shared
+            with its snapshots until this circuit modifies them, the snapshots being left untouched.
+
+        validate: bool
+            If set to `False`, `g` is trusted to be a valid bool circuit and isn't checked. Default to `True`.
 
         Return
         ----------
@@ -22,10 +40,30 @@ class bool_circ(open_digraph):
         - '&' -> AND
         - '|' -> OR
         - '~' -> NOT
+        - '^' -> XOR
         - ''  -> COPY
+        - '0' -> constant 0 (no parent)
+        - '1' -> constant 1 (no parent)
         """
-        super().__init__(g.get_input_ids(), g.get_output_ids(), g.get_nodes())
-        assert self.is_well_formed(), "The graph you provided isn't a valid bool circuit."
+        # the truth tables of the outputs, see `truth_table`
+        self._truth_table: list[int] | None = None
+        # the unique table of the gates, see `unique_table`
+        self._unique: dict[tuple[str, tuple[tuple[int, int], ...]], int] | None = None
+        # number of `keeping_unique_table` contexts entered
+        self._keep_unique: int = 0
+        if isinstance(g, circuit_builder):
+            # the nodes of a builder are shared with its snapshots : they are shared with this circuit as well,
+            # and copied on write (see `open_digraph.writable`)
+            view: circuit_view = g.freeze()
+            super().__init__(list(view.inputs), list(view.outputs), [])
+            self.nodes = cow_node_map(view._nodes)
+            self._next_id = g._next_id
+        else:
+            super().__init__(g.get_input_ids(), g.get_output_ids(), g.get_nodes())
+        if validate:
+            assert self.is_well_formed(), "The graph you provided isn't a valid bool circuit."
+        else:
+            self._dirty = set()
 
     @classmethod
     def empty(cls):
@@ -35,7 +73,7 @@ class bool_circ(open_digraph):
         return cls(open_digraph.empty())
 
     @classmethod
-    def random_bool_circ(cls, n: int, inputs: int = 1, outputs: int = 1):
+    def random_bool_circ(cls, n: int, inputs: int = 1, outputs: int = 1, density: float | None = None):
         """
         Create a random bool_circ with `n` nodes.
 
@@ -45,142 +83,106 @@ class bool_circ(open_digraph):
             The number of nodes.
 
         inputs : int
-            The number of inputs (superior or equal to 1)
+            The number of inputs (superior or equal to 1), which are the only nodes without parent.
 
         outputs : int
-            The number of outputs (superior or equal to 1)
+            The number of outputs (superior or equal to 1), which are the only nodes without child.
+
+        density : float | None
+            The probability for each pair of nodes to be linked, see `open_digraph.random`.
+            Default to `min(1, 4/n)`, that is about 2 edges per node.
         """
         g: open_digraph = open_digraph.random(
-            n, 1, form="dag", inputs=inputs, outputs=outputs)
-
-        tmp: list[node] = list(g.nodes.values()).copy()
-        for no in tmp:
-            if no.get_parents_ids() == []:
-                g.add_input_node(no.get_id())
-            if no.get_children_ids() == []:
-                g.add_output_node(no.get_id())
-
+            n, 1, form="dag", inputs=inputs, outputs=outputs, density=min(1, 4/max(n, 1)) if density is None else density)
+        if g.nodes == {}:
+            return cls.empty()
+
+        # a sparse graph has many nodes without parent or child : they are linked to random nodes (in the order of the ids,
+        # which the edges of the dag follow), so that only the requested inputs and outputs end up as sources and sinks
+        ins: set[int] = set(g.inputs)
+        outs: set[int] = set(g.outputs)
+        first: int = max(ins) + 1
+        last: int = min(outs)
+        edges: list[tuple[int, int]] = []
+        for k, no in g.nodes.items():
+            if k not in ins and no.get_parents() == {}:
+                edges += [(randrange(min(k, last)), k)]
+            if k not in outs and no.get_children() == {}:
+                edges += [(k, randrange(max(k + 1, first), n))]
+        g.add_edges(edges)
+
+        for i in sorted(ins):
+            g.add_input_node(i)
+        for o in sorted(outs):
+            g.add_output_node(o)
+
+        input_index: dict[int, int] = {i: k for k, i in enumerate(g.inputs)}
+        output_index: dict[int, int] = {o: k for k, o in enumerate(g.outputs)}
         tmp: list[node] = list(g.nodes.values()).copy()
         for u in tmp:
             # deg+
             deg1: int = u.indegree()
             # deg-
             deg2: int = u.outdegree()
-            if u.get_id() in g.inputs:
-                u.set_label(f"i{g.inputs.index(u.get_id())}")
-            elif u.get_id() in g.outputs:
-                u.set_label(f"o{g.outputs.index(u.get_id())}")
+            if u.get_id() in input_index:
+                u.set_label(f"i{input_index[u.get_id()]}")
+            elif u.get_id() in output_index:
+                u.set_label(f"o{output_index[u.get_id()]}")
             elif deg1 == 1:
-                if deg2 == 1:
-                    u.set_label("~")
+                u.set_label("~" if deg2 == 1 else "")
             else:
                 if deg2 == 1:
                     u.set_label(choice(["|", "&"]))
                 else:
-                    uop: int = g.add_node(
-                        choice(["|", "&"]), u.get_parents().copy())
-                    ucp: int = g.add_node(
-                        "", {uop: 1}, u.get_children().copy())
-                    g.remove_node_by_id(u.get_id())
+                    # the gate keeps the parents, a new copy node below it takes the children
+                    u.set_label(choice(["|", "&"]))
+                    children: dict[int, int] = u.get_children()
+                    u.set_children({})
+                    ucp: int = g.add_node("", {u.get_id(): 1})
+                    g.get_node_by_id(ucp).set_children(children)
+                    for c, m in children.items():
+                        g.get_node_by_id(c).remove_parent_id(u.get_id())
+                        g.get_node_by_id(c).add_parent_id(ucp, m)
 
-        return bool_circ(g)
+        # well formed by construction
+        return cls(g, validate=False)
 
-    def adder_builder(self, n: int) -> tuple[open_digraph, list[int], list[int], int, int, list[int]]:
+    @classmethod
+    def from_csr(cls, g):
+        """
+        Build a `bool_circ` from an array-backed graph, see `open_digraph.from_csr`.
+        """
+        return cls(open_digraph.from_csr(g))
+
+    @classmethod
+    def load_binary(cls, path: str):
         """
-        Build the adder block.
+        Read a `bool_circ` saved with `save_binary`.
 
         Parameters
         ----------
-        n : int
-            The rank of the adder
+        path : str
+            The location of the file.
 
         Return
         ----------
-            - `bool_circ` : the resulting adder block
-            - `list[int]` : the list of node ids corresponding to the first input (a)
-            - `list[int]` : the list of node ids corresponding to the second input (b)
-            - `int` : the id of the carry input (c)
-            - `int` : the id of the carry output (c')
-            - `list[int]` : the list of node ids corresponding to the output (r)
-        """
-        if n == 0:
-            return bool_circ(open_digraph(
-                inputs=[0, 1, 2],
-                outputs=[12, 13],
-                nodes=[
-                    node(0, "i0", {}, {3: 1}),
-                    node(1, "i1", {}, {4: 1}),
-                    node(2, "i2", {}, {7: 1}),
-                    node(3, "", {0: 1}, {5: 1, 8: 1}),
-                    node(4, "", {1: 1}, {5: 1, 8: 1}),
-                    node(5, "^", {3: 1, 4: 1}, {6: 1}),
-                    node(6, "", {5: 1}, {9: 1, 10: 1}),
-                    node(7, "", {2: 1}, {9: 1, 10: 1}),
-                    node(8, "&", {3: 1, 4: 1}, {11: 1}),
-                    node(9, "&", {6: 1, 7: 1}, {11: 1}),
-                    node(10, "^", {6: 1, 7: 1}, {13: 1}),
-                    node(11, "|", {8: 1, 9: 1}, {12: 1}),
-                    node(12, "o0", {11: 1}, {}),
-                    node(13, "o1", {10: 1}, {}),
-                ]
-            )), [0], [1], 2, 12, [13]
-        else:
-            prev1, i_a1, i_b1, i_c1, o_c1, o_r1 = self.adder_builder(n-1)
-
-            prev2 = prev1.copy()
-            i_a2 = i_a1.copy()
-            i_b2 = i_b1.copy()
-            i_c2 = i_c1
-            o_c2 = o_c1
-            o_r2 = o_r1.copy()
-
-            shift = prev1.iparallel(prev2)
-            i_a1 = [e+shift for e in i_a1]
-            i_b1 = [e+shift for e in i_b1]
-            o_r1 = [e+shift for e in o_r1]
-            i_c1 += shift
-            o_c1 += shift
-
-            child_c = prev1.get_node_by_id(i_c2).get_children_ids()[0]
-            parent_c = prev1.get_node_by_id(o_c1).get_parents_ids()[0]
-
-            prev1.remove_node_by_id(i_c2)
-            prev1.remove_node_by_id(o_c1)
-
-            prev1.add_edge(parent_c, child_c)
-
-            return prev1, i_a1 + i_a2, i_b1 + i_b2, i_c1, o_c2, o_r1 + o_r2
+        Returns the `bool_circ` saved in that file.
+        """
+        return cls(open_digraph.load_binary(path))
 
     @classmethod
     def adder(cls, n: int):
         """
         Return a `bool_circ` computing the sum of two registry, with an input carry.
+        Built directly as a ripple-carry adder, see `make_adder` for the other architectures and any width.
 
         Parameters
         ----------
         n : int
-            The size of the registries.
+            The size of the registries is `2**n`.
         """
         assert n >= 0, "n must be positive"
-        adder = cls.empty()
-        adder, i_a, i_b, i_c, o_c, o_r = adder.adder_builder(n)
-
-        for i, node_id in enumerate(i_a):
-            node = adder.get_node_by_id(node_id)
-            node.label = f"a{i}"
-
-        for i, node_id in enumerate(i_b):
-            node = adder.get_node_by_id(node_id)
-            node.label = f"b{i}"
-
-        for i, node_id in enumerate(o_r):
-            node = adder.get_node_by_id(node_id)
-            node.label = f"r{i}"
-
-        adder.get_node_by_id(i_c).label = 'c'
-        adder.get_node_by_id(o_c).label = "c'"
-
-        return adder
+        return cls.make_adder(2**n)
 
     @classmethod
     def half_adder(cls, n: int):
@@ -190,139 +192,223 @@ class bool_circ(open_digraph):
         Parameters
         ----------
         n : int
-            The size of the registries.
+            The size of the registries is `2**n`.
         """
-        half_adder: bool_circ = cls.adder(n)
-
-        for i_id in half_adder.inputs:
-            if cls.get_node_by_id(i_id).get_label() == "c":  # type: ignore
-                child = cls.get_node_by_id(i_id).get_children_ids()[  # type: ignore
-                    0]
-                half_adder.remove_node_by_id(i_id)
-                new_id: int = half_adder.add_node(label="0")
-                half_adder.add_edge(new_id, child)
+        assert n >= 0, "n must be positive"
+        return cls.make_adder(2**n, carry_in=False)
 
     def from_string(self, *v: str):
         """
         Take n infix representations of the desired bool_circ in argument and return a bool_circ whose outputs match each string representation.
+        Each formula is parsed in a single pass (see `parse_formula`), the gates being shared between the formulas (see `add_gate`).
 
         Parameters
         ----------
         v : tuple[str, str, ...]
-            The infix representations of the desired bool_circ
+            The infix representations of the desired bool_circ : variables, constants ('0', '1'), parentheses
+            and the operators '~', '&', '^', '|', by decreasing precedence.
 
         Return
         ----------
-        Return a bool_circ whose outputs match each string representation
+        Return a bool_circ whose outputs match each string representation, and the names of its inputs
+        (one per variable, by order of first appearance).
+
+        Raise
+        ----------
+        ValueError if a formula isn't well formed.
         """
         if len(v) == 0:
             return self.empty(), []
 
-        l: list[dict[str, list[int]]] = [{} for _ in range(len(v))]
-        g_list: list[bool_circ] = [bool_circ(open_digraph(
-            [], [1], [node(0, "0", {}, {1: 1}), node(1, "1", {0: 1}, {})])) for _ in range(len(v))]
-        for i, s in (enumerate(v)):
-            g: bool_circ = g_list[i]
-            g.get_node_by_id(0).set_label("")
-            g.get_node_by_id(1).set_label("")
-            current_node: int = 0
-            s2: str = ""
-            for c in s:
-                if c == '(':
-                    g.get_node_by_id(current_node).set_label(
-                        g.get_node_by_id(current_node).label + s2)
-                    tmp_id: int = g.add_node(children={current_node: 1})
-                    g.get_node_by_id(current_node).add_parent_id(tmp_id)
-                    current_node = tmp_id
-                    s2 = ""
-                elif c == ')':
-                    if s2 not in ["&", "|", "~", ""]:
-                        if s2 not in l[i].keys():
-                            l[i][s2] = [current_node]
-                        else:
-                            l[i][s2] += [current_node]
-                    g.get_node_by_id(current_node).set_label(
-                        g.get_node_by_id(current_node).label + s2)
-                    current_node = g.get_node_by_id(
-                        current_node).get_children_ids()[0]
-                    s2 = ""
-                else:
-                    s2 += c
-
-        final_graph: bool_circ = g_list[0]
-        l2: dict[str, list[int]] = l[0]
-        for i in range(1, len(g_list)):
-            l2 = {k: [vv + (final_graph.max_id() - g_list[i].min_id() + 1)
-                      for vv in va] for k, va in l2.items()}
-            for k, va in l[i].items():
-                if k in l2.keys():
-                    l2[k] += va
-                else:
-                    l2[k] = va
-            final_graph.iparallel(g_list[i])
-
-        res: list[str] = []
-        while len(l2) != 0:
-            lab: str = list(l2.keys())[0]
-            if lab not in res:
-                res += [lab]
-            if len(l2[lab]) == 1:
-                l2.pop(lab)
-            else:
-                idx1: int = l2[lab].pop()
-                idx2: int = l2[lab].pop()
-                idx3 = final_graph.merge_nodes(idx1, idx2)
-                l2[lab] += [idx3]
-                if l2[lab] == []:
-                    l2.pop(lab)
+        circ: bool_circ = bool_circ(open_digraph.empty(), validate=False)
+        variables: dict[str, tuple[int, int]] = {}
+        outputs: list[int] = []
+        for i, s in enumerate(v):
+            tokens: list[str] = tokenize_formula(s)
+            value, pos = circ.parse_formula(tokens, variables)
+            if pos != len(tokens):
+                raise ValueError(f"Unexpected '{tokens[pos]}' in '{s}'.")
+            with circ.keeping_unique_table():
+                outputs += [circ.add_node(f"o{i}", {circ.fanout(value): 1})]
+        circ.set_input_ids([i for i, _ in variables.values()])
+        circ.set_output_ids(outputs)
+        return circ, list(variables)
+
+    def parse_formula(self, tokens: list[str], variables: dict[str, tuple[int, int]], pos: int = 0, min_precedence: int = 1) -> tuple[int, int]:
+        """
+        Precedence climbing : add the gates computing the longest formula starting at `tokens[pos]`
+        whose operators have a precedence of at least `min_precedence` (see `PRECEDENCE`).
+        A chain of the same operator (`a & b & c`) gives a single gate.
+
+        Parameters
+        ----------
+        tokens : list[str]
+            The tokens of the formula, see `utils.tokenize_formula`.
+
+        variables : dict[str, tuple[int, int]]
+            The `(input id, copy node id)` of each variable, completed with the new ones.
 
-        return final_graph, res
+        pos : int
+            The position of the first token of the formula. Default to 0.
+
+        min_precedence : int
+            The precedence of the weakest operator the formula may contain. Default to 1 (every operator).
+
+        Return
+        ----------
+        The id of the node carrying the value of the formula, and the position of the token following it.
+
+        Raise
+        ----------
+        ValueError if the formula isn't well formed.
+        """
+        value, pos = self.parse_operand(tokens, variables, pos)
+        while pos < len(tokens) and PRECEDENCE.get(tokens[pos], 0) >= min_precedence:
+            op: str = tokens[pos]
+            operands: dict[int, int] = {value: 1}
+            while pos < len(tokens) and tokens[pos] == op:
+                operand, pos = self.parse_formula(tokens, variables, pos + 1, PRECEDENCE[op] + 1)
+                operands[operand] = operands.get(operand, 0) + 1
+            value = self.add_gate(op, operands)
+        return value, pos
+
+    def parse_operand(self, tokens: list[str], variables: dict[str, tuple[int, int]], pos: int) -> tuple[int, int]:
+        """
+        Add the gates computing the operand starting at `tokens[pos]` : a variable, a constant,
+        a negated operand or a parenthesised formula. See `parse_formula`.
+        """
+        if pos == len(tokens):
+            raise ValueError("Unexpected end of formula.")
+        token: str = tokens[pos]
+        if token == '~':
+            operand, pos = self.parse_operand(tokens, variables, pos + 1)
+            return self.add_gate('~', {operand: 1}), pos
+        if token == '(':
+            value, pos = self.parse_formula(tokens, variables, pos + 1)
+            if pos == len(tokens) or tokens[pos] != ')':
+                raise ValueError("Missing ')'.")
+            return value, pos + 1
+        if token in ('0', '1'):
+            return self.add_gate(token), pos + 1
+        if token in PRECEDENCE or token == ')':
+            raise ValueError(f"Unexpected '{token}'.")
+        if token not in variables:
+            with self.keeping_unique_table():
+                i: int = self.add_node(token)
+                variables[token] = (i, self.add_node('', {i: 1}))
+        return variables[token][1], pos + 1
 
     def copy(self):
         """
         Return a new instance of `bool_circ` with the same parameters.
         """
-        return bool_circ(super().copy())
+        return bool_circ(super().copy(), validate=False)
 
-    def is_cyclic(self) -> bool:
+    def subgraph(self, ids: set[int], inputs: list[int], outputs: list[int]):
         """
-        Return True whether this `bool_circ` is cyclic or not.
+        See `open_digraph.subgraph`. The result is a `bool_circ`, which isn't checked :
+        it is well formed as long as no edge enters or leaves `ids` (as for `fanin_cone` and `split`).
+        """
+        return bool_circ(super().subgraph(ids, inputs, outputs), validate=False)
 
-        Return
-        ----------
-        Return True whether this `bool_circ` is cyclic or not.
+    def fanout_cone(self, node_ids: list[int]):
         """
-        if self.nodes == {}:
-            return False
-        # we select every leaf
-        leaves: list[int] = [
-            k for k, n in self.nodes.items() if n.get_children() == {}]
-        if leaves == []:
-            return True
-        else:
-            g: bool_circ = self.copy()
-            g.remove_node_by_id(leaves[0])
-            return g.is_cyclic()
+        See `open_digraph.fanout_cone`. The edges coming from the rest of the circuit are cut : each node they come from
+        is replaced by a new input labelled `i<id of the node>` (through a copy node if it had several edges to the slice),
+        so that the result is a well formed `bool_circ`. The new inputs follow the inputs of this circuit,
+        in the increasing order of the ids of the nodes they replace.
+        """
+        cone: set[int] = self.fanout_ids(node_ids)
+        cut: dict[int, dict[int, int]] = {}
+        for k in cone:
+            for p, m in self.nodes[k].get_parents().items():
+                if p not in cone:
+                    cut.setdefault(p, {})[k] = m
+        res = self.subgraph(cone, [i for i in self.inputs if i in cone], [o for o in self.outputs if o in cone])
+        for p in sorted(cut):
+            children: dict[int, int] = cut[p]
+            i: int = res.add_node(f"i{p}")
+            if list(children.values()) == [1]:
+                res.add_edges([(i, k) for k in children])
+            else:
+                res.add_node('', {i: 1}, children)
+            res.add_input_id(i)
+        return res
+
+    def invalidate_cache(self, *identifs: int) -> None:
+        """
+        See `open_digraph.invalidate_cache`. The truth tables and the unique table (unless in `keeping_unique_table`)
+        are dropped as well.
+        """
+        super().invalidate_cache(*identifs)
+        self._truth_table = None
+        if self._keep_unique == 0:
+            self._unique = None
+
+    def sweep(self) -> int:
+        """
+        See `open_digraph.sweep`. An input left without child gets a new copy node, so that the circuit stays well formed.
+        """
+        res: int = super().sweep()
+        for i in self.inputs:
+            if self.get_node_by_id(i).get_children() == {}:
+                self.add_node('', {i: 1})
+        return res
 
-    def is_well_formed(self) -> bool:
+    def is_well_formed(self, incremental: bool = False) -> bool:
         """
         Return True whether a `bool_circ` is well formed or not.
         A `bool_circ` is well formed if :
+            - It is a well formed `open_digraph`
             - Every copy node has exactly an `indegree` of 1
             - Every '&' or '|' node has exactly an `outdegree` of 1
             - Every '~' node has exactly an `indegree` and an `outdegree` of 1
+            - It is acyclic
+
+        Parameters
+        ----------
+        incremental : bool
+            If set to `True`, only the nodes modified since the last validation are checked. See `open_digraph.is_well_formed`.
 
         Return
         ----------
         True wether a `bool_circ` is well formed or not.
         """
-        if not super().is_well_formed():
+        dirty: set[int] = set(self._dirty)
+        if not super().is_well_formed(incremental):
+            return False
+        if incremental:
+            return self.update_order(dirty)
+        return self.rebuild_order()
+
+    def is_node_well_formed(self, identif: int, inputs: set[int], outputs: set[int]) -> bool:
+        """
+        Check the conditions of `is_well_formed` related to the node with `identif` as id.
+
+        Parameters
+        ----------
+        identif : int
+            The id of the node to check.
+
+        inputs : set[int]
+            The input ids of the graph.
+
+        outputs : set[int]
+            The output ids of the graph.
+
+        Return
+        ----------
+        Return `True` if this node is well formed, `False` otherwise.
+        """
+        if not super().is_node_well_formed(identif, inputs, outputs):
+            return False
+        n: node | None = self.nodes.get(identif)
+        if n is None:
+            return True
+        if n.get_label() == '' and n.indegree() != 1:
+            return False
+        if (n.get_label() == '&' or n.get_label() == '|') and n.outdegree() != 1:
+            return False
+        if n.get_label() == '~' and (n.indegree() != 1 or n.outdegree() != 1):
             return False
-        for n in self.nodes.values():
-            if n.get_label() == '' and n.indegree() != 1:
-                return False
-            if (n.get_label() == '&' or n.get_label() == '|') and n.outdegree() != 1:
-                return False
-            if n.get_label() == '~' and n.indegree() != 1 and n.outdegree() != 1:
-                return False
         return True
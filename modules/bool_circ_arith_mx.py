@@ -0,0 +1,197 @@
+from modules.open_digraph import open_digraph
+
+# the carry computations available for `make_adder`
+ADDER_ARCHITECTURES: tuple[str, ...] = ("ripple", "lookahead", "kogge-stone", "brent-kung")
+# size of the blocks of the carry-lookahead adder
+LOOKAHEAD_BLOCK: int = 4
+
+
+class bool_circ_arith_mx:
+    def gate(self, label: str, *args: int) -> int:
+        """
+        Add a gate reading the values carried by the nodes `args`, through `fanout` (a node may feed several gates).
+
+        Parameters
+        ----------
+        label : str
+            The label of the gate.
+
+        args : tuple[int, ...]
+            The ids of the nodes carrying its operands.
+
+        Return
+        ----------
+        The id of the new gate.
+        """
+        return self.add_node(label, {self.fanout(a): 1 for a in args})
+
+    def ripple_carries(self, g: list[int], p: list[int], carry: int | None) -> list[int | None]:
+        """
+        Ripple carry : each carry is computed from the previous one, `c[i+1] = g[i] | (p[i] & c[i])`. Linear depth.
+
+        Parameters
+        ----------
+        g : list[int]
+            The ids of the generate signals (`a[i] & b[i]`).
+
+        p : list[int]
+            The ids of the propagate signals (`a[i] ^ b[i]`).
+
+        carry : int | None
+            The id of the node carrying the input carry, `None` if there's none.
+
+        Return
+        ----------
+        The ids of the nodes carrying the carry into each bit, then the output carry.
+        """
+        carries: list[int | None] = [carry]
+        for i in range(len(g)):
+            c: int | None = carries[-1]
+            carries += [g[i] if c is None else self.gate('|', g[i], self.gate('&', p[i], c))]
+        return carries
+
+    def lookahead_carries(self, g: list[int], p: list[int], carry: int | None) -> list[int | None]:
+        """
+        Carry-lookahead : inside each block of `LOOKAHEAD_BLOCK` bits, every carry is a flat sum of products
+        of the block's signals and of its input carry (depth 2), the blocks being chained.
+
+        See `ripple_carries` for the parameters and the result.
+        """
+        carries: list[int | None] = [carry]
+        for start in range(0, len(g), LOOKAHEAD_BLOCK):
+            c: int | None = carries[-1]
+            for k in range(start, min(start + LOOKAHEAD_BLOCK, len(g))):
+                # c[k+1] = g[k] | p[k] g[k-1] | ... | p[k] ... p[start] c
+                terms: list[int] = [g[k]]
+                terms += [self.gate('&', g[t], *p[t+1:k+1]) for t in range(start, k)]
+                if c is not None:
+                    terms += [self.gate('&', c, *p[start:k+1])]
+                carries += [terms[0] if len(terms) == 1 else self.gate('|', *terms)]
+        return carries
+
+    def prefix_carries(self, g: list[int], p: list[int], carry: int | None, spans: list[list[tuple[int, int]]]) -> list[int | None]:
+        """
+        Parallel prefix carries : `(G, P)` pairs are combined by `(G, P) o (G', P') = (G | (P & G'), P & P')`,
+        the input carry being folded into the first bit.
+
+        Parameters
+        ----------
+        g, p, carry :
+            See `ripple_carries`.
+
+        spans : list[list[tuple[int, int]]]
+            The combinations `(i, j)` (`i` receiving `i o j`) of each level, in order.
+
+        Return
+        ----------
+        See `ripple_carries`.
+        """
+        G: list[int] = list(g)
+        P: list[int] = list(p)
+        if carry is not None and G != []:
+            G[0] = self.gate('|', g[0], self.gate('&', p[0], carry))
+        for level in spans:
+            new_G: list[int] = list(G)
+            new_P: list[int] = list(P)
+            for i, j in level:
+                new_G[i] = self.gate('|', G[i], self.gate('&', P[i], G[j]))
+                new_P[i] = self.gate('&', P[i], P[j])
+            G, P = new_G, new_P
+        return [carry] + G
+
+    @classmethod
+    def kogge_stone_spans(cls, width: int) -> list[list[tuple[int, int]]]:
+        """
+        Return
+        ----------
+        The combinations of a Kogge-Stone prefix network over `width` bits : `log2(width)` levels, every bit at each level.
+        """
+        spans: list[list[tuple[int, int]]] = []
+        d: int = 1
+        while d < width:
+            spans += [[(i, i - d) for i in range(d, width)]]
+            d *= 2
+        return spans
+
+    @classmethod
+    def brent_kung_spans(cls, width: int) -> list[list[tuple[int, int]]]:
+        """
+        Return
+        ----------
+        The combinations of a Brent-Kung prefix network over `width` bits : an up-sweep building the prefixes
+        of the powers of two, then a down-sweep filling the other bits. `2 log2(width)` levels, `O(width)` combinations.
+        """
+        spans: list[list[tuple[int, int]]] = []
+        d: int = 1
+        while d < width:
+            spans += [[(i, i - d) for i in range(2*d - 1, width, 2*d)]]
+            d *= 2
+        d //= 2
+        while d >= 1:
+            level: list[tuple[int, int]] = [(i, i - d) for i in range(3*d - 1, width, 2*d)]
+            if level != []:
+                spans += [level]
+            d //= 2
+        return spans
+
+    @classmethod
+    def make_adder(cls, width: int, architecture: str = "ripple", carry_in: bool = True):
+        """
+        Build a `width` bits adder directly, with `O(width)` node insertions (`O(width log(width))` for Kogge-Stone).
+        The inputs are `a0, ..., b0, ..., c` (`a0` being the least significant bit), the outputs `r0, ..., c'`.
+
+        Parameters
+        ----------
+        width : int
+            The number of bits of each operand (at least 1).
+
+        architecture : str
+            How the carries are computed, one of `ADDER_ARCHITECTURES` :
+                - "ripple" : linear depth, the fewest gates
+                - "lookahead" : carry-lookahead over blocks of 4 bits
+                - "kogge-stone" : logarithmic depth, the most gates
+                - "brent-kung" : logarithmic depth (twice Kogge-Stone's), linear number of gates
+
+        carry_in : bool
+            If set to `False`, there's no input carry `c`. Default to `True`.
+
+        Return
+        ----------
+        A `bool_circ` computing `a + b (+ c)`.
+
+        Raise
+        ----------
+        ValueError if `width` is lower than 1 or if `architecture` is unknown.
+        """
+        if width < 1:
+            raise ValueError("The width of an adder must be at least 1.")
+        if architecture not in ADDER_ARCHITECTURES:
+            raise ValueError(f"Unknown adder architecture '{architecture}', expected one of {ADDER_ARCHITECTURES}.")
+        circ = cls(open_digraph.empty(), validate=False)
+        a: list[int] = [circ.add_node(f"a{i}") for i in range(width)]
+        b: list[int] = [circ.add_node(f"b{i}") for i in range(width)]
+        c: list[int] = [circ.add_node("c")] if carry_in else []
+        circ.set_input_ids(a + b + c)
+        # the inputs must have a single child
+        a = [circ.add_node('', {i: 1}) for i in a]
+        b = [circ.add_node('', {i: 1}) for i in b]
+        carry: int | None = circ.add_node('', {c[0]: 1}) if carry_in else None
+
+        g: list[int] = [circ.gate('&', a[i], b[i]) for i in range(width)]
+        p: list[int] = [circ.gate('^', a[i], b[i]) for i in range(width)]
+        if architecture == "ripple":
+            carries: list[int | None] = circ.ripple_carries(g, p, carry)
+        elif architecture == "lookahead":
+            carries = circ.lookahead_carries(g, p, carry)
+        elif architecture == "kogge-stone":
+            carries = circ.prefix_carries(g, p, carry, cls.kogge_stone_spans(width))
+        else:
+            carries = circ.prefix_carries(g, p, carry, cls.brent_kung_spans(width))
+
+        r: list[int] = [p[i] if carries[i] is None else circ.gate('^', p[i], carries[i]) for i in range(width)]
+        outputs: list[int] = [circ.add_node(f"r{i}", {circ.fanout(r[i]): 1}) for i in range(width)]
+        outputs += [circ.add_node("c'", {circ.fanout(carries[width]): 1})]
+        circ.set_output_ids(outputs)
+        # the prefix networks compute a few (G, P) pairs that no carry needs
+        circ.sweep()
+        return circ
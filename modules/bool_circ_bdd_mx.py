@@ -0,0 +1,82 @@
+from modules.bdd_manager import bdd_manager, FALSE, TRUE
+from modules.compiled_circ import compiled_circ, OP_CONST1, OP_NOT, OP_AND, OP_OR, OP_XOR
+
+
+class bool_circ_bdd_mx:
+    def bdd_order(self) -> list[int]:
+        """
+        Static variable ordering : a depth-first search from each output (in order) through the parents,
+        the deepest parents (see `node_depth`) being visited first. The inputs are ordered by first visit,
+        so that the inputs of a cone end up next to each other.
+
+        Return
+        ----------
+        The positions of the inputs (see `source_ids`), from the root of the BDDs to their leaves.
+        """
+        sources: list[int] = self.source_ids()
+        position: dict[int, int] = {identif: k for k, identif in enumerate(sources)}
+        order: list[int] = []
+        seen: set[int] = set()
+        for o in self.outputs:
+            stack: list[int] = [o]
+            while stack != []:
+                u: int = stack.pop()
+                if u in seen:
+                    continue
+                seen.add(u)
+                if u in position:
+                    order += [position[u]]
+                # pushed shallowest first, so that the deepest parent is visited first
+                stack += sorted((p for p in self.nodes[u].get_parents() if p not in seen),
+                                key=lambda p: (self.node_depth(p), -p))
+        return order + [k for k, identif in enumerate(sources) if identif not in seen]
+
+    def to_bdd(self, manager: bdd_manager | None = None) -> tuple[bdd_manager, list[int]]:
+        """
+        Build the reduced ordered BDD of every output, the variable `k` standing for the input `k` (see `source_ids`).
+
+        Parameters
+        ----------
+        manager : bdd_manager | None
+            The manager to build the BDDs in, over as many variables as this circuit has inputs. Since BDDs are canonical,
+            circuits built in the same manager compute the same function if and only if they give the same nodes.
+            Default to a new manager, ordered by `bdd_order`.
+
+        Return
+        ----------
+        The manager, and the BDD of each output.
+
+        Raise
+        ----------
+        ValueError if `manager` doesn't have as many variables as this circuit has inputs.
+        """
+        prog: compiled_circ = self.compile()
+        if manager is None:
+            manager = bdd_manager(len(prog.inputs), self.bdd_order())
+        elif manager.n_vars != len(prog.inputs):
+            raise ValueError(
+                f"The manager has {manager.n_vars} variables, the circuit {len(prog.inputs)} inputs.")
+        f: list[int] = [FALSE] * prog.n_slots
+        for k, slot in enumerate(prog.input_slots):
+            f[slot] = manager.var(k)
+        for op, dst, args in prog.program:
+            if op == OP_NOT:
+                f[dst] = manager.neg(f[args[0]])
+            elif op == OP_AND:
+                res: int = TRUE
+                for a in args:
+                    res = manager.conj(res, f[a])
+                f[dst] = res
+            elif op == OP_OR:
+                res = FALSE
+                for a in args:
+                    res = manager.disj(res, f[a])
+                f[dst] = res
+            elif op == OP_XOR:
+                res = FALSE
+                for a in args:
+                    res = manager.xor(res, f[a])
+                f[dst] = res
+            else:
+                f[dst] = TRUE if op == OP_CONST1 else FALSE
+        return manager, [f[slot] for slot in prog.output_slots]
@@ -0,0 +1,149 @@
+import random
+
+from modules.compiled_circ import compiled_circ, OP_CONST0, OP_CONST1, OP_NOT, OP_AND, OP_OR, OP_XOR
+from modules.sat_solver import sat_solver
+
+# number of random input vectors simulated to find the candidate equivalences (and the easy counterexamples)
+SWEEP_PATTERNS: int = 256
+
+
+def tseitin(prog: compiled_circ, solver: sat_solver, inputs: list[int]) -> list[int]:
+    """
+    Tseitin encoding : add to `solver` the clauses stating that each slot of `prog` holds the value computed by the program.
+    A negation or a gate with a single operand doesn't need any variable, it reuses (the negation of) its operand's literal.
+
+    Parameters
+    ----------
+    prog : compiled_circ
+        The program to encode.
+
+    solver : sat_solver
+        The solver the variables and clauses are added to.
+
+    inputs : list[int]
+        The variable of each input of `prog`.
+
+    Return
+    ----------
+    The literal holding the value of each slot.
+    """
+    true: int = solver.new_var()
+    solver.add_clause([true])
+    lit: list[int] = [0] * prog.n_slots
+    for slot, v in zip(prog.input_slots, inputs):
+        lit[slot] = v
+    for op, dst, args in prog.program:
+        ops: list[int] = [lit[a] for a in args]
+        if op == OP_CONST1 or (op == OP_AND and ops == []):
+            lit[dst] = true
+        elif op == OP_CONST0 or ops == []:
+            lit[dst] = -true
+        elif op == OP_NOT:
+            lit[dst] = -ops[0]
+        elif len(ops) == 1:
+            lit[dst] = ops[0]
+        elif op == OP_AND or op == OP_OR:
+            # x = a & b & ... is (~x | a) & (~x | b) & ... & (x | ~a | ~b | ...), the dual for '|'
+            s: int = 1 if op == OP_AND else -1
+            x: int = solver.new_var()
+            for a in ops:
+                solver.add_clause([-s * x, s * a])
+            solver.add_clause([s * x] + [-s * a for a in ops])
+            lit[dst] = x
+        elif op == OP_XOR:
+            acc: int = ops[0]
+            for b in ops[1:]:
+                x = solver.new_var()
+                solver.add_clause([-x, acc, b])
+                solver.add_clause([-x, -acc, -b])
+                solver.add_clause([x, -acc, b])
+                solver.add_clause([x, acc, -b])
+                acc = x
+            lit[dst] = acc
+    return lit
+
+
+def differ(solver: sat_solver, a: int, b: int, max_conflicts: int | None) -> bool | None:
+    """
+    Check whether the literals `a` and `b` may take different values. If they can't, the clauses stating
+    their equality are added to `solver`, which simplifies the next queries.
+
+    Return
+    ----------
+    `True` if they may (the assignment being in `solver.model`), `False` if they can't, `None` if `max_conflicts` was reached.
+    """
+    res: bool | None = solver.solve([a, -b], max_conflicts)
+    if res is False:
+        res = solver.solve([-a, b], max_conflicts)
+    if res is False:
+        solver.add_clause([-a, b])
+        solver.add_clause([a, -b])
+    return res
+
+
+class bool_circ_equiv_mx:
+    def equivalent(self, other, max_conflicts: int = 1000) -> tuple[bool, list[int] | None]:
+        """
+        Combinational equivalence checking : build a miter of both circuits (their inputs shared, their outputs compared
+        pairwise) in CNF, see `tseitin`, and solve it with `sat_solver`.
+        Random simulation first gives candidate pairs of equivalent nodes, which are proven in topological order
+        (SAT sweeping), so that the outputs are proven from the equivalences of their cones.
+
+        Parameters
+        ----------
+        other : bool_circ
+            The circuit to compare, with as many inputs and outputs (see `source_ids`), matched by position.
+
+        max_conflicts : int
+            The number of conflicts after which the proof of a candidate pair is abandoned. Default to 1000.
+            The proof of the outputs has no limit.
+
+        Return
+        ----------
+        `(True, None)` if both circuits compute the same function, `(False, counterexample)` otherwise,
+        `counterexample` being the value (0 or 1) of each input for which an output differs.
+
+        Raise
+        ----------
+        ValueError if the circuits don't have the same number of inputs or outputs.
+        """
+        a: compiled_circ = self.compile()
+        b: compiled_circ = other.compile()
+        if len(a.inputs) != len(b.inputs) or len(a.outputs) != len(b.outputs):
+            raise ValueError(
+                f"Can't compare a circuit with {len(a.inputs)} inputs and {len(a.outputs)} outputs "
+                f"to one with {len(b.inputs)} inputs and {len(b.outputs)} outputs.")
+
+        rng: random.Random = random.Random(0)
+        values: list[int] = [rng.getrandbits(SWEEP_PATTERNS) for _ in a.inputs]
+        sig_a: list[int] = a.simulate(values, SWEEP_PATTERNS)
+        sig_b: list[int] = b.simulate(values, SWEEP_PATTERNS)
+        for oa, ob in zip(a.output_slots, b.output_slots):
+            diff: int = sig_a[oa] ^ sig_b[ob]
+            if diff != 0:
+                k: int = (diff & -diff).bit_length() - 1
+                return False, [(v >> k) & 1 for v in values]
+
+        solver: sat_solver = sat_solver()
+        inputs: list[int] = [solver.new_var() for _ in a.inputs]
+        lit_a: list[int] = tseitin(a, solver, inputs)
+        lit_b: list[int] = tseitin(b, solver, inputs)
+
+        # the value of each simulated signature (or of its complement) in the first circuit
+        mask: int = (1 << SWEEP_PATTERNS) - 1
+        table: dict[int, int] = {}
+        for slot in a.input_slots + [dst for _, dst, _ in a.program]:
+            table.setdefault(sig_a[slot], lit_a[slot])
+            table.setdefault(sig_a[slot] ^ mask, -lit_a[slot])
+        for _, dst, _ in b.program:
+            candidate: int | None = table.get(sig_b[dst])
+            if candidate is None:
+                table[sig_b[dst]] = lit_b[dst]
+                table[sig_b[dst] ^ mask] = -lit_b[dst]
+            elif candidate != lit_b[dst]:
+                differ(solver, candidate, lit_b[dst], max_conflicts)
+
+        for oa, ob in zip(a.output_slots, b.output_slots):
+            if differ(solver, lit_a[oa], lit_b[ob], None):
+                return False, [int(solver.value(v)) for v in inputs]
+        return True, None
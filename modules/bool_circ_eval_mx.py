@@ -0,0 +1,132 @@
+from modules.node import node
+from modules.compiled_circ import compiled_circ, OP_CONST0, OP_CONST1, OP_NOT, OP_AND, OP_OR, OP_XOR
+
+# beyond this number of inputs, a truth table (2**inputs bits per output) is too large to be computed
+TRUTH_TABLE_MAX_INPUTS: int = 24
+
+
+class bool_circ_eval_mx:
+    def source_ids(self) -> list[int]:
+        """
+        Return the ids of the nodes whose values are given when evaluating this circuit :
+        the inputs first, then every other node without parent that isn't a constant (`'0'` or `'1'`), sorted by id.
+
+        Return
+        ----------
+        The ids of the nodes read as inputs during an evaluation, in order.
+        """
+        free: list[int] = sorted(k for k, n in self.nodes.items() if n.get_parents() == {}
+                                 and n.get_label() not in ('0', '1') and not self.is_input(k))
+        return self.inputs + free
+
+    def compile(self) -> compiled_circ:
+        """
+        Lower this circuit into a flat instruction list over integer slots, using a single topological sort.
+        Copy nodes (and any other node with a single parent, such as the outputs) don't produce any instruction,
+        they share their parent's slot.
+
+        Return
+        ----------
+        A `compiled_circ` evaluating this circuit.
+
+        Raise
+        ----------
+        ValueError if a node can't be interpreted as a gate.
+        """
+        sources: list[int] = self.source_ids()
+        slot: dict[int, int] = {identif: i for i, identif in enumerate(sources)}
+        n_slots: int = len(sources)
+        program: list[tuple[int, int, tuple[int, ...]]] = []
+
+        for layer in self.topo_sort():
+            for identif in sorted(layer):
+                if identif in slot:
+                    continue
+                n: node = self.nodes[identif]
+                label: str = n.get_label()
+                parents: dict[int, int] = n.get_parents()
+                if parents == {} and label in ('0', '1'):
+                    instr = (OP_CONST1 if label == '1' else OP_CONST0, n_slots, ())
+                elif label == '&' or label == '|':
+                    instr = (OP_AND if label == '&' else OP_OR, n_slots,
+                             tuple(slot[p] for p in parents))
+                elif label == '^':
+                    # x ^ x = 0 : only odd multiplicities matter
+                    instr = (OP_XOR, n_slots,
+                             tuple(slot[p] for p, m in parents.items() if m % 2 == 1))
+                elif label == '~' and n.indegree() == 1:
+                    instr = (OP_NOT, n_slots, (slot[n.get_parents_ids()[0]],))
+                elif n.indegree() == 1:
+                    slot[identif] = slot[n.get_parents_ids()[0]]
+                    continue
+                else:
+                    raise ValueError(
+                        f"The node {identif} (label '{label}') can't be evaluated.")
+                program += [instr]
+                slot[identif] = n_slots
+                n_slots += 1
+
+        return compiled_circ(n_slots, sources, list(self.outputs), [slot[i] for i in sources],
+                             [slot[o] for o in self.outputs], program, slot)
+
+    def truth_table(self, processes: int | None = None) -> list[int]:
+        """
+        Compute the truth table of every output : the inputs (see `source_ids`) are given their projection patterns
+        and each gate is evaluated once over `2**n` bits words. The result is cached until the circuit is modified.
+
+        Parameters
+        ----------
+        processes : int | None
+            If greater than 1, the `2**n` input vectors are split into ranges evaluated by a pool of `processes` processes.
+            Default to `None` (evaluated in this process).
+
+        Return
+        ----------
+        One integer per output, where bit `k` is the value of that output when each input `i` is set to the bit `i` of `k`.
+
+        Raise
+        ----------
+        ValueError if the circuit has more than `TRUTH_TABLE_MAX_INPUTS` inputs.
+        """
+        cached: list[int] | None = self._truth_table
+        if cached is not None:
+            return list(cached)
+        prog: compiled_circ = self.compile()
+        n: int = len(prog.inputs)
+        if n > TRUTH_TABLE_MAX_INPUTS:
+            raise ValueError(
+                f"A truth table over {n} inputs is too large (at most {TRUTH_TABLE_MAX_INPUTS} inputs).")
+
+        if processes is None or processes <= 1 or n == 0:
+            res: list[int] = prog.truth_table()
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            # as many ranges as processes, each of them a power of two
+            parts: int = 1
+            while parts < processes and parts < 1 << n:
+                parts *= 2
+            size: int = (1 << n) // parts
+            res = [0] * len(prog.outputs)
+            with ProcessPoolExecutor(processes) as pool:
+                chunks = pool.map(prog.truth_table, range(0, 1 << n, size), [size] * parts)
+                for k, chunk in enumerate(chunks):
+                    for o, table in enumerate(chunk):
+                        res[o] |= table << (k * size)
+        self._truth_table = res
+        return list(res)
+
+    def simulate_batch(self, inputs):
+        """
+        Simulate this circuit over a packed bit matrix using NumPy. See `compiled_circ.run_batch`.
+
+        Parameters
+        ----------
+        inputs : numpy.ndarray
+            A `(number of inputs, number of words)` matrix of `uint64`, the inputs being ordered as in `source_ids`.
+
+        Return
+        ----------
+        The `(number of outputs, number of words)` packed output matrix.
+        """
+        return self.compile().run_batch(inputs)
@@ -0,0 +1,244 @@
+import random
+from heapq import heappop, heappush
+
+from modules.node import node
+from modules.compiled_circ import compiled_circ
+
+# number of patterns simulated at once, one per bit of a word
+WORD: int = 64
+
+
+class fault_report:
+    def __init__(self, faults: list[tuple[int, int | None, int]], detected: dict[tuple[int, int | None, int], int], n_vectors: int) -> None:
+        """
+        Result of a fault simulation, see `bool_circ.fault_simulate`.
+
+        Parameters
+        ----------
+        faults : list[tuple[int, int | None, int]]
+            The simulated faults, see `bool_circ.faults`.
+
+        detected : dict[tuple[int, int | None, int], int]
+            The index of the first input vector detecting each detected fault.
+
+        n_vectors : int
+            The number of simulated input vectors.
+
+        Return
+        ----------
+        A new `fault_report`.
+        """
+        self.faults: list[tuple[int, int | None, int]] = faults
+        self.detected: dict[tuple[int, int | None, int], int] = detected
+        self.n_vectors: int = n_vectors
+
+    def coverage(self) -> float:
+        """
+        Return
+        ----------
+        The proportion of the faults detected by at least one vector, 1 if there's no fault.
+        """
+        return len(self.detected) / len(self.faults) if self.faults != [] else 1.0
+
+    def undetected(self) -> list[tuple[int, int | None, int]]:
+        """
+        Return
+        ----------
+        The faults that no vector detects.
+        """
+        return [f for f in self.faults if f not in self.detected]
+
+
+class bool_circ_fault_mx:
+    def faults(self, collapse: bool = True) -> list[tuple[int, int | None, int]]:
+        """
+        Enumerate the single stuck-at faults : the output of every node and every edge stuck at 0 or at 1.
+
+        Parameters
+        ----------
+        collapse : bool
+            If set to `True`, only one fault of each class of equivalent faults (detected by the same vectors) is kept :
+                - an edge from a node with a single child is equivalent to the node's output
+                - the output of a copy, an output node or a '~' is equivalent to (the negation of) its single input edge
+                - an input of a '&' stuck at 0 is equivalent to its output stuck at 0 (at 1 for '|')
+            Default to `True`.
+
+        Return
+        ----------
+        The faults as `(node id, child id, value)` triplets, `child id` being `None` for the output of the node
+        and the id of the child for the edge(s) between them.
+        """
+        res: list[tuple[int, int | None, int]] = []
+        for u, n in self.nodes.items():
+            res += [(u, None, 0), (u, None, 1)]
+            for c in n.get_children():
+                res += [(u, c, 0), (u, c, 1)]
+        if not collapse:
+            return res
+
+        # union-find over the faults, the first enumerated fault of a class representing it
+        parent: dict[tuple[int, int | None, int], tuple[int, int | None, int]] = {f: f for f in res}
+
+        def find(f: tuple[int, int | None, int]) -> tuple[int, int | None, int]:
+            while parent[f] != f:
+                parent[f] = parent[parent[f]]
+                f = parent[f]
+            return f
+
+        def union(f: tuple[int, int | None, int], g: tuple[int, int | None, int]) -> None:
+            f, g = find(f), find(g)
+            if f != g:
+                parent[max(f, g, key=index.__getitem__)] = min(f, g, key=index.__getitem__)
+
+        index: dict[tuple[int, int | None, int], int] = {f: k for k, f in enumerate(res)}
+        for u, n in self.nodes.items():
+            label: str = n.get_label()
+            if len(n.get_children()) == 1:
+                c: int = n.get_children_ids()[0]
+                for v in (0, 1):
+                    union((u, c, v), (u, None, v))
+            if n.indegree() == 1:
+                p: int = n.get_parents_ids()[0]
+                if label == '~':
+                    for v in (0, 1):
+                        union((u, None, 1 - v), (p, u, v))
+                elif label not in ('&', '|', '^'):
+                    for v in (0, 1):
+                        union((u, None, v), (p, u, v))
+            elif label == '&' or label == '|':
+                v = 0 if label == '&' else 1
+                for p in n.get_parents():
+                    union((p, u, v), (u, None, v))
+        return [f for f in res if find(f) == f]
+
+    def fault_value(self, identif: int, good: list[int], slots: dict[int, int], faulty: dict[int, int], edge: tuple[int, int, int] | None, mask: int) -> int:
+        """
+        Return
+        ----------
+        The value of the node with `identif` as id, its parents taking their `faulty` value if they have one,
+        their `good` one (through `slots`) otherwise, and the edge `(parent, child, value)` being stuck.
+        """
+        n: node = self.nodes[identif]
+        label: str = n.get_label()
+        acc: int = mask if label == '&' else 0
+        for p, m in n.get_parents().items():
+            if edge is not None and edge[0] == p and edge[1] == identif:
+                x: int = edge[2]
+            else:
+                x = faulty.get(p, good[slots[p]])
+            if label == '&':
+                acc &= x
+            elif label == '|':
+                acc |= x
+            elif label == '^':
+                if m % 2 == 1:
+                    acc ^= x
+            elif label == '~':
+                acc = x ^ mask
+            else:
+                # a copy, an output, or any other single parent node
+                acc = x
+        return acc
+
+    def propagate_fault(self, fault: tuple[int, int | None, int], good: list[int], slots: dict[int, int], mask: int) -> int:
+        """
+        Single fault propagation : evaluate the fanout cone of `fault` under this fault only, in topological order,
+        stopping wherever the faulty value equals the good one.
+
+        Parameters
+        ----------
+        fault : tuple[int, int | None, int]
+            The fault, see `faults`.
+
+        good : list[int]
+            The fault-free value of every slot, see `compiled_circ.simulate`.
+
+        slots : dict[int, int]
+            The slot of each node, see `compiled_circ.node_slots`.
+
+        mask : int
+            The patterns simulated, one per bit.
+
+        Return
+        ----------
+        The patterns for which an output differs from its fault-free value.
+        """
+        u, c, v = fault
+        stuck: int = mask if v else 0
+        faulty: dict[int, int] = {}
+        edge: tuple[int, int, int] | None = None
+        heap: list[tuple[int, int]] = []
+        detected: int = 0
+        if c is None:
+            if stuck == good[slots[u]]:
+                return 0
+            faulty[u] = stuck
+            if self.is_output(u):
+                detected |= stuck ^ good[slots[u]]
+            for k in self.nodes[u].get_children():
+                heappush(heap, (self.node_depth(k), k))
+        else:
+            edge = (u, c, stuck)
+            heappush(heap, (self.node_depth(c), c))
+
+        done: set[int] = set()
+        while heap != []:
+            _, k = heappop(heap)
+            if k in done:
+                continue
+            done.add(k)
+            value: int = self.fault_value(k, good, slots, faulty, edge, mask)
+            if value == good[slots[k]]:
+                continue
+            faulty[k] = value
+            if self.is_output(k):
+                detected |= value ^ good[slots[k]]
+            for child in self.nodes[k].get_children():
+                if child not in done:
+                    heappush(heap, (self.node_depth(child), child))
+        return detected
+
+    def fault_simulate(self, values: list[int] | None = None, width: int = 1024, faults: list[tuple[int, int | None, int]] | None = None) -> fault_report:
+        """
+        Parallel-pattern single-fault propagation : the input vectors are simulated `WORD` at a time,
+        the fault-free circuit once per word, then each remaining fault through its fanout cone (see `propagate_fault`).
+        A fault is dropped as soon as a vector detects it.
+
+        Parameters
+        ----------
+        values : list[int] | None
+            The input vectors, packed as in `compiled_circ.run` (the inputs being ordered as in `source_ids`).
+            Default to `width` random (but fixed) vectors.
+
+        width : int
+            The number of vectors packed in `values`. Default to 1024.
+
+        faults : list[tuple[int, int | None, int]] | None
+            The faults to simulate. Default to the collapsed faults, see `faults`.
+
+        Return
+        ----------
+        A `fault_report`.
+        """
+        prog: compiled_circ = self.compile()
+        if values is None:
+            rng: random.Random = random.Random(0)
+            values = [rng.getrandbits(width) for _ in prog.inputs]
+        faults = self.faults() if faults is None else faults
+        mask: int = (1 << WORD) - 1
+        remaining: list[tuple[int, int | None, int]] = list(faults)
+        detected: dict[tuple[int, int | None, int], int] = {}
+        for start in range(0, width, WORD):
+            if remaining == []:
+                break
+            word: int = mask if start + WORD <= width else (1 << (width - start)) - 1
+            good: list[int] = prog.simulate([(v >> start) & word for v in values], WORD)
+            left: list[tuple[int, int | None, int]] = []
+            for f in remaining:
+                diff: int = self.propagate_fault(f, good, prog.node_slots, mask) & word
+                if diff != 0:
+                    detected[f] = start + (diff & -diff).bit_length() - 1
+                else:
+                    left += [f]
+            remaining = left
+        return fault_report(faults, detected, width)
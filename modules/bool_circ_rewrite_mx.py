@@ -0,0 +1,244 @@
+from modules.node import node
+
+# labels the rewrite rules may modify, every other label (inputs, outputs, variables) is left untouched
+REWRITABLE: tuple[str, ...] = ('&', '|', '^', '~', '', '0', '1')
+
+
+def constant_value(circ, identif: int) -> int | None:
+    """
+    Return
+    ----------
+    0 or 1 if the node with `identif` as id is a constant, `None` otherwise.
+    """
+    n: node = circ.get_node_by_id(identif)
+    if n.get_parents() == {} and n.get_label() in ('0', '1') and not circ.is_input(identif):
+        return int(n.get_label())
+    return None
+
+
+def rewritable(circ, identif: int) -> node | None:
+    """
+    Return
+    ----------
+    The node with `identif` as id if the rules may modify it (it's a gate, a copy or a constant, and neither an input nor an output),
+    `None` otherwise.
+    """
+    n: node = circ.get_node_by_id(identif)
+    if n.get_label() in REWRITABLE and not circ.is_input(identif) and not circ.is_output(identif):
+        return n
+    return None
+
+
+def relabel(circ, identif: int, label: str) -> None:
+    """
+    Set the label of the node with `identif` as id, marking it as modified.
+    """
+    circ.writable(identif).set_label(label)
+    circ.invalidate_cache(identif)
+
+
+def remove_edges(circ, edges: list[tuple[int, int]]) -> None:
+    """
+    Remove every edge between each pair of `edges`, an input losing its last child getting a new copy node instead
+    (an input must have a child).
+    """
+    circ.remove_several_parallel_edges(edges)
+    for src, _ in edges:
+        if circ.is_input(src) and circ.get_node_by_id(src).get_children() == {}:
+            circ.add_node('', {src: 1})
+
+
+def rule_dead(circ, u: int) -> list[int] | None:
+    """
+    Remove a gate, copy or constant without child.
+    A copy directly below an input is kept, since an input must have a child.
+    """
+    n: node | None = rewritable(circ, u)
+    if n is None or n.get_children() != {}:
+        return None
+    parents: list[int] = n.get_parents_ids()
+    if n.get_label() == '' and n.indegree() == 1 and circ.is_input(parents[0]):
+        return None
+    remove_edges(circ, [(p, u) for p in parents])
+    circ.remove_node_by_id(u)
+    return [p for p in parents if not circ.is_input(p)]
+
+
+def rule_empty_gate(circ, u: int) -> list[int] | None:
+    """
+    A '&' without parent is the constant 1, a '|' or a '^' without parent is the constant 0.
+    """
+    n: node | None = rewritable(circ, u)
+    if n is None or n.get_parents() != {} or n.get_label() not in ('&', '|', '^'):
+        return None
+    relabel(circ, u, '1' if n.get_label() == '&' else '0')
+    return n.get_children_ids()
+
+
+def rule_idempotence(circ, u: int) -> list[int] | None:
+    """
+    x & x = x | x = x and x ^ x = 0 : reduce the multiplicity of the parents of '&', '|' (to 1) and '^' (modulo 2).
+    """
+    n: node | None = rewritable(circ, u)
+    if n is None or n.get_label() not in ('&', '|', '^'):
+        return None
+    for p, m in n.get_parents().items():
+        if m > 1:
+            if n.get_label() == '^' and m % 2 == 0:
+                remove_edges(circ, [(p, u)])
+            else:
+                circ.remove_parallel_edges(p, u)
+                circ.add_edge(p, u)
+            return [p]
+    return None
+
+
+def rule_gate_constant(circ, u: int) -> list[int] | None:
+    """
+    Propagate a constant parent through a '&', '|', '^' or '~'.
+    """
+    n: node | None = rewritable(circ, u)
+    if n is None or n.get_label() not in ('&', '|', '^', '~'):
+        return None
+    label: str = n.get_label()
+    for p in n.get_parents_ids():
+        v: int | None = constant_value(circ, p)
+        if v is None:
+            continue
+        if label == '~':
+            circ.remove_parallel_edges(p, u)
+            relabel(circ, u, str(1 - v))
+            return [p] + n.get_children_ids()
+        if (label == '&' and v == 0) or (label == '|' and v == 1):
+            # absorbing element
+            parents: list[int] = n.get_parents_ids()
+            remove_edges(circ, [(q, u) for q in parents])
+            relabel(circ, u, str(v))
+            return parents + n.get_children_ids()
+        m: int = n.get_parent_multiplicity(p)
+        circ.remove_parallel_edges(p, u)
+        if label == '^' and v == 1 and m % 2 == 1:
+            # x ^ 1 = ~x : the children of u are moved below a new '~', through a copy node if there are several
+            # (a '~' has a single child)
+            children: dict[int, int] = n.get_children().copy()
+            circ.remove_several_parallel_edges([(u, c) for c in children])
+            if list(children.values()) == [1]:
+                neg: int = circ.add_node('~', {u: 1}, children)
+                return [p, neg] + list(children)
+            neg = circ.add_node('~', {u: 1})
+            copy: int = circ.add_node('', {neg: 1}, children)
+            return [p, neg, copy] + list(children)
+        return [p]
+    return None
+
+
+def rule_copy_constant(circ, u: int) -> list[int] | None:
+    """
+    Replace a copy of a constant by one constant per child.
+    """
+    n: node | None = rewritable(circ, u)
+    if n is None or n.get_label() != '' or n.indegree() != 1:
+        return None
+    p: int = n.get_parents_ids()[0]
+    v: int | None = constant_value(circ, p)
+    if v is None:
+        return None
+    children: dict[int, int] = n.get_children().copy()
+    circ.remove_node_by_id(u)
+    new: list[int] = [circ.add_node(str(v), children={c: 1})
+                      for c, m in children.items() for _ in range(m)]
+    return [p] + new + list(children)
+
+
+def rule_single_input(circ, u: int) -> list[int] | None:
+    """
+    A '&', '|' or '^' with a single parent is a copy of it.
+    """
+    n: node | None = rewritable(circ, u)
+    if n is None or n.get_label() not in ('&', '|', '^') or n.indegree() != 1:
+        return None
+    relabel(circ, u, '')
+    return n.get_parents_ids() + n.get_children_ids()
+
+
+def rule_double_negation(circ, u: int) -> list[int] | None:
+    """
+    ~~x = x : the children of the second '~' are directly linked to x.
+    """
+    n: node | None = rewritable(circ, u)
+    if n is None or n.get_label() != '~' or n.indegree() != 1:
+        return None
+    p: int = n.get_parents_ids()[0]
+    pn: node | None = rewritable(circ, p)
+    if pn is None or pn.get_label() != '~' or pn.indegree() != 1 or pn.outdegree() != 1:
+        return None
+    gp: int = pn.get_parents_ids()[0]
+    children: dict[int, int] = n.get_children().copy()
+    circ.remove_nodes_by_id([u, p])
+    circ.add_edges([(gp, c, m) for c, m in children.items()])
+    return [gp] + list(children)
+
+
+def rule_copy_chain(circ, u: int) -> list[int] | None:
+    """
+    Merge a copy into its parent copy, or bypass a copy with a single child.
+    """
+    n: node | None = rewritable(circ, u)
+    if n is None or n.get_label() != '' or n.indegree() != 1:
+        return None
+    p: int = n.get_parents_ids()[0]
+    children: dict[int, int] = n.get_children().copy()
+    if rewritable(circ, p) is not None and circ.get_node_by_id(p).get_label() == '':
+        circ.remove_node_by_id(u)
+    elif n.outdegree() == 1:
+        circ.remove_node_by_id(u)
+    else:
+        return None
+    circ.add_edges([(p, c, m) for c, m in children.items()])
+    return [p] + list(children)
+
+
+class bool_circ_rewrite_mx:
+    # the built-in rules, tried in this order on each node of the worklist
+    rewrite_rules: list = [rule_dead, rule_empty_gate, rule_idempotence, rule_gate_constant,
+                           rule_copy_constant, rule_single_input, rule_double_negation, rule_copy_chain]
+
+    def simplify(self, rules: list | None = None) -> int:
+        """
+        Simplify this circuit in place, without changing the function it computes nor its inputs and outputs.
+        Every node starts in a worklist : the first rule that applies to a node rewrites the circuit,
+        then the nodes it touched are put back in the worklist, until no rule applies anywhere.
+
+        A rule is a function `rule(circ, identif) -> list[int] | None` which either modifies `circ` around the node `identif`
+        (through the graph's mutators) and returns the ids of the nodes it touched, or returns `None` without modifying anything.
+
+        Parameters
+        ----------
+        rules : list | None
+            The rules to apply, in order. Default to `rewrite_rules` (constant propagation, idempotence, involution,
+            copy of a constant, single input gates, copy chains and dead logic removal).
+            User rules may be added with `bool_circ.rewrite_rules + [rule]`.
+
+        Return
+        ----------
+        The number of rewrites applied.
+        """
+        rules = self.rewrite_rules if rules is None else rules
+        work: list[int] = list(self.nodes.keys())
+        queued: set[int] = set(work)
+        count: int = 0
+        while work != []:
+            u: int = work.pop()
+            queued.discard(u)
+            if u not in self.nodes:
+                continue
+            for rule in rules:
+                touched: list[int] | None = rule(self, u)
+                if touched is not None:
+                    count += 1
+                    for t in touched + [u]:
+                        if t not in queued and t in self.nodes:
+                            work += [t]
+                            queued.add(t)
+                    break
+        return count
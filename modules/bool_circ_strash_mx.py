@@ -0,0 +1,164 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from modules.node import node
+
+# labels of the nodes that may be shared : two such nodes with the same parents compute the same value
+HASHABLE: tuple[str, ...] = ('&', '|', '^', '~', '', '0', '1')
+
+
+class bool_circ_strash_mx:
+    def value_of(self, identif: int) -> int:
+        """
+        Return
+        ----------
+        The id of the node whose value the node with `identif` as id carries : the copy nodes are followed up to their source.
+        """
+        n: node = self.nodes[identif]
+        while n.get_label() == '' and n.indegree() == 1 and not self.is_input(identif) and not self.is_output(identif):
+            identif = n.get_parents_ids()[0]
+            n = self.nodes[identif]
+        return identif
+
+    def structural_key(self, label: str, parents: dict[int, int]) -> tuple[str, tuple[tuple[int, int], ...]]:
+        """
+        Return
+        ----------
+        The key of a gate in the unique table : its label and its sorted `(parent value, multiplicity)` pairs,
+        a parent being replaced by the node whose value it carries (see `value_of`).
+        """
+        return (label, tuple(sorted((self.value_of(p), m) for p, m in parents.items())))
+
+    def unique_table(self) -> dict[tuple[str, tuple[tuple[int, int], ...]], int]:
+        """
+        Return
+        ----------
+        The unique table `{structural key : node id}` of this circuit, built on its first use.
+        It is dropped by every modification (see `invalidate_cache`) but those made within `keeping_unique_table`,
+        such as the ones of `add_gate` ; its entries are checked again on every lookup anyway.
+        """
+        table: dict[tuple[str, tuple[tuple[int, int], ...]], int] | None = self._unique
+        if table is None:
+            table = {}
+            for k, n in self.nodes.items():
+                if n.get_label() in HASHABLE and not self.is_input(k) and not self.is_output(k):
+                    table.setdefault(self.structural_key(n.get_label(), n.get_parents()), k)
+            self._unique = table
+        return table
+
+    @contextmanager
+    def keeping_unique_table(self) -> Iterator[None]:
+        """
+        Context in which the modifications don't drop the unique table (see `invalidate_cache`),
+        for the modifications that keep it up to date : new gates registered in it, new inputs and outputs
+        (which are never hashed), copy nodes inserted by `fanout`. The contexts may be nested.
+        """
+        self._keep_unique += 1
+        try:
+            yield
+        finally:
+            self._keep_unique -= 1
+
+    def fanout(self, identif: int, multiplicity: int = 1) -> int:
+        """
+        Give a node carrying the value of the node with `identif` as id to which children can be added :
+        '&', '|' and '~' must have a single child, so they share their value through a copy node,
+        which is inserted below them if needed.
+
+        Parameters
+        ----------
+        identif : int
+            The id of the node to share.
+
+        multiplicity : int
+            The multiplicity of the edge that will be added below the result. Default to 1.
+
+        Return
+        ----------
+        `identif` itself, or the id of the copy node below it.
+        """
+        n: node = self.nodes[identif]
+        if n.get_label() not in ('&', '|', '~') or (n.get_children() == {} and multiplicity == 1):
+            return identif
+        if n.get_children() == {}:
+            return self.add_node('', {identif: 1})
+        c: int = n.get_children_ids()[0]
+        child: node = self.nodes[c]
+        if child.get_label() == '' and child.indegree() == 1 and not self.is_output(c):
+            return c
+        m: int = n.get_child_multiplicity(c)
+        self.remove_parallel_edges(identif, c)
+        return self.add_node('', {identif: 1}, {c: m})
+
+    def add_gate(self, label: str, parents: dict[int, int] | None = None) -> int:
+        """
+        Hash-consed construction : add a gate, unless an equivalent gate (same label, parents carrying the same values)
+        already exists.
+
+        Parameters
+        ----------
+        label : str
+            The label of the gate (see `bool_circ`).
+
+        parents : dict[int, int] | None
+            The nodes carrying the operands of the gate with their multiplicity, connected through `fanout`.
+            Default to no parent (for constants).
+
+        Return
+        ----------
+        The id of the new gate, or a node carrying the value of the existing equivalent one (see `fanout`).
+        """
+        parents = {} if parents is None else parents
+        table: dict[tuple[str, tuple[tuple[int, int], ...]], int] = self.unique_table()
+        key: tuple[str, tuple[tuple[int, int], ...]] = self.structural_key(label, parents)
+        identif: int | None = table.get(key)
+        with self.keeping_unique_table():
+            if identif is not None and identif in self.nodes:
+                n: node = self.nodes[identif]
+                if n.get_label() == label and not self.is_output(identif) \
+                        and self.structural_key(label, n.get_parents()) == key:
+                    return self.fanout(identif)
+            identif = self.add_node(label, {})
+            self.add_edges([(self.fanout(p, m), identif, m) for p, m in parents.items()])
+            table[key] = identif
+        return identif
+
+    def strash(self) -> int:
+        """
+        Structural hashing : merge every gate whose label and parents are those of another gate,
+        the children of the merged gate being moved to the one kept (through a copy node, see `fanout`).
+        The nodes are visited in topological order, so that merging two gates can make their children mergeable.
+        The inputs and outputs are never merged.
+
+        Return
+        ----------
+        The number of merged nodes.
+        """
+        table: dict[tuple[str, tuple[tuple[int, int], ...]], int] = {}
+        merged: int = 0
+        for layer in self.topo_sort():
+            for identif in sorted(layer):
+                n: node | None = self.nodes.get(identif)
+                if n is None or n.get_label() not in HASHABLE or self.is_input(identif) or self.is_output(identif):
+                    continue
+                key: tuple[str, tuple[tuple[int, int], ...]] = self.structural_key(
+                    n.get_label(), n.get_parents())
+                rep: int | None = table.get(key)
+                if rep is None:
+                    table[key] = identif
+                    continue
+                children: dict[int, int] = n.get_children().copy()
+                self.remove_node_by_id(identif)
+                target: int = self.fanout(rep)
+                for c, m in children.items():
+                    child: node = self.nodes[c]
+                    if child.get_label() == '' and child.indegree() == 0 and not self.is_output(c):
+                        # the copy node of the merged gate is merged as well
+                        self.add_edges([(target, gc, gm) for gc, gm in child.get_children().items()])
+                        self.remove_node_by_id(c)
+                        merged += 1
+                    else:
+                        self.add_edges([(target, c, m)])
+                merged += 1
+        self._unique = table
+        return merged
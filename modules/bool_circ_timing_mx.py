@@ -0,0 +1,134 @@
+from collections.abc import Iterator
+
+from modules.node import node
+
+# delay of each kind of node, the other labels (inputs, outputs, variables) being free
+DEFAULT_DELAYS: dict[str, float] = {'&': 1, '|': 1, '^': 1, '~': 1, '': 0, '0': 0, '1': 0}
+
+
+class timing_report:
+    def __init__(self, arrival: dict[int, float], required: dict[int, float], critical_path: list[int]) -> None:
+        """
+        Result of a static timing analysis, see `bool_circ.timing`.
+
+        Parameters
+        ----------
+        arrival : dict[int, float]
+            The time at which the value of each node is available.
+
+        required : dict[int, float]
+            The latest time at which the value of each node must be available for the outputs to meet their required time.
+
+        critical_path : list[int]
+            The ids of the nodes of a slowest path, from a source to an output.
+
+        Return
+        ----------
+        A new `timing_report`.
+        """
+        self.arrival: dict[int, float] = arrival
+        self.required: dict[int, float] = required
+        self.critical_path: list[int] = critical_path
+
+    def delay(self) -> float:
+        """
+        Return
+        ----------
+        The arrival time of the slowest output, 0 if there's none.
+        """
+        return self.arrival[self.critical_path[-1]] if self.critical_path != [] else 0
+
+    def slack(self, identif: int) -> float:
+        """
+        Return
+        ----------
+        How much later the value of the node with `identif` as id could be available without delaying any output
+        past its required time (negative if an output is already late).
+        """
+        return self.required[identif] - self.arrival[identif]
+
+    def slacks(self) -> dict[int, float]:
+        """
+        Return
+        ----------
+        The slack of every node, see `slack`.
+        """
+        return {k: r - self.arrival[k] for k, r in self.required.items()}
+
+
+class bool_circ_timing_mx:
+    def timing(self, delays: dict[str, float] | None = None, required: float | None = None) -> timing_report:
+        """
+        Static timing analysis : compute the arrival time, the required time and the slack of every node,
+        with one forward and one backward pass over the (cached) topological layers.
+        A node's value is available once its slowest parent's is, plus its own delay.
+
+        Parameters
+        ----------
+        delays : dict[str, float] | None
+            The delay of the nodes, by label, overriding `DEFAULT_DELAYS` (1 per gate, 0 for copies and constants).
+            Any other label has no delay.
+
+        required : float | None
+            The time at which every output must be available. Default to the arrival time of the slowest output,
+            so that the critical path has a slack of 0.
+
+        Return
+        ----------
+        A `timing_report`.
+        """
+        table: dict[str, float] = DEFAULT_DELAYS if delays is None else {**DEFAULT_DELAYS, **delays}
+        nodes: dict[int, node] = self.nodes
+        order: list[int] = [k for layer in self.level_index()[0] for k in layer]
+        delay: dict[int, float] = {k: table.get(n.get_label(), 0) for k, n in nodes.items()}
+
+        arrival: dict[int, float] = {}
+        for k in order:
+            t: float = 0
+            for p in nodes[k].get_parents():
+                if arrival[p] > t:
+                    t = arrival[p]
+            arrival[k] = t + delay[k]
+
+        critical: int | None = max(self.outputs, key=lambda o: (arrival[o], -o), default=None)
+        deadline: float = required if required is not None else (0 if critical is None else arrival[critical])
+
+        req: dict[int, float] = {}
+        for k in reversed(order):
+            # a node feeding no output isn't constrained beyond the deadline
+            t = deadline
+            for c in nodes[k].get_children():
+                if req[c] - delay[c] < t:
+                    t = req[c] - delay[c]
+            req[k] = t
+
+        path: list[int] = []
+        current: int | None = critical
+        while current is not None:
+            path += [current]
+            current = max(nodes[current].get_parents(), key=lambda p: (arrival[p], -p), default=None)
+        path.reverse()
+        return timing_report(arrival, req, path)
+
+    def critical_paths(self, k: int | None = None, delays: dict[str, float] | None = None) -> Iterator[tuple[list[int], float]]:
+        """
+        Enumerate the paths from a node without parent (an input or a constant) to an output, slowest first, lazily.
+        See `open_digraph.longuest_paths`.
+
+        Parameters
+        ----------
+        k : int | None
+            Stop after `k` paths. Default to `None`.
+
+        delays : dict[str, float] | None
+            The delay of the nodes, by label, see `timing`.
+
+        Return
+        ----------
+        An iterator over the pairs (path, delay), by decreasing delay. The delay of the first path is the one of `timing`.
+        """
+        table: dict[str, float] = DEFAULT_DELAYS if delays is None else {**DEFAULT_DELAYS, **delays}
+        weights: dict[str, float] = {label: table.get(label, 0) for label in {n.get_label() for n in self.nodes.values()}}
+        sources: list[int] = [identif for identif, n in self.nodes.items() if n.get_parents() == {}]
+        for path, length in self.longuest_paths(k, sources, self.outputs, weights):
+            yield path, length + weights[self.nodes[path[0]].get_label()]
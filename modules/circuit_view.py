@@ -0,0 +1,247 @@
+from collections.abc import Mapping, MutableMapping, Iterator
+from types import MappingProxyType
+
+from modules.node import node
+from modules.open_digraph import open_digraph
+from modules.open_digraph_path_mx import open_digraph_path_mx
+
+
+class cow_node_map(MutableMapping):
+    def __init__(self, base: Mapping[int, node]) -> None:
+        """
+        Copy-on-write `{node_id : node}` map over the nodes of a `circuit_view`.
+        Reading a node gives the node of `base` itself, which must not be modified : a node is only copied
+        the first time it is requested through `writable`, every other node being shared with `base`.
+
+        Parameters
+        ----------
+        base : Mapping[int, node]
+            The shared nodes, which are never modified.
+        """
+        self.base: Mapping[int, node] = base
+        self.own: dict[int, node] = {}
+        self.removed: set[int] = set()
+
+    def __getitem__(self, identif: int) -> node:
+        """Return the node with `identif` as id, shared with `base` if it wasn't modified."""
+        n: node | None = self.own.get(identif)
+        if n is None:
+            if identif in self.removed:
+                raise KeyError(identif)
+            return self.base[identif]
+        return n
+
+    def writable(self, identif: int) -> node:
+        """Return the node with `identif` as id, copying it from `base` if needed so that it can be modified."""
+        n: node | None = self.own.get(identif)
+        if n is None:
+            n = self[identif].copy()
+            self.own[identif] = n
+        return n
+
+    def __setitem__(self, identif: int, n: node) -> None:
+        """Set the node with `identif` as id."""
+        self.own[identif] = n
+        self.removed.discard(identif)
+
+    def __delitem__(self, identif: int) -> None:
+        """Remove the node with `identif` as id."""
+        if identif not in self:
+            raise KeyError(identif)
+        self.own.pop(identif, None)
+        if identif in self.base:
+            self.removed.add(identif)
+
+    def __contains__(self, identif) -> bool:
+        """Return `True` if there's a node with `identif` as id."""
+        return identif in self.own or (identif in self.base and identif not in self.removed)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the node ids."""
+        yield from self.own
+        for identif in self.base:
+            if identif not in self.own and identif not in self.removed:
+                yield identif
+
+    def __len__(self) -> int:
+        """Return the number of nodes."""
+        return sum(1 for _ in self)
+
+    def merged(self) -> dict[int, node]:
+        """
+        Return
+        ----------
+        A plain `dict` holding the current nodes, the untouched ones being shared with `base`.
+        """
+        d: dict[int, node] = dict(self.base)
+        for identif in self.removed:
+            d.pop(identif)
+        d.update(self.own)
+        return d
+
+
+class circuit_view(open_digraph_path_mx):
+    def __init__(self, inputs: tuple[int, ...], outputs: tuple[int, ...], nodes: dict[int, node]) -> None:
+        """
+        Create an immutable snapshot of a graph. `nodes` (and the nodes it holds) must never be modified afterwards :
+        they may be shared with other snapshots. Should be obtained through `circuit_view.from_open_digraph`
+        or `circuit_builder.freeze`.
+
+        Parameters
+        ----------
+        inputs : tuple[int, ...]
+            The ids of the input nodes.
+
+        outputs : tuple[int, ...]
+            The ids of the output nodes.
+
+        nodes : dict[int, node]
+            The nodes of the graph.
+
+        Return
+        ----------
+        A new `circuit_view`.
+        """
+        self.inputs: tuple[int, ...] = inputs
+        self.outputs: tuple[int, ...] = outputs
+        self._nodes: dict[int, node] = nodes
+        self.nodes: Mapping[int, node] = MappingProxyType(nodes)
+        self._hash: int | None = None
+        # the snapshot is immutable, so the levels never need to be invalidated
+        self._topo_cache: tuple[list[set[int]], dict[int, int]] | None = None
+
+    @classmethod
+    def from_open_digraph(cls, g: open_digraph):
+        """
+        Take a snapshot of `g`. This is the only deep copy : every later copy shares its nodes.
+
+        Parameters
+        ----------
+        g : open_digraph
+            The graph to freeze.
+
+        Return
+        ----------
+        A `circuit_view` of `g`.
+        """
+        return cls(tuple(g.inputs), tuple(g.outputs), {k: n.copy() for k, n in g.nodes.items()})
+
+    def __hash__(self) -> int:
+        """Return the hash of this snapshot, computed once."""
+        if self._hash is None:
+            self._hash = hash((self.inputs, self.outputs, frozenset(
+                (k, n.get_label(), frozenset(n.get_parents().items()), frozenset(n.get_children().items())) for k, n in self._nodes.items())))
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        """Returns `True` if both snapshots are equal."""
+        if self is other:
+            return True
+        if not isinstance(other, circuit_view) or hash(self) != hash(other):
+            return False
+        return self.inputs == other.inputs and self.outputs == other.outputs and self._nodes == other._nodes
+
+    def __str__(self) -> str:
+        """
+        Return
+        ----------
+        The string representation of that snapshot.
+        """
+        s: str = f"inputs : {list(self.inputs)} | outputs : {list(self.outputs)}\n"
+        for _, v in self._nodes.items():
+            s += str(v) + "\n"
+        return s
+
+    def get_input_ids(self) -> list[int]:
+        """See `open_digraph.get_input_ids`."""
+        return list(self.inputs)
+
+    def get_output_ids(self) -> list[int]:
+        """See `open_digraph.get_output_ids`."""
+        return list(self.outputs)
+
+    def get_node_ids(self) -> list[int]:
+        """See `open_digraph.get_node_ids`."""
+        return list(self._nodes.keys())
+
+    def get_node_by_id(self, identif: int) -> node:
+        """See `open_digraph.get_node_by_id`. The returned node must not be modified."""
+        return self._nodes[identif]
+
+    def __getitem__(self, identif: int) -> node:
+        """See `open_digraph.get_node_by_id`. The returned node must not be modified."""
+        return self._nodes[identif]
+
+    def copy(self):
+        """
+        Return
+        ----------
+        This snapshot itself : being immutable, it can be shared.
+        """
+        return self
+
+    def edit(self):
+        """
+        Start a modification of this snapshot, without modifying it.
+
+        Return
+        ----------
+        A `circuit_builder` whose nodes are shared with this snapshot until they are modified.
+        """
+        return circuit_builder(self)
+
+    def thaw(self) -> open_digraph:
+        """
+        Return
+        ----------
+        A mutable `open_digraph` deep copy of this snapshot.
+        """
+        return open_digraph(list(self.inputs), list(self.outputs), [n.copy() for n in self._nodes.values()])
+
+
+class circuit_builder(open_digraph):
+    def __init__(self, view: circuit_view) -> None:
+        """
+        Create a mutable graph starting from the snapshot `view`. Every mutator of `open_digraph` is available,
+        the nodes of `view` being copied one by one, when a mutator modifies them (see `open_digraph.writable`).
+        The nodes that are read (`get_node_by_id`, `nodes`) may be shared with `view` and must not be modified directly.
+        Should be obtained through `circuit_view.edit`.
+
+        Parameters
+        ----------
+        view : circuit_view
+            The starting snapshot.
+
+        Return
+        ----------
+        A new `circuit_builder`.
+        """
+        super().__init__(list(view.inputs), list(view.outputs), [])
+        self.nodes = cow_node_map(view._nodes)
+        self._next_id = max(view._nodes, default=-1) + 1
+        # the snapshot was never validated
+        self._dirty = set(view._nodes)
+
+    def freeze(self) -> circuit_view:
+        """
+        Take a snapshot of the current state. The nodes that weren't modified are shared with the previous snapshot.
+        The builder may still be used afterwards.
+
+        Return
+        ----------
+        A `circuit_view` of the current state.
+        """
+        nodes: dict[int, node] = self.nodes.merged() if isinstance(
+            self.nodes, cow_node_map) else dict(self.nodes)
+        view: circuit_view = circuit_view(tuple(self.inputs), tuple(self.outputs), nodes)
+        # the nodes now belong to the snapshot : copy them again before any modification
+        self.nodes = cow_node_map(view._nodes)
+        return view
+
+    def copy(self):
+        """
+        Return
+        ----------
+        A new `circuit_builder` starting from the current state, sharing every node with this one.
+        """
+        return self.freeze().edit()
@@ -0,0 +1,224 @@
+OP_CONST0: int = 0
+OP_CONST1: int = 1
+OP_NOT: int = 2
+OP_AND: int = 3
+OP_OR: int = 4
+OP_XOR: int = 5
+
+
+def projection(i: int, width: int) -> int:
+    """
+    Return
+    ----------
+    The `width` bits pattern whose bit `k` is the bit `i` of `k` : the values of the input `i`
+    when enumerating every input vector in order.
+    """
+    period: int = 1 << i
+    if period >= width:
+        return 0
+    # `period` zeros then `period` ones, doubled until `width` bits are covered
+    res: int = ((1 << period) - 1) << period
+    length: int = 2 * period
+    while length < width:
+        res |= res << length
+        length *= 2
+    return res & ((1 << width) - 1)
+
+
+class compiled_circ:
+    def __init__(self, n_slots: int, inputs: list[int], outputs: list[int], input_slots: list[int], output_slots: list[int], program: list[tuple[int, int, tuple[int, ...]]], node_slots: dict[int, int] | None = None) -> None:
+        """
+        Create a compiled program from its instruction list. Should be obtained through `bool_circ.compile`.
+
+        Parameters
+        ----------
+        n_slots : int
+            The number of integer slots used by the program.
+
+        inputs : list[int]
+            The ids of the nodes read as inputs, in the order the input vectors are given.
+
+        outputs : list[int]
+            The ids of the output nodes, in the order the results are returned.
+
+        input_slots : list[int]
+            The slot written by each input.
+
+        output_slots : list[int]
+            The slot read by each output.
+
+        program : list[tuple[int, int, tuple[int, ...]]]
+            The instruction list, as `(opcode, destination slot, source slots)` triplets.
+
+        node_slots : dict[int, int] | None
+            The slot holding the value of each node of the circuit. Default to `None` (unknown).
+
+        Return
+        ----------
+        A new compiled program.
+        """
+        self.n_slots: int = n_slots
+        self.inputs: list[int] = inputs
+        self.outputs: list[int] = outputs
+        self.input_slots: list[int] = input_slots
+        self.output_slots: list[int] = output_slots
+        self.program: list[tuple[int, int, tuple[int, ...]]] = program
+        self.node_slots: dict[int, int] = {} if node_slots is None else node_slots
+
+    def __len__(self) -> int:
+        """
+        Return
+        ----------
+        The number of instructions of this program.
+        """
+        return len(self.program)
+
+    def simulate(self, values: list[int], width: int = 64) -> list[int]:
+        """
+        Evaluate `width` input vectors at once, keeping the value of every slot. Bit `k` of `values[i]` is the value of the input `i` in the vector `k`.
+        `width` may be as large as wanted, Python integers being unbounded.
+
+        Parameters
+        ----------
+        values : list[int]
+            One integer per input, each holding `width` packed bits.
+
+        width : int
+            The number of vectors packed in each integer. Default to 64.
+
+        Return
+        ----------
+        The content of every slot, where bit `k` is the value of that slot for the vector `k`.
+        """
+        if len(values) != len(self.input_slots):
+            raise ValueError(
+                f"The program expects {len(self.input_slots)} inputs, got {len(values)}.")
+        mask: int = (1 << width) - 1
+        s: list[int] = [0] * self.n_slots
+        for slot, v in zip(self.input_slots, values):
+            s[slot] = v & mask
+
+        for op, dst, args in self.program:
+            if op == OP_AND:
+                v = mask
+                for a in args:
+                    v &= s[a]
+            elif op == OP_OR:
+                v = 0
+                for a in args:
+                    v |= s[a]
+            elif op == OP_XOR:
+                v = 0
+                for a in args:
+                    v ^= s[a]
+            elif op == OP_NOT:
+                v = s[args[0]] ^ mask
+            elif op == OP_CONST1:
+                v = mask
+            else:
+                v = 0
+            s[dst] = v
+
+        return s
+
+    def run(self, values: list[int], width: int = 64) -> list[int]:
+        """
+        Evaluate `width` input vectors at once. See `simulate`.
+
+        Return
+        ----------
+        One integer per output, where bit `k` is the value of that output for the vector `k`.
+        """
+        s: list[int] = self.simulate(values, width)
+        return [s[slot] for slot in self.output_slots]
+
+    def evaluate(self, bits: list[int]) -> list[int]:
+        """
+        Evaluate a single input vector.
+
+        Parameters
+        ----------
+        bits : list[int]
+            The value (0 or 1) of each input.
+
+        Return
+        ----------
+        The value (0 or 1) of each output.
+        """
+        return self.run([b & 1 for b in bits], 1)
+
+    def truth_table(self, start: int = 0, size: int | None = None) -> list[int]:
+        """
+        Evaluate the input vectors `start, ..., start + size - 1`, where the value of the input `i` in the vector `k`
+        is the bit `i` of `k`, in a single `run`.
+
+        Parameters
+        ----------
+        start : int
+            The first vector, a multiple of `size`. Default to 0.
+
+        size : int | None
+            The number of vectors, a power of two. Default to all of them (`2**number of inputs`).
+
+        Return
+        ----------
+        One integer per output, where bit `k` is the value of that output for the vector `start + k`.
+        """
+        n: int = len(self.input_slots)
+        size = 1 << n if size is None else size
+        mask: int = (1 << size) - 1
+        # the inputs whose bit doesn't change within the range are constant
+        values: list[int] = [projection(i, size) if 1 << i < size else (mask if start >> i & 1 else 0) for i in range(n)]
+        return self.run(values, size)
+
+    def run_batch(self, inputs, chunk: int = 4096):
+        """
+        Evaluate a packed bit matrix using NumPy : row `i` holds the input `i`, bit `k` of word `w` being the value of
+        that input in the vector `64*w + k`. Each instruction runs as one vectorized operation over a block of columns.
+        Requires NumPy.
+
+        Parameters
+        ----------
+        inputs : numpy.ndarray
+            A `(number of inputs, number of words)` matrix of `uint64`.
+
+        chunk : int
+            The number of words evaluated per block, to keep the working set small. Default to 4096.
+
+        Return
+        ----------
+        A `(number of outputs, number of words)` matrix of `uint64`, packed the same way.
+        """
+        import numpy as np
+
+        inputs = np.asarray(inputs, dtype=np.uint64)
+        if inputs.ndim != 2 or inputs.shape[0] != len(self.input_slots):
+            raise ValueError(
+                f"The program expects a matrix with {len(self.input_slots)} rows, got shape {inputs.shape}.")
+        n_words: int = inputs.shape[1]
+        res = np.empty((len(self.output_slots), n_words), dtype=np.uint64)
+        ones = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+        for start in range(0, n_words, chunk):
+            end: int = min(start + chunk, n_words)
+            s = np.empty((self.n_slots, end - start), dtype=np.uint64)
+            s[self.input_slots] = inputs[:, start:end]
+            for op, dst, args in self.program:
+                out = s[dst]
+                if op == OP_NOT:
+                    np.invert(s[args[0]], out=out)
+                elif op == OP_CONST1 or (op == OP_AND and args == ()):
+                    out.fill(ones)
+                elif op == OP_CONST0 or args == ():
+                    out.fill(0)
+                else:
+                    f = np.bitwise_and if op == OP_AND else np.bitwise_or if op == OP_OR else np.bitwise_xor
+                    if len(args) == 1:
+                        np.copyto(out, s[args[0]])
+                    else:
+                        f(s[args[0]], s[args[1]], out=out)
+                        for a in args[2:]:
+                            f(out, s[a], out=out)
+            res[:, start:end] = s[self.output_slots]
+
+        return res
@@ -0,0 +1,366 @@
+import sys
+from array import array
+from collections.abc import Mapping, Iterator
+
+from modules.node import node
+from modules.open_digraph_path_mx import open_digraph_path_mx
+
+
+def narrow_array(values: list[int]) -> array:
+    """
+    Parameters
+    ----------
+    values : list[int]
+        Non-negative integers.
+
+    Return
+    ----------
+    An `array` of `values` using the narrowest unsigned item size that holds all of them.
+    """
+    top: int = max(values, default=0)
+    for typecode in ('B', 'H', 'I'):
+        if top < 1 << 8 * array(typecode).itemsize:
+            return array(typecode, values)
+    return array('Q', values)
+
+
+class csr_adjacency(Mapping):
+    __slots__ = ("ids", "targets", "mult", "start", "end")
+
+    def __init__(self, ids: array, targets: array, mult: array, start: int, end: int) -> None:
+        """
+        Read-only `{node_id : multiplicity}` view over the row `[start, end)` of a compressed sparse row buffer.
+
+        Parameters
+        ----------
+        ids : array
+            Maps each dense index to its node id.
+
+        targets : array
+            The dense indices of the neighbours.
+
+        mult : array
+            The multiplicity of each edge.
+
+        start : int
+            The first position of the row.
+
+        end : int
+            The position following the last one of the row.
+        """
+        self.ids: array = ids
+        self.targets: array = targets
+        self.mult: array = mult
+        self.start: int = start
+        self.end: int = end
+
+    def __getitem__(self, identif: int) -> int:
+        """Return the multiplicity of the edge with the node `identif`."""
+        for k in range(self.start, self.end):
+            if self.ids[self.targets[k]] == identif:
+                return self.mult[k]
+        raise KeyError(identif)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the ids of the neighbours."""
+        return (self.ids[self.targets[k]] for k in range(self.start, self.end))
+
+    def __len__(self) -> int:
+        """Return the number of distinct neighbours."""
+        return self.end - self.start
+
+    def __repr__(self) -> str:
+        """Return the representation of the equivalent `dict`."""
+        return repr(dict(self))
+
+
+class csr_node:
+    __slots__ = ("graph", "index")
+
+    def __init__(self, graph, index: int) -> None:
+        """
+        Read-only view of the node stored at the dense index `index` of a `csr_digraph`,
+        providing the getters of `node`.
+
+        Parameters
+        ----------
+        graph : csr_digraph
+            The graph holding the node.
+
+        index : int
+            The dense index of the node.
+        """
+        self.graph = graph
+        self.index: int = index
+
+    def __str__(self) -> str:
+        """See `node.__str__`."""
+        return f"identif: {self.get_id()} | label : {self.get_label()}"
+
+    def __repr__(self) -> str:
+        """See `node.__repr__`."""
+        return f"identif : {self.get_id()} | label : {self.get_label()} | parents : {self.get_parents()} | children : {self.get_children()}"
+
+    def copy(self) -> node:
+        """
+        Return
+        ----------
+        A mutable `node` with the same parameters as this one.
+        """
+        return node(self.get_id(), self.get_label(), dict(self.get_parents()), dict(self.get_children()))
+
+    def get_id(self) -> int:
+        """See `node.get_id`."""
+        return self.graph.ids[self.index]
+
+    def get_label(self) -> str:
+        """See `node.get_label`."""
+        return self.graph.labels[self.graph.label_ids[self.index]]
+
+    def get_children(self) -> csr_adjacency:
+        """See `node.get_children`."""
+        g = self.graph
+        return csr_adjacency(g.ids, g.child_targets, g.child_mult, g.child_offsets[self.index], g.child_offsets[self.index + 1])
+
+    def get_parents(self) -> csr_adjacency:
+        """See `node.get_parents`."""
+        g = self.graph
+        return csr_adjacency(g.ids, g.parent_targets, g.parent_mult, g.parent_offsets[self.index], g.parent_offsets[self.index + 1])
+
+    def get_children_ids(self) -> list[int]:
+        """See `node.get_children_ids`."""
+        return list(self.get_children())
+
+    def get_parents_ids(self) -> list[int]:
+        """See `node.get_parents_ids`."""
+        return list(self.get_parents())
+
+    def get_child_multiplicity(self, identif: int) -> int:
+        """See `node.get_child_multiplicity`."""
+        return self.get_children().get(identif, -1)
+
+    def get_parent_multiplicity(self, identif: int) -> int:
+        """See `node.get_parent_multiplicity`."""
+        return self.get_parents().get(identif, -1)
+
+    def indegree(self) -> int:
+        """See `node.indegree`."""
+        g = self.graph
+        return sum(g.parent_mult[g.parent_offsets[self.index]:g.parent_offsets[self.index + 1]])
+
+    def outdegree(self) -> int:
+        """See `node.outdegree`."""
+        g = self.graph
+        return sum(g.child_mult[g.child_offsets[self.index]:g.child_offsets[self.index + 1]])
+
+    def degree(self) -> int:
+        """See `node.degree`."""
+        return self.indegree() + self.outdegree()
+
+
+class csr_node_map(Mapping):
+    __slots__ = ("graph",)
+
+    def __init__(self, graph) -> None:
+        """
+        Read-only `{node_id : node}` view over a `csr_digraph`, the nodes being created on access.
+
+        Parameters
+        ----------
+        graph : csr_digraph
+            The viewed graph.
+        """
+        self.graph = graph
+
+    def __getitem__(self, identif: int) -> csr_node:
+        """Return a view of the node with `identif` as id."""
+        return csr_node(self.graph, self.graph.position(identif))
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the node ids."""
+        return iter(self.graph.ids)
+
+    def __len__(self) -> int:
+        """Return the number of nodes."""
+        return len(self.graph.ids)
+
+    def __contains__(self, identif) -> bool:
+        """Return `True` if there's a node with `identif` as id."""
+        try:
+            self.graph.position(identif)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+
+class csr_digraph(open_digraph_path_mx):
+    def __init__(self, inputs: array, outputs: array, ids: array, labels: list[str], label_ids: array,
+                 child_offsets: array, child_targets: array, child_mult: array,
+                 parent_offsets: array, parent_targets: array, parent_mult: array) -> None:
+        """
+        Create an immutable, array-backed graph. Nodes are stored at dense indices `0 <= i < n`,
+        the edges of the node `i` being at the positions `offsets[i]` to `offsets[i+1]` of the `targets` and `mult` buffers
+        (compressed sparse row storage, once for the children and once for the parents).
+        Should be obtained through `open_digraph.to_csr`.
+
+        Parameters
+        ----------
+        inputs: array
+            The ids of the input nodes
+
+        outputs: array
+            The ids of the output nodes
+
+        ids : array
+            Maps each dense index to its node id.
+
+        labels : list[str]
+            The distinct labels of the graph.
+
+        label_ids : array
+            Maps each dense index to the position of its label in `labels`.
+
+        child_offsets, child_targets, child_mult : array
+            The children of each node.
+
+        parent_offsets, parent_targets, parent_mult : array
+            The parents of each node.
+
+        Return
+        ----------
+        A new `csr_digraph`.
+        """
+        self.inputs: array = inputs
+        self.outputs: array = outputs
+        self.ids: array = ids
+        # the dense index of each id : dense ids (the usual case) are looked up in an array indexed by `id - base`,
+        # using 4 bytes per id, sparse ones in a `dict`
+        self.base: int = min(ids, default=0)
+        span: int = max(ids, default=-1) - self.base + 1
+        if span <= 2 * len(ids):
+            self.index: array | dict[int, int] = array('i', [-1]) * span
+            for i, identif in enumerate(ids):
+                self.index[identif - self.base] = i
+        else:
+            self.index = {identif: i for i, identif in enumerate(ids)}
+        self.labels: list[str] = labels
+        self.label_ids: array = label_ids
+        self.child_offsets: array = child_offsets
+        self.child_targets: array = child_targets
+        self.child_mult: array = child_mult
+        self.parent_offsets: array = parent_offsets
+        self.parent_targets: array = parent_targets
+        self.parent_mult: array = parent_mult
+        self.nodes: csr_node_map = csr_node_map(self)
+        # the graph is immutable, so the levels never need to be invalidated
+        self._topo_cache: tuple[list[set[int]], dict[int, int]] | None = None
+
+    @classmethod
+    def from_open_digraph(cls, g):
+        """
+        Build the array-backed version of `g`.
+
+        Parameters
+        ----------
+        g : open_digraph
+            The graph to convert.
+
+        Return
+        ----------
+        A `csr_digraph` with the same nodes, edges, inputs and outputs as `g`.
+        """
+        ids: array = array('i', g.nodes.keys())
+        index: dict[int, int] = {identif: i for i, identif in enumerate(ids)}
+        # each distinct label is stored once, the nodes only keep its position
+        distinct: dict[str, int] = {}
+        label_ids: array = narrow_array([distinct.setdefault(n.get_label(), len(distinct))
+                                         for n in g.nodes.values()])
+        buffers: list[array] = []
+        for side in (node.get_children, node.get_parents):
+            # the buffers are filled as lists then converted, so that the arrays are not over-allocated
+            offsets: list[int] = [0]
+            targets: list[int] = []
+            mult: list[int] = []
+            for n in g.nodes.values():
+                adj: dict[int, int] = side(n)
+                targets.extend(index[k] for k in adj)
+                mult.extend(adj.values())
+                offsets.append(len(targets))
+            buffers += [array('i', offsets), array('i', targets), narrow_array(mult)]
+        return cls(array('i', g.inputs), array('i', g.outputs), ids, list(distinct), label_ids, *buffers)
+
+    def __len__(self) -> int:
+        """
+        Return
+        ----------
+        The number of nodes of this graph.
+        """
+        return len(self.ids)
+
+    def position(self, identif: int) -> int:
+        """
+        Return
+        ----------
+        The dense index of the node with `identif` as id.
+
+        Raise
+        ----------
+        KeyError if there's no such node.
+        """
+        if isinstance(self.index, dict):
+            return self.index[identif]
+        k: int = identif - self.base
+        if 0 <= k < len(self.index) and self.index[k] >= 0:
+            return self.index[k]
+        raise KeyError(identif)
+
+    def get_input_ids(self) -> list[int]:
+        """See `open_digraph.get_input_ids`."""
+        return list(self.inputs)
+
+    def get_output_ids(self) -> list[int]:
+        """See `open_digraph.get_output_ids`."""
+        return list(self.outputs)
+
+    def get_node_ids(self) -> list[int]:
+        """See `open_digraph.get_node_ids`."""
+        return list(self.ids)
+
+    def get_nodes(self) -> list[csr_node]:
+        """See `open_digraph.get_nodes`."""
+        return [csr_node(self, i) for i in range(len(self.ids))]
+
+    def get_node_by_id(self, identif: int) -> csr_node:
+        """See `open_digraph.get_node_by_id`."""
+        return self.nodes[identif]
+
+    def __getitem__(self, identif: int) -> csr_node:
+        """See `open_digraph.__getitem__`."""
+        return self.nodes[identif]
+
+    def edge_count(self) -> int:
+        """
+        Return
+        ----------
+        The number of edges of this graph, counted with their multiplicity.
+        """
+        return sum(self.child_mult)
+
+    def nbytes(self) -> int:
+        """
+        Estimate the memory held by this graph : the edge buffers, the ids and their index, the labels
+        (each distinct string once) and the input and output ids. The integer objects of a sparse index
+        are counted, even the small ones Python shares, so this is an upper bound.
+
+        Return
+        ----------
+        The number of bytes.
+        """
+        res: int = sum(sys.getsizeof(a) for a in (self.inputs, self.outputs, self.ids, self.label_ids,
+                                                   self.child_offsets, self.child_targets, self.child_mult,
+                                                   self.parent_offsets, self.parent_targets, self.parent_mult))
+        res += sys.getsizeof(self.index)
+        if isinstance(self.index, dict):
+            res += sum(sys.getsizeof(k) + sys.getsizeof(i) for k, i in self.index.items())
+        res += sys.getsizeof(self.labels) + sum(sys.getsizeof(label) for label in self.labels)
+        return res
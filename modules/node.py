@@ -1,4 +1,7 @@
 class node:
+    # no per-instance `__dict__` : a node only holds these four references
+    __slots__ = ("identif", "label", "parents", "children")
+
     def __init__(self, identity: int, label: str, parents: dict[int, int], children: dict[int, int]):
         """
         Parameters
@@ -208,7 +211,7 @@ class node:
             self.children[ids[i]] = self.children[k]
             self.children.pop(k)
 
-    def add_child_id(self, identif: int) -> None:
+    def add_child_id(self, identif: int, multiplicity: int = 1) -> None:
         """
         Add `identif` to the children ids list.
 
@@ -216,13 +219,13 @@ class node:
         ----------
         identif: int
             The id to add to the children ids list.
+
+        multiplicity: int
+            The number of times `identif` is added. Default to 1.
         """
-        if identif in self.children.keys():
-            self.children[identif] += 1
-        else:
-            self.children[identif] = 1
+        self.children[identif] = self.children.get(identif, 0) + multiplicity
 
-    def add_parent_id(self, identif: int) -> None:
+    def add_parent_id(self, identif: int, multiplicity: int = 1) -> None:
         """
         Add `identif` to the parents ids list.
 
@@ -230,11 +233,11 @@ class node:
         ----------
         identif: int
             The id to add to the parents ids list.
+
+        multiplicity: int
+            The number of times `identif` is added. Default to 1.
         """
-        if identif in self.parents.keys():
-            self.parents[identif] += 1
-        else:
-            self.parents[identif] = 1
+        self.parents[identif] = self.parents.get(identif, 0) + multiplicity
 
     def remove_parent_once(self, identif: int) -> None:
         """
@@ -245,7 +248,7 @@ class node:
         identif: int
             The id of the parent node that should be removed once.
         """
-        if identif in self.get_parents_ids():
+        if identif in self.parents:
             self.parents[identif] -= 1
             if self.parents[identif] <= 0:
                 self.parents.pop(identif)
@@ -259,12 +262,12 @@ class node:
         identif: int
             The id of the child node that should be removed once.
         """
-        if identif in self.get_children_ids():
+        if identif in self.children:
             self.children[identif] -= 1
             if self.children[identif] <= 0:
                 self.children.pop(identif)
 
-    def remove_parent_id(self, identif: int) -> None:
+    def remove_parent_id(self, identif: int, multiplicity: int | None = None) -> None:
         """
         Totally remove the parent node with `identif` as `id`, if there.
 
@@ -272,12 +275,18 @@ class node:
         ----------
         identif: int
             The id of the parent node that should be totally removed.
+
+        multiplicity: int | None
+            If given, only remove that many edges (the parent is removed once none is left). Default to `None`.
         """
-        if identif in self.parents:
-            for _ in range(self.parents[identif]):
-                self.remove_parent_once(identif)
+        if multiplicity is None:
+            self.parents.pop(identif, None)
+        elif identif in self.parents:
+            self.parents[identif] -= multiplicity
+            if self.parents[identif] <= 0:
+                self.parents.pop(identif)
 
-    def remove_child_id(self, identif: int) -> None:
+    def remove_child_id(self, identif: int, multiplicity: int | None = None) -> None:
         """
         Totally remove the child node with `identif` as `id`, if there.
 
@@ -285,10 +294,16 @@ class node:
         ----------
         identif: int
             The id of the child node that should be totally removed.
+
+        multiplicity: int | None
+            If given, only remove that many edges (the child is removed once none is left). Default to `None`.
         """
-        if identif in self.children:
-            for _ in range(self.children[identif]):
-                self.remove_child_once(identif)
+        if multiplicity is None:
+            self.children.pop(identif, None)
+        elif identif in self.children:
+            self.children[identif] -= multiplicity
+            if self.children[identif] <= 0:
+                self.children.pop(identif)
 
     def indegree(self) -> int:
         """
@@ -2,11 +2,13 @@ import random as random
 import os as os
 from math import ceil
 
-from modules.utils import split_line
+from modules.utils import parse_dot_line, random_edges
 from modules.node import node
 from modules.open_digraph_getter_setter_mx import open_digraph_getter_setter_mx
 from modules.open_digraph_compositions_mx import open_digraph_compositions_mx
 from modules.open_digraph_path_mx import open_digraph_path_mx
+from modules.csr_digraph import csr_digraph
+from modules.binary_format import write_binary, binary_digraph
 
 
 # for opened directed graph
@@ -33,6 +35,14 @@ class open_digraph(open_digraph_getter_setter_mx, open_digraph_compositions_mx,
         self.inputs: list[int] = inputs
         self.outputs: list[int] = outputs
         self.nodes: dict[int, node] = {node.get_id(): node for node in nodes}
+        # next id handed out by `new_id`
+        self._next_id: int = max(self.nodes, default=-1) + 1
+        # (layers, level of each node), see `open_digraph_path_mx.level_index`
+        self._topo_cache: tuple[list[set[int]], dict[int, int]] | None = None
+        # nodes modified since the last validation, see `is_well_formed`
+        self._dirty: set[int] = set(self.nodes.keys())
+        # topological order maintained by the incremental validations, see `open_digraph_path_mx.update_order`
+        self._order: dict[int, float] | None = None
 
     def __str__(self) -> str:
         """
@@ -70,7 +80,7 @@ class open_digraph(open_digraph_getter_setter_mx, open_digraph_compositions_mx,
         return cls([], [], [])
 
     @classmethod
-    def random(cls, n: int, bound: int, inputs: int = 0, outputs: int = 0, form: str = "free"):
+    def random(cls, n: int, bound: int, inputs: int = 0, outputs: int = 0, form: str = "free", density: float | None = None):
         """
         Return a graph matching all given conditions.
         All graphs will have `n` nodes, with maximum `bound` multiplicity,
@@ -112,6 +122,11 @@ class open_digraph(open_digraph_getter_setter_mx, open_digraph_compositions_mx,
         form: str
             A string representing the type of graph we want.
 
+        density: float | None
+            If set, each possible edge is drawn with this probability, with a multiplicity uniformly chosen between 1 and `bound`,
+            and the edges are sampled directly (see `utils.random_edges`) : the cost is linear in the number of nodes and edges.
+            Otherwise, a whole `n*n` random matrix is drawn. Default to `None`.
+
         Return
         ----------
         A graph matching all the criterias, if possible, otherwise returns an empty graph.
@@ -125,6 +140,19 @@ class open_digraph(open_digraph_getter_setter_mx, open_digraph_compositions_mx,
         elif inputs + outputs > n:
             print("\033[91m[ ! ] The sum of inputs and outputs requested is greater than the number of nodes, such a graph is impossible to create. Try with lower inputs or outputs values.\033[0m")
             return cls.empty()
+        elif density is not None and any(f in form for f in ("free", "symetric", "oriented", "dag")):
+            # same inputs and outputs as `matrix.to_graph`
+            input_ids: list[int] = [i for i in range(inputs if inputs != 0 else 2)]
+            output_ids: list[int] = [n-i-1 for i in range(outputs if outputs != 0 else 2)]
+            ins: set[int] = set(input_ids)
+            outs: set[int] = set(output_ids)
+            parents: list[dict[int, int]] = [{} for _ in range(n)]
+            children: list[dict[int, int]] = [{} for _ in range(n)]
+            for src, tgt, m in random_edges(n, bound, density, form):
+                if tgt not in ins and src not in outs:
+                    children[src][tgt] = children[src].get(tgt, 0) + m
+                    parents[tgt][src] = parents[tgt].get(src, 0) + m
+            return open_digraph(input_ids, output_ids, [node(i, f"{i}", parents[i], children[i]) for i in range(n)])
         elif "free" in form:
             return matrix.free(n, bound, "null_diag" in form).to_graph(inputs, outputs)
         elif "symetric" in form:
@@ -163,7 +191,8 @@ class open_digraph(open_digraph_getter_setter_mx, open_digraph_compositions_mx,
     @classmethod
     def from_dot_file(cls, path: str):
         """
-        Read a graph saved in a `.dot` file specified by `path`.
+        Read a graph saved in a `.dot` file specified by `path`. The file is read line by line,
+        an edge line may hold a `mult` attribute giving its multiplicity.
 
         Parameters
         ----------
@@ -173,25 +202,32 @@ class open_digraph(open_digraph_getter_setter_mx, open_digraph_compositions_mx,
         Return
         ----------
         Returns an `open_digraph` corresponding to this `.dot` representation.
+
+        Raise
+        ----------
+        ValueError if a line can't be parsed.
         """
         inputs: list[int] = []
         outputs: list[int] = []
         nodes: dict[int, node] = {}
         with open(path, "r") as f:
-            lines: list[str] = f.readlines()
-            for i, l in enumerate(lines):
-                if i != 0 and i != len(lines) - 1:
-                    if "->" not in l:
-                        name, label, t = split_line(l)
-                        nodes[int(name)] = node(int(name), label, {}, {})
-                        if t == "1":
-                            inputs += [int(name)]
-                        elif t == "2":
-                            outputs += [int(name)]
-                    else:
-                        temp: list[str] = l[:-2].split("->")
-                        nodes[int(temp[0])].add_child_id(int(temp[1]))
-                        nodes[int(temp[1])].add_parent_id(int(temp[0]))
+            for i, l in enumerate(f):
+                try:
+                    entry = parse_dot_line(l)
+                except ValueError as e:
+                    raise ValueError(f"{path}, line {i+1}: {e}") from None
+                if entry is None:
+                    continue
+                kind, a, b, c = entry
+                if kind == "node":
+                    nodes[a] = node(a, b, {}, {})
+                    if c == 1:
+                        inputs += [a]
+                    elif c == 2:
+                        outputs += [a]
+                else:
+                    nodes[a].add_child_id(b, c)
+                    nodes[b].add_parent_id(a, c)
         return open_digraph(inputs, outputs, list(nodes.values()))
 
     def copy(self):
@@ -204,9 +240,108 @@ class open_digraph(open_digraph_getter_setter_mx, open_digraph_compositions_mx,
         """
         return open_digraph([i for i in self.inputs], [o for o in self.outputs], [n.copy() for n in list(self.nodes.values())])
 
-    def save_as_dot_file(self, path: str, verbose: bool = False) -> None:
+    def subgraph(self, ids: set[int], inputs: list[int], outputs: list[int]):
+        """
+        Extract the subgraph induced by some nodes : the edges with an end outside of `ids` are dropped.
+
+        Parameters
+        ----------
+        ids : set[int]
+            The ids of the kept nodes.
+
+        inputs : list[int]
+            The input ids of the subgraph.
+
+        outputs : list[int]
+            The output ids of the subgraph.
+
+        Return
+        ----------
+        A new graph made of copies of the kept nodes.
+        """
+        nodes: list[node] = []
+        for k in ids:
+            n: node = self.get_node_by_id(k)
+            nodes += [node(k, n.get_label(), {p: m for p, m in n.get_parents().items() if p in ids},
+                           {c: m for c, m in n.get_children().items() if c in ids})]
+        return open_digraph(inputs, outputs, nodes)
+
+    def fanin_cone(self, output_ids: list[int] | None = None):
+        """
+        Slice the cone of influence of some outputs : every node they depend on, and nothing else.
+
+        Parameters
+        ----------
+        output_ids : list[int] | None
+            The ids of the outputs to keep. Default to every output.
+
+        Return
+        ----------
+        A new graph whose outputs are `output_ids` and whose inputs are the inputs of this graph they depend on.
+        """
+        output_ids = self.outputs if output_ids is None else output_ids
+        cone: set[int] = self.fanin_ids(output_ids)
+        return self.subgraph(cone, [i for i in self.inputs if i in cone], list(output_ids))
+
+    def fanout_cone(self, node_ids: list[int]):
+        """
+        Slice every node reachable from some nodes, the edges coming from the rest of the graph being dropped.
+
+        Parameters
+        ----------
+        node_ids : list[int]
+            The ids of the starting nodes.
+
+        Return
+        ----------
+        A new graph whose inputs and outputs are the inputs and outputs of this graph which belong to the slice.
+        """
+        cone: set[int] = self.fanout_ids(node_ids)
+        return self.subgraph(cone, [i for i in self.inputs if i in cone], [o for o in self.outputs if o in cone])
+
+    def sweep(self) -> int:
+        """
+        Remove every node from which no output can be reached. The inputs are always kept.
+
+        Return
+        ----------
+        The number of removed nodes.
+        """
+        cone: set[int] = self.fanin_ids(self.outputs)
+        dead: list[int] = [k for k in self.nodes if k not in cone and not self.is_input(k)]
+        self.remove_nodes_by_id(dead)
+        return len(dead)
+
+    def to_csr(self) -> csr_digraph:
+        """
+        Return an immutable array-backed (compressed sparse row) version of this graph,
+        using a few bytes per edge instead of two `dict` entries. See `csr_digraph`.
+
+        Return
+        ----------
+        A `csr_digraph` with the same nodes, edges, inputs and outputs.
+        """
+        return csr_digraph.from_open_digraph(self)
+
+    @classmethod
+    def from_csr(cls, g: csr_digraph):
+        """
+        Build a mutable graph from an array-backed one.
+
+        Parameters
+        ----------
+        g : csr_digraph
+            The graph to convert.
+
+        Return
+        ----------
+        A new graph with the same nodes, edges, inputs and outputs as `g`.
         """
-        Save the current graph to `path`.
+        return cls(list(g.inputs), list(g.outputs), [n.copy() for n in g.get_nodes()])
+
+    def save_as_dot_file(self, path: str, verbose: bool = False, multi_edges: bool = False) -> None:
+        """
+        Save the current graph to `path`. The file is written line by line through a buffer.
 
         The field `type` of each node will be :
             - 0 if it's a classic node
@@ -220,19 +355,69 @@ class open_digraph(open_digraph_getter_setter_mx, open_digraph_compositions_mx,
 
         verbose : bool
             If set to `True`, the id will be displayed below the label, otherwise only the label will be displayed.
+
+        multi_edges : bool
+            If set to `True`, an edge of multiplicity `m` is written `m` times (so that graphviz draws each of them),
+            otherwise it's written once, with a `mult` attribute. Default to `False`.
+        """
+        inputs: set[int] = set(self.inputs)
+        outputs: set[int] = set(self.outputs)
+
+        with open(path, "w", buffering=1 << 16) as f:
+            f.write("digraph G {\n")
+            # inputs and outputs first, so that their order is kept when reading the file
+            order: dict[int, None] = dict.fromkeys(self.inputs + self.outputs + list(self.nodes.keys()))
+            for identif in order:
+                n: node = self.nodes[identif]
+                t: int = 1 if identif in inputs else 2 if identif in outputs else 0
+                label: str = n.get_label().replace('"', '\\"')
+                f.write(rf'{identif} [label="{label}\nid : {n.get_id()}", type={t}];' + "\n" if verbose else
+                        f"{identif} [label=\"{label}\", type={t}];\n")
+            for identif, n in self.nodes.items():
+                for c, m in n.get_children().items():
+                    f.write(f"{identif}->{c};\n" * m if multi_edges or m == 1 else
+                            f"{identif}->{c} [mult={m}];\n")
+            f.write("}")
+
+    def save_binary(self, path: str) -> None:
+        """
+        Save the current graph to `path` in a compact, versioned binary format : labels are interned,
+        ids and multiplicities are varint-encoded and the nodes are indexed so that they can be read lazily.
+        See `modules.binary_format`.
+
+        Parameters
+        ----------
+        path : str
+            The path where the file will be saved.
         """
-        content: list[str] = []
-        nodeList: list[str] = []
+        write_binary(self, path)
 
-        for identif, n in self.nodes.items():
-            t: int = 1 if identif in self.inputs else 2 if identif in self.outputs else 0
-            nodeList += [rf'{identif} [label="{n.get_label()}\nid : {n.get_id()}", type={t}];' + "\n"] if verbose else [
-                f"{identif} [label=\"{n.get_label()}\", type={t}];\n"]
-            content += [f"{identif}->{c};\n"*m for c,
-                        m in n.get_children().items()]
+    @classmethod
+    def load_binary(cls, path: str, lazy: bool = False):
+        """
+        Read a graph saved with `save_binary`.
+
+        Parameters
+        ----------
+        path : str
+            The location of the file.
+
+        lazy : bool
+            If set to `True`, the file is mapped in memory and a read-only `binary_digraph` is returned,
+            each node being decoded on its first access. Default to `False`.
 
-        with open(path, "w") as f:
-            f.writelines(["digraph G {\n"] + nodeList + content + ["}"])
+        Return
+        ----------
+        Returns the `open_digraph` (or the `binary_digraph`) saved in that file.
+
+        Raise
+        ----------
+        ValueError if the file isn't in a supported format.
+        """
+        if lazy:
+            return binary_digraph(path)
+        with binary_digraph(path) as g:
+            return open_digraph(list(g.inputs), list(g.outputs), g.decode_all())
 
     def display(self, verbose: bool = False, name: str = "graph.png") -> None:
         """Display that current graph.
@@ -242,7 +427,7 @@ class open_digraph(open_digraph_getter_setter_mx, open_digraph_compositions_mx,
         verbose : bool
             If set to `True`, the id will be displayed below the label, otherwise only the label will be displayed.
         """
-        self.save_as_dot_file(f"temp/{name}.dot", verbose)
+        self.save_as_dot_file(f"temp/{name}.dot", verbose, multi_edges=True)
         print(f"Saving the graph at \"outputs/{name}\"...\n")
         os.system(f'dot.exe -Tpng -o "outputs/{name}" "temp/{name}.dot"')
         os.system(f'"{os.path.abspath(f"./outputs/{name}")}"')
@@ -274,7 +459,7 @@ class open_digraph(open_digraph_getter_setter_mx, open_digraph_compositions_mx,
                 mat[m[k]][m[c]] = mul
         return mat
 
-    def is_well_formed(self) -> bool:
+    def is_well_formed(self, incremental: bool = False) -> bool:
         """
         A graph is well formed if :
             - each input and output node is in the graph (is in the nodes `dict`)
@@ -283,37 +468,66 @@ class open_digraph(open_digraph_getter_setter_mx, open_digraph_compositions_mx,
             - each key in `nodes` point to a node whose `id` is that specific key
             - if `j` have `i` as child with a multiplicity of `m`, then `i` as `j` as parent with a multiplicity of `m`, and vice-versa
 
+        Every condition only involves a node and its neighbours, so only the nodes modified since the last successful
+        validation (the dirty nodes, see `invalidate_cache`) may need to be checked.
+
+        Parameters
+        ----------
+        incremental : bool
+            If set to `True`, only the dirty nodes are checked, otherwise every node is. Default to `False`.
+
         Return
         ----------
         Return `True` if the graph is well formed, `False` otherwise.
         """
-        node_ids: list[int] = self.get_node_ids()
-        # inputs check
-        for i in self.get_input_ids():
-            n: node = self.get_node_by_id(i)
-            if (i not in node_ids) or (n.get_parents_ids() != []) or (len(n.get_children_ids()) != 1) or (n.get_child_multiplicity(n.get_children_ids()[0]) != 1):
+        inputs: set[int] = set(self.inputs)
+        outputs: set[int] = set(self.outputs)
+        ids = self._dirty if incremental else self.nodes.keys() | inputs | outputs
+        for i in ids:
+            if not self.is_node_well_formed(i, inputs, outputs):
                 return False
+        self._dirty = set()
+        return True
 
-        # outputs check
-        for o in self.get_output_ids():
-            n: node = self.get_node_by_id(o)
-            if (o not in node_ids) or (n.get_children_ids() != []) or (len(n.get_parents_ids()) != 1) or (n.get_parent_multiplicity(n.get_parents_ids()[0]) != 1):
-                return False
+    def is_node_well_formed(self, identif: int, inputs: set[int], outputs: set[int]) -> bool:
+        """
+        Check the conditions of `is_well_formed` related to the node with `identif` as id.
+        A missing node is only accepted if it's neither an input nor an output.
 
-        # node's key point to a node whose id is that specific key check
-        for k, v in self.nodes.items():
-            if k != v.get_id():
-                return False
+        Parameters
+        ----------
+        identif : int
+            The id of the node to check.
 
-        # vice-versa check
-        for i, n in self.nodes.items():
-            for j, m in n.get_children().items():
-                if (i not in self.get_node_by_id(j).get_parents_ids()) or (m != self.get_node_by_id(j).get_parent_multiplicity(i)):
-                    return False
-            for j, m in n.get_parents().items():
-                if (i not in self.get_node_by_id(j).get_children_ids()) or (m != self.get_node_by_id(j).get_child_multiplicity(i)):
-                    return False
+        inputs : set[int]
+            The input ids of the graph.
+
+        outputs : set[int]
+            The output ids of the graph.
 
+        Return
+        ----------
+        Return `True` if this node is well formed, `False` otherwise.
+        """
+        n: node | None = self.nodes.get(identif)
+        if n is None:
+            return identif not in inputs and identif not in outputs
+        # node's key point to a node whose id is that specific key check
+        if n.get_id() != identif:
+            return False
+        # inputs check
+        if identif in inputs and (n.get_parents() != {} or list(n.get_children().values()) != [1]):
+            return False
+        # outputs check
+        if identif in outputs and (n.get_children() != {} or list(n.get_parents().values()) != [1]):
+            return False
+        # vice-versa check
+        for j, m in n.get_children().items():
+            if j not in self.nodes or self.nodes[j].get_parent_multiplicity(identif) != m:
+                return False
+        for j, m in n.get_parents().items():
+            if j not in self.nodes or self.nodes[j].get_child_multiplicity(identif) != m:
+                return False
         return True
 
     def assert_is_well_formed(self) -> None:
@@ -477,17 +691,7 @@ class matrix(object):
             [n-i-1 for i in range(
                 outputs if outputs != 0 else x)],
             [node(i, f"{i}", {}, {}) for i in range(n)])
-        for i in range(n):
-            for j in range(n):
-                G.add_edges([(i, j) for _ in range(self.matrix[i][j])])
-
-        for i in G.inputs:
-            for identif in G.get_node_by_id(i).get_parents_ids():
-                G.get_node_by_id(i).remove_parent_id(identif)
-                G.get_node_by_id(identif).remove_child_id(i)
-
-        for o in G.outputs:
-            for identif in G.get_node_by_id(o).get_children_ids():
-                G.get_node_by_id(o).remove_child_id(identif)
-                G.get_node_by_id(identif).remove_parent_id(o)
+        G.add_edges([(i, j, m) for i, row in enumerate(self.matrix) for j, m in enumerate(row) if m != 0])
+        G.remove_several_parallel_edges([(p, i) for i in G.inputs for p in G.get_node_by_id(i).get_parents_ids()]
+                                        + [(o, c) for o in G.outputs for c in G.get_node_by_id(o).get_children_ids()])
         return G
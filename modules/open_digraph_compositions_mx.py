@@ -32,7 +32,8 @@ class open_digraph_compositions_mx:
             The integer we'll add to every indice (may be negative).
         """
         d: dict[int, node] = {}
-        for no in self.nodes.values():
+        for identif in list(self.nodes):
+            no: node = self.writable(identif)
             no.set_id(no.get_id() + n)
             no.set_parents({k+n: v for k, v in no.get_parents().items()})
             no.set_children({k+n: v for k, v in no.get_children().items()})
@@ -40,6 +41,11 @@ class open_digraph_compositions_mx:
         self.nodes = d
         self.inputs = [i+n for i in self.inputs]
         self.outputs = [o+n for o in self.outputs]
+        self._next_id += n
+        self._dirty = {i+n for i in self._dirty}
+        if self._order is not None:
+            self._order = {i+n: v for i, v in self._order.items()}
+        self.invalidate_cache()
 
     def iparallel(self, g) -> int:
         """
@@ -60,8 +66,10 @@ class open_digraph_compositions_mx:
         self.shift_indices(n)
         for k, v in g.nodes.items():
             self.nodes[k] = v
-        self.inputs += g.inputs
-        self.outputs += g.outputs
+        self.inputs = self.inputs + g.inputs
+        self.outputs = self.outputs + g.outputs
+        self._next_id = max(self._next_id, g.max_id() + 1)
+        self.invalidate_cache(*g.nodes)
         return n
 
     def parallel(self, g):
@@ -101,12 +109,13 @@ class open_digraph_compositions_mx:
         tmp = f.copy()
         self.shift_indices(self.max_id() - tmp.min_id() + 1)
 
-        for i, out in enumerate(f.outputs):
-            tmp.nodes[out].add_child_id(self.inputs[i])
+        for out, inp in zip(f.outputs, self.inputs):
+            tmp.writable(out).add_child_id(inp)
 
         for k, v in tmp.nodes.items():
             self.nodes[k] = v
         self.set_input_ids(tmp.inputs)
+        self.invalidate_cache(*tmp.nodes)
 
     def compose(self, f):
         """
@@ -147,7 +156,7 @@ class open_digraph_compositions_mx:
         n2_node: node = self.get_node_by_id(n2)
         identif: int = self.add_node(new_label if new_label != None else n1_node.get_label(
         ), {}, n1_node.get_children().copy())
-        n: node = self.nodes[identif]
+        n: node = self.writable(identif)
 
         for k, v in n2_node.get_children().copy().items():
             for _ in range(v):
@@ -1,4 +1,5 @@
 from modules.node import node
+from modules.utils import edge_triples
 
 
 class open_digraph_getter_setter_mx:
@@ -6,7 +7,7 @@ class open_digraph_getter_setter_mx:
         """
         Return
         ----------
-        A list containing every input id of the graph.
+        A new list containing every input id of the graph.
         """
         return self.inputs
 
@@ -14,7 +15,7 @@ class open_digraph_getter_setter_mx:
         """
         Return
         ----------
-        A list containing every output id of the graph.
+        A new list containing every output id of the graph.
         """
         return self.outputs
 
@@ -87,6 +88,65 @@ class open_digraph_getter_setter_mx:
         """
         return [self.get_node_by_id(identif) for identif in ids]
 
+    def writable(self, identif: int) -> node:
+        """
+        Return the node with `identif` as id, to be modified. The mutators go through it, so that a graph sharing
+        its nodes with others (its `nodes` being a `cow_node_map`, see `circuit_builder`) copies a node before modifying it.
+        `invalidate_cache` must be called after the modification.
+
+        Parameters
+        ----------
+        identif : int
+            The id of the node to modify.
+
+        Return
+        ----------
+        The node with `identif` as id, owned by this graph.
+        """
+        if isinstance(self.nodes, dict):
+            return self.nodes[identif]
+        return self.nodes.writable(identif)
+
+    def is_input(self, identif: int) -> bool:
+        """
+        Return
+        ----------
+        `True` if the node with `identif` as id is an input.
+        """
+        return identif in self._input_ids
+
+    def is_output(self, identif: int) -> bool:
+        """
+        Return
+        ----------
+        `True` if the node with `identif` as id is an output.
+        """
+        return identif in self._output_ids
+
+    @property
+    def inputs(self) -> list[int]:
+        """
+        A new list of the ids of the input nodes. They are kept in an insertion-ordered `dict`
+        (for `is_input` and the removals in constant time), so modifying this list doesn't modify the graph :
+        use the mutators, or replace the inputs as a whole.
+        """
+        return list(self._input_ids)
+
+    @inputs.setter
+    def inputs(self, identifs: list[int]) -> None:
+        self._input_ids: dict[int, None] = dict.fromkeys(identifs)
+
+    @property
+    def outputs(self) -> list[int]:
+        """
+        A new list of the ids of the output nodes, kept as the inputs are (see `inputs`).
+        """
+        return list(self._output_ids)
+
+    @outputs.setter
+    def outputs(self, identifs: list[int]) -> None:
+        self._output_ids: dict[int, None] = dict.fromkeys(identifs)
+
     def set_input_ids(self, identifs: list[int]) -> None:
         """
         Set the input ids to identifs.
@@ -96,6 +156,7 @@ class open_digraph_getter_setter_mx:
         identifs : list[int]
             The new ids for the input nodes.
         """
+        self.invalidate_cache(*self.inputs, *identifs)
         self.inputs = identifs
 
     def set_output_ids(self, identifs: list[int]) -> None:
@@ -107,6 +168,7 @@ class open_digraph_getter_setter_mx:
         identifs : list[int]
             The new ids for the output nodes.
         """
+        self.invalidate_cache(*self.outputs, *identifs)
         self.outputs = identifs
 
     def add_input_id(self, identif: int) -> None:
@@ -118,8 +180,22 @@ class open_digraph_getter_setter_mx:
         identif : int
             The new id for the input nodes.
         """
-        if identif not in self.inputs:
-            self.inputs += [identif]
+        if identif not in self._input_ids:
+            self._input_ids[identif] = None
+            self.invalidate_cache(identif)
+
+    def remove_input_id(self, identif: int) -> None:
+        """
+        Remove `identif` from the input ids list, if it's there. The node itself is kept.
+
+        Parameters
+        ----------
+        identif : int
+            The id to remove.
+        """
+        if identif in self._input_ids:
+            del self._input_ids[identif]
+            self.invalidate_cache(identif)
 
     def add_output_id(self, identif: int) -> None:
         """
@@ -130,16 +206,51 @@ class open_digraph_getter_setter_mx:
         identif : int
             The new id for the output nodes.
         """
-        if identif not in self.outputs:
-            self.outputs += [identif]
+        if identif not in self._output_ids:
+            self._output_ids[identif] = None
+            self.invalidate_cache(identif)
+
+    def remove_output_id(self, identif: int) -> None:
+        """
+        Remove `identif` from the output ids list, if it's there. The node itself is kept.
+
+        Parameters
+        ----------
+        identif : int
+            The id to remove.
+        """
+        if identif in self._output_ids:
+            del self._output_ids[identif]
+            self.invalidate_cache(identif)
+
+    def invalidate_cache(self, *identifs: int) -> None:
+        """
+        Drop every structural information cached on this graph (such as the topological levels)
+        and mark the nodes `identifs` as dirty, so that the next incremental validation checks them.
+        Called by every mutator of the graph, it must also be called after modifying a node directly.
+
+        Parameters
+        ----------
+        identifs : tuple[int, ...]
+            The ids of the modified nodes.
+        """
+        self._topo_cache = None
+        self._dirty.update(identifs)
 
     def new_id(self) -> int:
         """
+        Allocate an id in constant time : ids are handed out in increasing order, starting above every id of the graph.
+        An id that was inserted directly into `nodes` is skipped.
+
         Return
         ----------
         A new unused id.
         """
-        return max(list(self.nodes.keys())) + 1
+        identif: int = self._next_id
+        while identif in self.nodes:
+            identif += 1
+        self._next_id = identif + 1
+        return identif
 
     def add_edge(self, src: int, tgt: int) -> None:
         """
@@ -153,20 +264,28 @@ class open_digraph_getter_setter_mx:
         tgt : int
             The target id.
         """
-        self.nodes[src].add_child_id(tgt)
-        self.nodes[tgt].add_parent_id(src)
+        self.writable(src).add_child_id(tgt)
+        self.writable(tgt).add_parent_id(src)
+        self.invalidate_cache(src, tgt)
 
-    def add_edges(self, edges: list[tuple[int, int]]) -> None:
+    def add_edges(self, edges) -> None:
         """
-        Add all the edges from edges, which is a list as `[(src, tgt), (src, tgt), ...]`.
+        Add all the edges from edges in a single pass, each multiplicity being added to both endpoints at once.
 
         Parameters
         ----------
-        edges : list[tuple[int, int]]
-            The list of edges such as `[(src, tgt), (src, tgt), ...]`.
-        """
-        for src, tgt in edges:
-            self.add_edge(src, tgt)
+        edges : list[tuple[int, int]] | list[tuple[int, int, int]] | numpy.ndarray
+            The list of edges such as `[(src, tgt), (src, tgt), ...]`, or `[(src, tgt, multiplicity), ...]`,
+            or a NumPy array with 2 or 3 columns.
+        """
+        touched: set[int] = set()
+        for src, tgt, m in edge_triples(edges):
+            if m > 0:
+                self.writable(src).add_child_id(tgt, m)
+                self.writable(tgt).add_parent_id(src, m)
+                touched.add(src)
+                touched.add(tgt)
+        self.invalidate_cache(*touched)
 
     def add_node(self, label: str = '', parents: dict[int, int] | None = None, children: dict[int, int] | None = None) -> int:
         """
@@ -193,12 +312,11 @@ class open_digraph_getter_setter_mx:
         self.nodes[identif] = n
         if parents != None:
             for k, v in parents.items():
-                for _ in range(v):
-                    self.nodes[k].add_child_id(identif)
+                self.writable(k).add_child_id(identif, v)
         if children != None:
             for k, v in children.items():
-                for _ in range(v):
-                    self.nodes[k].add_parent_id(identif)
+                self.writable(k).add_parent_id(identif, v)
+        self.invalidate_cache(identif, *n.get_parents(), *n.get_children())
         return identif
 
     def remove_edge(self, src: int, tgt: int) -> None:
@@ -213,8 +331,9 @@ class open_digraph_getter_setter_mx:
         tgt : int
             The target id.
         """
-        self.get_node_by_id(src).remove_child_once(tgt)
-        self.get_node_by_id(tgt).remove_parent_once(src)
+        self.writable(src).remove_child_once(tgt)
+        self.writable(tgt).remove_parent_once(src)
+        self.invalidate_cache(src, tgt)
 
     def remove_parallel_edges(self, src: int, tgt: int) -> None:
         """
@@ -228,8 +347,9 @@ class open_digraph_getter_setter_mx:
         tgt : int
             The target id.
         """
-        self.get_node_by_id(src).remove_child_id(tgt)
-        self.get_node_by_id(tgt).remove_parent_id(src)
+        self.writable(src).remove_child_id(tgt)
+        self.writable(tgt).remove_parent_id(src)
+        self.invalidate_cache(src, tgt)
 
     def remove_node_by_id(self, identif: int) -> None:
         """
@@ -240,30 +360,36 @@ class open_digraph_getter_setter_mx:
         identif : int
             The node's we want to remove id.
         """
-        if identif in self.get_node_ids():
-            if identif in self.get_input_ids():
-                self.inputs.remove(identif)
-            elif identif in self.get_output_ids():
-                self.outputs.remove(identif)
+        if identif in self.nodes:
+            self.remove_input_id(identif)
+            self.remove_output_id(identif)
             n = self.nodes.pop(identif)
             for c in n.get_children():
-                self.nodes[c].remove_parent_id(identif)
+                self.writable(c).remove_parent_id(identif)
             for p in n.get_parents():
-                self.nodes[p].remove_child_id(identif)
+                self.writable(p).remove_child_id(identif)
+            self.invalidate_cache(identif, *n.get_children(), *n.get_parents())
         else:
             raise ValueError("This id doesn't exist in the graph.")
 
-    def remove_edges(self, l: list[tuple[int, int]]) -> None:
+    def remove_edges(self, l) -> None:
         """
-        Remove all edges from l.
+        Remove all edges from l in a single pass, each multiplicity being subtracted from both endpoints at once.
+        Removing more edges than there are between two nodes removes all of them.
 
         Parameters
         ----------
-        l : list[tuple[int, int]]
-            The list of edges such as `[(src, tgt), (src, tgt), ...]`.
-        """
-        for src, tgt in l:
-            self.remove_edge(src, tgt)
+        l : list[tuple[int, int]] | list[tuple[int, int, int]] | numpy.ndarray
+            The list of edges such as `[(src, tgt), (src, tgt), ...]`, or `[(src, tgt, multiplicity), ...]`,
+            or a NumPy array with 2 or 3 columns.
+        """
+        touched: set[int] = set()
+        for src, tgt, m in edge_triples(l):
+            self.writable(src).remove_child_id(tgt, m)
+            self.writable(tgt).remove_parent_id(src, m)
+            touched.add(src)
+            touched.add(tgt)
+        self.invalidate_cache(*touched)
 
     def remove_several_parallel_edges(self, l: list[tuple[int, int]]) -> None:
         """
@@ -274,8 +400,13 @@ class open_digraph_getter_setter_mx:
         l : list[tuple[int, int]]
             The list of edges such as `[(src, tgt), (src, tgt), ...]`.
         """
+        touched: set[int] = set()
         for src, tgt in l:
-            self.remove_parallel_edges(src, tgt)
+            self.writable(src).remove_child_id(tgt)
+            self.writable(tgt).remove_parent_id(src)
+            touched.add(src)
+            touched.add(tgt)
+        self.invalidate_cache(*touched)
 
     def remove_nodes_by_id(self, l: list[int]) -> None:
         """
@@ -304,8 +435,7 @@ class open_digraph_getter_setter_mx:
         The id of the newly created input node.
         """
         if identif in self.nodes.keys():
-            if identif in self.inputs:
-                self.inputs.remove(identif)
+            self.remove_input_id(identif)
             newId: int = self.add_node(children={identif: 1})
             self.add_input_id(newId)
             return newId
@@ -326,8 +456,7 @@ class open_digraph_getter_setter_mx:
         The id of the newly created output node.
         """
         if identif in self.nodes.keys():
-            if identif in self.outputs:
-                self.outputs.remove(identif)
+            self.remove_output_id(identif)
             newId: int = self.add_node(parents={identif: 1})
             self.add_output_id(newId)
             return newId
@@ -1,25 +1,17 @@
+from collections import deque
+from collections.abc import Iterator
+from heapq import heapify, heappop, heappush
+
 from modules.node import node
 
 
 class open_digraph_path_mx:
-    def aux(self, l: list[int], first: bool):
-        ll: set[int] = set()
-        d: list[set[int]] = []
-        for i in l:
-            current: node = self.nodes[i]
-            ll.add(i)
-            if current.get_children_ids() != []:
-                for elem in self.aux(current.get_children_ids(), False)[0]:
-                    ll.add(elem)
-            if first:
-                d += [set(ll)]
-                ll = set()
-        return ll, d
-
     def connected_components(self) -> tuple[int, dict[int, int]]:
         """
         Return the number of connected components and a `dict` which associate at each
         node id in the graph an int corresponding to which "subgraph" it belongs to.
+        The edges are followed in both directions, iteratively, each node and edge being visited once.
+        The components are numbered in the order of their first input (then of their first node, for those without input).
 
         Return
         ----------
@@ -28,18 +20,19 @@ class open_digraph_path_mx:
         """
         d: dict[int, int] = {}
         cpt: int = 0
-        res: list[set[int]] = self.aux(self.inputs, True)[1]
-        for e in res[0]:
-            d[e] = cpt
-        for e in res[1:]:
-            if len(e.intersection(d.keys())) != 0:
-                for e2 in e:
-                    d[e2] = cpt
-            else:
-                cpt += 1
-                for e2 in e:
-                    d[e2] = cpt
-        return cpt+1, d
+        for start in [*self.inputs, *self.nodes]:
+            if start in d:
+                continue
+            d[start] = cpt
+            stack: list[int] = [start]
+            while stack != []:
+                n: node = self.nodes[stack.pop()]
+                for k in [*n.get_parents(), *n.get_children()]:
+                    if k not in d:
+                        d[k] = cpt
+                        stack += [k]
+            cpt += 1
+        return cpt, d
 
     def components_list(self) -> list:
         """
@@ -49,26 +42,82 @@ class open_digraph_path_mx:
         ----------
         Return a `list` containing every independants `open_digraph` this graph is made of.
         """
-        res: tuple[int, dict[int, int]] = self.connected_components()
-        splitted: list[set[int]] = [
-            set([n_id for n_id, v in res[1].items() if v == i]) for i in range(res[0])]
-        l: list[self.__class__] = [self.__class__.empty()
-                                   for _ in range(res[0])]
-        for i in range(res[0]):
-            l[i].nodes = {k: v for k, v in self.nodes.items()
-                          if k in splitted[i]}
-            l[i].inputs = [j for j in self.inputs if j in splitted[i]]
-            l[i].outputs = [o for o in self.outputs if o in splitted[i]]
-        return l
+        count, d = self.connected_components()
+        splitted: list[set[int]] = [set() for _ in range(count)]
+        for k, i in d.items():
+            splitted[i].add(k)
+        inputs: list[list[int]] = [[] for _ in range(count)]
+        outputs: list[list[int]] = [[] for _ in range(count)]
+        for i in self.inputs:
+            inputs[d[i]] += [i]
+        for o in self.outputs:
+            outputs[d[o]] += [o]
+        return [self.subgraph(splitted[i], inputs[i], outputs[i]) for i in range(count)]
+
+    def neighbours(self, identif: int, direction: int | None = None) -> list[int]:
+        """
+        Parameters
+        ----------
+        identif : int
+            The id of the node.
+        direction : int | None
+            The direction we want to explore, see `dijkstra`.
+
+        Return
+        ----------
+        The ids of the children (`1`), of the parents (`-1`) or of both (`None`) of that node.
+        """
+        n: node = self.nodes[identif]
+        if direction == 1:
+            return n.get_children_ids()
+        if direction == -1:
+            return n.get_parents_ids()
+        return [*n.get_children(), *n.get_parents()]
+
+    def bfs(self, src: int | list[int], direction: int | None = None, tgt: int | None = None) -> tuple[dict[int, int], dict[int, int]]:
+        """
+        Breadth-first search from one or several sources, every edge having a length of 1. Runs in O(V+E).
+
+        Parameters
+        ----------
+        src : int | list[int]
+            The source node, or the list of the source nodes (all at distance 0).
+        direction : int | None
+            The direction we want to explore, see `dijkstra`.
+        tgt : int | None
+            Stop as soon as `tgt` is reached : its distance is then final.
+
+        Return
+        ----------
+        Return a pair of `dict[int, int]` corresponding to the distances and the previous node id of each reached node.
+        """
+        sources: list[int] = [src] if isinstance(src, int) else list(src)
+        dist: dict[int, int] = {s: 0 for s in sources}
+        prev: dict[int, int] = {}
+        if tgt in dist:
+            return dist, prev
+        q: deque[int] = deque(dist)
+        while q:
+            u: int = q.popleft()
+            d: int = dist[u] + 1
+            for v in self.neighbours(u, direction):
+                if v not in dist:
+                    dist[v] = d
+                    prev[v] = u
+                    if v == tgt:
+                        return dist, prev
+                    q.append(v)
+        return dist, prev
 
-    def dijkstra(self, src: int, direction: int | None = None, tgt: int | None = None) -> tuple[dict[int, int], dict[int, int]]:
+    def dijkstra(self, src: int | list[int], direction: int | None = None, tgt: int | None = None,
+                 weights: dict | None = None) -> tuple[dict[int, float], dict[int, int]]:
         """
-        Dijkstra algorithm applied to our class.
+        Dijkstra algorithm applied to our class. Without `weights`, every edge has a length of 1 and `bfs` is used.
 
         Parameters
         ----------
-        src : int
-            The source node
+        src : int | list[int]
+            The source node, or the list of the source nodes (all at distance 0).
         direction : int | None
             The direction we want to explore :
                 - None : We explore both the parents and the children
@@ -76,33 +125,38 @@ class open_digraph_path_mx:
                 - 1 : We only explore the children
         tgt : int | None
             Make the execution faster by returning the result as soon as we're sure about the path from `src` to `tgt`
+        weights : dict | None
+            The (positive) cost of entering each node, keyed by node id or by label (the id taking precedence),
+            a missing node costing 1. Default to `None` (unit lengths).
 
         Return
         ----------
         Return a pair of `dict[int, int]` corresponding to the distances and the previous node id of each node.
         """
-        q: list[int] = [src]
-        dist: dict[int, int] = {src: 0}
+        if weights is None:
+            return self.bfs(src, direction, tgt)
+        sources: list[int] = [src] if isinstance(src, int) else list(src)
+        dist: dict[int, float] = {s: 0 for s in sources}
         prev: dict[int, int] = {}
-
-        while q != []:
-            u: int = min(q, key=lambda x: dist[x] if x in dist else 1)
-            q.pop(q.index(u))
-            neighbours: list[int] = self.nodes[u].get_children_ids() if direction == 1 else self.nodes[u].get_parents_ids(
-            ) if direction == -1 else [*self.nodes[u].get_children_ids(), *self.nodes[u].get_parents_ids()]
-
-            for v in neighbours:
-                if v not in dist.keys():
-                    q += [v]
-                if v not in dist or dist[v] > dist[u] + 1:
-                    dist[v] = dist[u]+1
+        done: set[int] = set()
+        heap: list[tuple[float, int]] = [(0, s) for s in dist]
+        heapify(heap)
+        while heap:
+            d, u = heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            if u == tgt:
+                break
+            for v in self.neighbours(u, direction):
+                nd: float = d + weights.get(v, weights.get(self.nodes[v].get_label(), 1))
+                if v not in dist or nd < dist[v]:
+                    dist[v] = nd
                     prev[v] = u
-                if v == tgt:
-                    return dist, prev
-
+                    heappush(heap, (nd, v))
         return dist, prev
 
-    def shortest_path(self, u: int, v: int) -> list[int]:
+    def shortest_path(self, u: int, v: int, weights: dict | None = None) -> list[int]:
         """
         Find the shortest path from u to v.
 
@@ -112,16 +166,24 @@ class open_digraph_path_mx:
             The src node's id.
         v : int
             The target node's id.
+        weights : dict | None
+            The cost of each node, see `dijkstra`. Default to `None` (unit lengths).
 
         Return
         ----------
         A list corresponding to the shortest path from `u` to `v`.
+
+        Raise
+        ----------
+        ValueError if there's no path from `u` to `v`.
         """
+        dist, prev = self.dijkstra(u, 1, v, weights)
+        if v not in dist:
+            raise ValueError(f"There is no path from {u} to {v}.")
         p: list[int] = [v]
-        m, res = self.dijkstra(u, 1, v)
-        current = v
+        current: int = v
         while current != u:
-            current = res[current]
+            current = prev[current]
             p += [current]
         p.reverse()
         return p
@@ -141,14 +203,219 @@ class open_digraph_path_mx:
         ----------
         Return a `dict` mapping each common ancestor to a tuple (dist to `u`, dist to `v`)
         """
-        d: dict[int, tuple[int, int]] = {}
-        ances_u: dict[int, int] = self.dijkstra(u, -1)[0]
-        ances_v: dict[int, int] = self.dijkstra(v, -1)[0]
-        for k, v in ances_u.items():
-            if k in ances_v.keys():
-                d[k] = (v, ances_v[k])
+        ances_u: dict[int, int] = self.bfs(u, -1)[0]
+        ances_v: dict[int, int] = self.bfs(v, -1)[0]
+        return {k: (d, ances_v[k]) for k, d in ances_u.items() if k in ances_v}
+
+    def fanin_ids(self, ids: list[int]) -> set[int]:
+        """
+        Compute the transitive fan-in of some nodes, in linear time.
 
-        return d
+        Parameters
+        ----------
+        ids : list[int]
+            The ids of the starting nodes.
+
+        Return
+        ----------
+        The ids of the nodes from which one of `ids` can be reached, `ids` included.
+        """
+        seen: set[int] = set(ids)
+        stack: list[int] = list(seen)
+        while stack != []:
+            for p in self.get_node_by_id(stack.pop()).get_parents():
+                if p not in seen:
+                    seen.add(p)
+                    stack += [p]
+        return seen
+
+    def fanout_ids(self, ids: list[int]) -> set[int]:
+        """
+        Compute the transitive fan-out of some nodes, in linear time.
+
+        Parameters
+        ----------
+        ids : list[int]
+            The ids of the starting nodes.
+
+        Return
+        ----------
+        The ids of the nodes reachable from one of `ids`, `ids` included.
+        """
+        seen: set[int] = set(ids)
+        stack: list[int] = list(seen)
+        while stack != []:
+            for c in self.get_node_by_id(stack.pop()).get_children():
+                if c not in seen:
+                    seen.add(c)
+                    stack += [c]
+        return seen
+
+    def level_index(self) -> tuple[list[set[int]], dict[int, int]]:
+        """
+        Compute (or fetch from the cache) the layers of this graph, using Kahn's algorithm on indegree counters.
+        The result is stored on the graph until a mutator (see `invalidate_cache`) modifies it.
+
+        Return
+        ----------
+        Return a pair made of the list of the layers (level -> nodes) and a `dict` mapping each node id to its level
+        (between 1 and the depth of the graph).
+
+        Raise
+        ----------
+        AttributeError if the graph is cyclic.
+        """
+        if self._topo_cache is None:
+            remaining: dict[int, int] = {
+                k: len(n.get_parents()) for k, n in self.nodes.items()}
+            layer: list[int] = [k for k, d in remaining.items() if d == 0]
+            layers: list[set[int]] = []
+            level: dict[int, int] = {}
+            while layer != []:
+                layers += [set(layer)]
+                nxt: list[int] = []
+                for k in layer:
+                    level[k] = len(layers)
+                    for c in self.nodes[k].get_children():
+                        remaining[c] -= 1
+                        if remaining[c] == 0:
+                            nxt += [c]
+                layer = nxt
+
+            if len(level) != len(self.nodes):
+                raise AttributeError("The specified graph is cyclic.")
+            self._topo_cache = (layers, level)
+        return self._topo_cache
+
+    def is_cyclic(self) -> bool:
+        """
+        Return True whether this graph is cyclic or not.
+        Iterative and linear : relies on the indegree counters of `level_index`, without copying nor modifying the graph.
+
+        Return
+        ----------
+        Return True whether this graph is cyclic or not.
+        """
+        try:
+            self.level_index()
+        except AttributeError:
+            return True
+        return False
+
+    def rebuild_order(self) -> bool:
+        """
+        Compute a topological order of the whole graph from scratch, see `update_order`.
+
+        Return
+        ----------
+        `False` if the graph is cyclic (the order is then dropped), `True` otherwise.
+        """
+        if self.is_cyclic():
+            self._order = None
+            return False
+        order: dict[int, float] = {}
+        for layer in self.level_index()[0]:
+            for k in sorted(layer):
+                order[k] = float(len(order))
+        self._order = order
+        return True
+
+    def reorder(self, x: int, y: int) -> bool:
+        """
+        Pearce-Kelly : restore the topological order after the insertion of an edge from `x` to `y` that contradicts it,
+        by permuting the order of the nodes between `y` and `x` only. See `update_order`.
+
+        Return
+        ----------
+        `False` if the edge closes a cycle, `True` otherwise.
+        """
+        order: dict[int, float] = self._order
+        upper: float = order[x]
+        lower: float = order[y]
+        if x == y:
+            return False
+        # the descendants of y not after x, which must come after x
+        forward: set[int] = {y}
+        stack: list[int] = [y]
+        while stack != []:
+            for c in self.nodes[stack.pop()].get_children():
+                if c == x:
+                    return False
+                if c not in forward and order[c] <= upper:
+                    forward.add(c)
+                    stack.append(c)
+        # the ancestors of x not before y, which must come before y
+        backward: set[int] = {x}
+        stack = [x]
+        while stack != []:
+            for p in self.nodes[stack.pop()].get_parents():
+                if p not in backward and order[p] >= lower:
+                    backward.add(p)
+                    stack.append(p)
+        moved: list[int] = sorted(backward, key=order.__getitem__) + sorted(forward, key=order.__getitem__)
+        pool: list[float] = sorted(order[k] for k in moved)
+        if len(set(pool)) != len(pool):
+            return self.rebuild_order()
+        for k, v in zip(moved, pool):
+            order[k] = v
+        return True
+
+    def update_order(self, dirty: set[int]) -> bool:
+        """
+        Incremental acyclicity check : maintain a topological order (`_order`) of the graph, only looking at the nodes
+        modified since it was computed (`dirty`). A new node is placed between its parents and its children,
+        an edge contradicting the order is repaired locally (see `reorder`) ; the whole order is only computed again
+        when there was none.
+
+        Parameters
+        ----------
+        dirty : set[int]
+            The nodes modified since the last call, every added edge having both ends in it.
+
+        Return
+        ----------
+        `False` if the graph is cyclic, `True` otherwise.
+        """
+        order: dict[int, float] | None = self._order
+        if order is None:
+            return self.rebuild_order()
+        for k in dirty:
+            if k not in self.nodes:
+                order.pop(k, None)
+
+        # the new nodes, parents first
+        new: set[int] = {k for k in dirty if k in self.nodes and k not in order}
+        waiting: dict[int, int] = {k: sum(1 for p in self.nodes[k].get_parents() if p in new) for k in new}
+        ready: list[int] = [k for k, d in waiting.items() if d == 0]
+        while ready != []:
+            k: int = ready.pop()
+            n = self.nodes[k]
+            lo: float | None = max((order[p] for p in n.get_parents()), default=None)
+            hi: float | None = min((order[c] for c in n.get_children() if c in order), default=None)
+            if lo is None:
+                order[k] = 0.0 if hi is None else hi - 1
+            elif hi is None or hi <= lo:
+                # an edge to a child contradicting the order is repaired below
+                order[k] = lo + 1
+            else:
+                order[k] = (lo + hi) / 2
+            for c in n.get_children():
+                if c in waiting:
+                    waiting[c] -= 1
+                    if waiting[c] == 0:
+                        ready.append(c)
+        if len(order) < len(self.nodes):
+            # some new nodes are on a cycle
+            return self.rebuild_order()
+
+        for k in dirty:
+            if k in self.nodes:
+                for c in self.nodes[k].get_children():
+                    if self._order[k] >= self._order[c] and not self.reorder(k, c):
+                        # the edges left unchecked may contradict the order, the next check rebuilds it
+                        self._order = None
+                        return False
+        return True
 
     def topo_sort(self) -> list[set[int]]:
         """
@@ -158,20 +425,7 @@ class open_digraph_path_mx:
         ----------
         Return the different layers of that graph using topologic sort.
         """
-        l: list[set[int]] = []
-        nodes: dict[int, node] = self.nodes.copy()
-        while nodes != {}:
-            s: set[int] = set()
-            for identif, n in nodes.items():
-                if len(set(n.get_parents_ids()).difference(set([elem for t in l for elem in t]))) == 0:
-                    s.add(identif)
-
-            if len(s) == 0:
-                raise AttributeError("The specified graph is cyclic.")
-            l += [s]
-            for e in s:
-                nodes.pop(e)
-        return l
+        return [set(t) for t in self.level_index()[0]]
 
     def node_depth(self, node_id: int) -> int:
         """
@@ -188,12 +442,7 @@ class open_digraph_path_mx:
         ----------
         Return the depth in the graph of the node with `node_id` as id.
         """
-        tmp: list[set[int]] = self.topo_sort()
-        for i, t in enumerate(tmp):
-            if node_id in t:
-                return i+1
-
-        return -1
+        return self.level_index()[1].get(node_id, -1)
 
     def depth(self) -> int:
         """
@@ -205,7 +454,7 @@ class open_digraph_path_mx:
         ----------
         Return the depth of the graph.
         """
-        s: int = len(self.topo_sort())
+        s: int = len(self.level_index()[0])
         return s if s != 0 else -1
 
     def longuest_path(self, u: int, v: int) -> tuple[list[int], int]:
@@ -222,22 +471,112 @@ class open_digraph_path_mx:
         Return
         ----------
         Return a pair containing the path from `u` to `v` and its length.
+
+        Raise
+        ----------
+        ValueError if there's no path from `u` to `v`.
         """
-        topo: list[set[int]] = self.topo_sort()
-        node_u: node = self.nodes[u]
-        node_v: node = self.nodes[v]
-        k: int = [i for i, v in enumerate(topo) if u in v][0]
+        if u == v:
+            return [u], 0
+        layers, level = self.level_index()
         dist: dict[int, int] = {u: 0}
         prev: dict[int, int] = {}
 
-        while v not in topo[k]:
-            for w in topo[k]:
-                node_w: node = self.nodes[w]
-                if len(set(node_w.get_parents_ids()).intersection(set(dist.keys()))) != 0:
-                    i: int = max([i for i in set(node_w.get_parents_ids()).intersection(
-                        set(dist.keys()))], key=lambda x: dist[x])
-                    dist[w] = dist[i] + 1
-                    prev[w] = i
-            k += 1
-
-        return list(dist.keys()) + [v], len(dist.keys())
+        # only the layers between u and v may hold a node of the path
+        for k in range(level[u], level[v] - 1):
+            for w in layers[k]:
+                best: int | None = None
+                for p in self.nodes[w].get_parents():
+                    if p in dist and (best is None or dist[p] > dist[best]):
+                        best = p
+                if best is not None:
+                    dist[w] = dist[best] + 1
+                    prev[w] = best
+
+        best = max([p for p in self.nodes[v].get_parents() if p in dist],
+                   key=lambda x: dist[x], default=None)
+        if best is None:
+            raise ValueError(f"There is no path from {u} to {v}.")
+        path: list[int] = [v, best]
+        while path[-1] != u:
+            path += [prev[path[-1]]]
+        path.reverse()
+        return path, dist[best] + 1
+
+    def longuest_paths(self, k: int | None = None, sources: list[int] | None = None, sinks: list[int] | None = None,
+                       weights: dict | None = None) -> Iterator[tuple[list[int], float]]:
+        """
+        Enumerate the paths from `sources` to `sinks`, longest first, lazily.
+        A dynamic programming pass over the topological order first gives, for each node, the length of the longest path
+        from it to a sink. A best-first search then extends path prefixes, that length being an exact bound :
+        each path is produced after exploring only prefixes of paths at least as long, never enumerating the shorter ones.
+
+        Parameters
+        ----------
+        k : int | None
+            Stop after `k` paths. Default to `None` (every path, as long as the iteration goes on).
+        sources : list[int] | None
+            The ids of the nodes the paths start from. Default to the inputs.
+        sinks : list[int] | None
+            The ids of the nodes the paths end at. Default to the outputs.
+        weights : dict | None
+            The cost of entering each node, keyed by node id or by label (see `dijkstra`).
+            Default to `None` : the length of a path is its number of edges.
+
+        Return
+        ----------
+        An iterator over the pairs (path, length), by decreasing length.
+
+        Raise
+        ----------
+        AttributeError if the graph is cyclic.
+        """
+        sources = self.inputs if sources is None else sources
+        sinks_set: set[int] = set(self.outputs if sinks is None else sinks)
+
+        def cost(v: int) -> float:
+            if weights is None:
+                return 1
+            return weights.get(v, weights.get(self.nodes[v].get_label(), 1))
+
+        # longest remaining length from each node to a sink, for the nodes from which a sink can be reached
+        best: dict[int, float] = {}
+        for layer in reversed(self.level_index()[0]):
+            for v in layer:
+                tail: float | None = 0 if v in sinks_set else None
+                for c in self.nodes[v].get_children():
+                    if c in best and (tail is None or cost(c) + best[c] > tail):
+                        tail = cost(c) + best[c]
+                if tail is not None:
+                    best[v] = tail
+
+        # entries : (-bound, tie breaker, length so far, node, prefix as a linked list, finished)
+        heap: list[tuple[float, int, float, int, tuple | None, bool]] = []
+        counter: int = 0
+        for s in dict.fromkeys(sources):
+            if s in best:
+                heap += [(-best[s], counter, 0, s, None, False)]
+                counter += 1
+        heapify(heap)
+        found: int = 0
+        while heap and (k is None or found < k):
+            _, _, length, v, prefix, finished = heappop(heap)
+            if finished:
+                path: list[int] = []
+                link: tuple | None = prefix
+                while link is not None:
+                    path += [link[0]]
+                    link = link[1]
+                path.reverse()
+                found += 1
+                yield path, length
+                continue
+            link = (v, prefix)
+            if v in sinks_set:
+                heappush(heap, (-length, counter, length, v, link, True))
+                counter += 1
+            for c in self.nodes[v].get_children():
+                if c in best:
+                    nl: float = length + cost(c)
+                    heappush(heap, (-(nl + best[c]), counter, nl, c, link, False))
+                    counter += 1
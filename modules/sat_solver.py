@@ -0,0 +1,375 @@
+from heapq import heapify, heappop, heappush
+
+
+def luby(i: int) -> int:
+    """
+    Return
+    ----------
+    The `i`-th term (from 0) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ..., which scales the restart intervals.
+    """
+    size: int = 1
+    seq: int = 0
+    while size < i + 1:
+        seq += 1
+        size = 2 * size + 1
+    while size - 1 != i:
+        size = (size - 1) >> 1
+        seq -= 1
+        i %= size
+    return 1 << seq
+
+
+class sat_solver:
+    def __init__(self) -> None:
+        """
+        Create an empty CDCL SAT solver : two watched literals, VSIDS, phase saving, first UIP learning
+        and Luby restarts. Clauses are given as lists of non-zero integers, `v` for the variable `v` and `-v` for its negation.
+        Internally, the literal `v` is `2*v` and `-v` is `2*v + 1`.
+
+        Return
+        ----------
+        A new `sat_solver` without any variable.
+        """
+        self.n_vars: int = 0
+        self.clauses: list[list[int]] = []
+        self.learnts: list[list[int]] = []
+        # clauses in which a literal is watched, by literal
+        self.watches: list[list[list[int]]] = [[], []]
+        # 1 if the literal is true, -1 if it is false, 0 if it isn't assigned
+        self.val: list[int] = [0, 0]
+        self.level: list[int] = [0]
+        self.reason: list[list[int] | None] = [None]
+        self.activity: list[float] = [0.0]
+        self.phase: list[bool] = [False]
+        self.seen: list[bool] = [False]
+        self.heap: list[tuple[float, int]] = []
+        self.var_inc: float = 1.0
+        self.trail: list[int] = []
+        self.trail_lim: list[int] = []
+        self.qhead: int = 0
+        self.max_learnts: int = 1000
+        # `False` once the clauses are known to be unsatisfiable
+        self.ok: bool = True
+        self.model: list[bool] = []
+
+    def new_var(self) -> int:
+        """
+        Return
+        ----------
+        A new variable (a positive integer).
+        """
+        self.n_vars += 1
+        self.watches += [[], []]
+        self.val += [0, 0]
+        self.level += [0]
+        self.reason += [None]
+        self.activity += [0.0]
+        self.phase += [False]
+        self.seen += [False]
+        heappush(self.heap, (0.0, self.n_vars))
+        return self.n_vars
+
+    def add_clause(self, lits: list[int]) -> bool:
+        """
+        Add a clause, simplified by the assignments already implied by the other clauses.
+
+        Parameters
+        ----------
+        lits : list[int]
+            The literals of the clause.
+
+        Return
+        ----------
+        `False` if the clauses became unsatisfiable, `True` otherwise.
+        """
+        if not self.ok:
+            return False
+        self.cancel_until(0)
+        clause: list[int] = []
+        for lit in set(lits):
+            p: int = 2 * lit if lit > 0 else 2 * -lit + 1
+            if self.val[p] == 1 or p ^ 1 in clause:
+                return True
+            if self.val[p] == 0:
+                clause += [p]
+        if clause == []:
+            self.ok = False
+        elif len(clause) == 1:
+            self.enqueue(clause[0], None)
+            self.ok = self.propagate() is None
+        else:
+            self.clauses += [clause]
+            self.watches[clause[0]] += [clause]
+            self.watches[clause[1]] += [clause]
+        return self.ok
+
+    def value(self, var: int) -> bool | None:
+        """
+        Return
+        ----------
+        The value of the variable `var` in the last model found, `None` if it has none.
+        """
+        return self.model[var] if var < len(self.model) else None
+
+    def enqueue(self, p: int, reason: list[int] | None) -> None:
+        """
+        Assign the literal `p` to true at the current decision level, `reason` being the clause that implied it.
+        """
+        self.val[p] = 1
+        self.val[p ^ 1] = -1
+        v: int = p >> 1
+        self.level[v] = len(self.trail_lim)
+        self.reason[v] = reason
+        self.trail.append(p)
+
+    def propagate(self) -> list[int] | None:
+        """
+        Unit propagation of the assignments of the trail not propagated yet, through the watched literals.
+
+        Return
+        ----------
+        A clause whose literals are all false, `None` if there's none.
+        """
+        val: list[int] = self.val
+        watches: list[list[list[int]]] = self.watches
+        trail: list[int] = self.trail
+        while self.qhead < len(trail):
+            false_lit: int = trail[self.qhead] ^ 1
+            self.qhead += 1
+            ws: list[list[int]] = watches[false_lit]
+            i: int = 0
+            j: int = 0
+            n: int = len(ws)
+            while i < n:
+                c: list[int] = ws[i]
+                i += 1
+                # the false literal is moved in second position
+                if c[0] == false_lit:
+                    c[0] = c[1]
+                    c[1] = false_lit
+                first: int = c[0]
+                if val[first] == 1:
+                    ws[j] = c
+                    j += 1
+                    continue
+                for k in range(2, len(c)):
+                    if val[c[k]] != -1:
+                        c[1] = c[k]
+                        c[k] = false_lit
+                        watches[c[1]].append(c)
+                        break
+                else:
+                    ws[j] = c
+                    j += 1
+                    if val[first] == -1:
+                        while i < n:
+                            ws[j] = ws[i]
+                            j += 1
+                            i += 1
+                        del ws[j:]
+                        self.qhead = len(trail)
+                        return c
+                    self.enqueue(first, c)
+            del ws[j:]
+        return None
+
+    def bump(self, v: int) -> None:
+        """
+        Increase the activity of the variable `v` (VSIDS).
+        """
+        self.activity[v] += self.var_inc
+        if self.activity[v] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.var_inc *= 1e-100
+            self.heap = [(-self.activity[u], u) for u in range(1, self.n_vars + 1) if self.val[2 * u] == 0]
+            heapify(self.heap)
+        elif self.val[2 * v] == 0:
+            heappush(self.heap, (-self.activity[v], v))
+
+    def analyze(self, confl: list[int]) -> tuple[list[int], int]:
+        """
+        First UIP conflict analysis.
+
+        Parameters
+        ----------
+        confl : list[int]
+            The conflicting clause.
+
+        Return
+        ----------
+        The learnt clause, its asserting literal first and a literal of the highest other level second,
+        and the level to backtrack to.
+        """
+        seen: list[bool] = self.seen
+        level: list[int] = self.level
+        current: int = len(self.trail_lim)
+        learnt: list[int] = [0]
+        counter: int = 0
+        p: int | None = None
+        idx: int = len(self.trail) - 1
+        clause: list[int] = confl
+        while True:
+            for q in (clause if p is None else clause[1:]):
+                v: int = q >> 1
+                if not seen[v] and level[v] > 0:
+                    seen[v] = True
+                    self.bump(v)
+                    if level[v] >= current:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            while not seen[self.trail[idx] >> 1]:
+                idx -= 1
+            p = self.trail[idx]
+            idx -= 1
+            seen[p >> 1] = False
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.reason[p >> 1]
+        learnt[0] = p ^ 1
+
+        # a literal implied by the other ones (or by level 0) is redundant
+        kept: list[int] = [learnt[0]]
+        for q in learnt[1:]:
+            r: list[int] | None = self.reason[q >> 1]
+            if r is None or any(not seen[x >> 1] and level[x >> 1] > 0 for x in r[1:]):
+                kept.append(q)
+        for q in learnt[1:]:
+            seen[q >> 1] = False
+
+        if len(kept) == 1:
+            return kept, 0
+        best: int = max(range(1, len(kept)), key=lambda k: level[kept[k] >> 1])
+        kept[1], kept[best] = kept[best], kept[1]
+        return kept, level[kept[1] >> 1]
+
+    def cancel_until(self, lvl: int) -> None:
+        """
+        Undo the assignments of the decision levels above `lvl`, saving their phase.
+        """
+        if len(self.trail_lim) > lvl:
+            for p in reversed(self.trail[self.trail_lim[lvl]:]):
+                v: int = p >> 1
+                self.val[p] = 0
+                self.val[p ^ 1] = 0
+                self.reason[v] = None
+                self.phase[v] = p & 1 == 0
+                heappush(self.heap, (-self.activity[v], v))
+            del self.trail[self.trail_lim[lvl]:]
+            del self.trail_lim[lvl:]
+            self.qhead = len(self.trail)
+
+    def pick_branch(self) -> int | None:
+        """
+        Return
+        ----------
+        The most active unassigned variable with its saved phase, `None` if every variable is assigned.
+        """
+        while self.heap != []:
+            a, v = heappop(self.heap)
+            if self.val[2 * v] == 0 and -a == self.activity[v]:
+                return 2 * v if self.phase[v] else 2 * v + 1
+        for v in range(1, self.n_vars + 1):
+            if self.val[2 * v] == 0:
+                return 2 * v if self.phase[v] else 2 * v + 1
+        return None
+
+    def reduce_db(self) -> None:
+        """
+        At level 0 : drop the satisfied clauses, the false literals, and the longest half of the learnt clauses,
+        then rebuild the watch lists.
+        """
+        self.learnts.sort(key=len)
+        self.learnts = self.learnts[:len(self.learnts) // 2]
+        self.max_learnts += self.max_learnts // 10
+        self.watches = [[] for _ in range(2 * self.n_vars + 2)]
+        for db in (self.clauses, self.learnts):
+            kept: list[list[int]] = []
+            for c in db:
+                if any(self.val[p] == 1 for p in c):
+                    continue
+                c = [p for p in c if self.val[p] == 0]
+                self.watches[c[0]].append(c)
+                self.watches[c[1]].append(c)
+                kept.append(c)
+            db[:] = kept
+        for v in range(1, self.n_vars + 1):
+            self.reason[v] = None
+
+    def solve(self, assumptions: list[int] | None = None, max_conflicts: int | None = None) -> bool | None:
+        """
+        Look for an assignment satisfying every clause and the `assumptions`. If there's one, it is stored in `model`.
+
+        Parameters
+        ----------
+        assumptions : list[int] | None
+            Literals that must hold in this call only. Default to none.
+
+        max_conflicts : int | None
+            Give up after this number of conflicts. Default to `None` (no limit).
+
+        Return
+        ----------
+        `True` if the clauses are satisfiable, `False` if they aren't (under the assumptions),
+        `None` if `max_conflicts` was reached.
+        """
+        if not self.ok:
+            return False
+        self.cancel_until(0)
+        assumed: list[int] = [2 * a if a > 0 else 2 * -a + 1 for a in (assumptions or [])]
+        conflicts: int = 0
+        restart: int = 0
+        while True:
+            budget: int = 100 * luby(restart)
+            restart += 1
+            if self.propagate() is not None:
+                self.ok = False
+                return False
+            if len(self.learnts) > self.max_learnts:
+                self.reduce_db()
+            while True:
+                confl: list[int] | None = self.propagate()
+                if confl is not None:
+                    conflicts += 1
+                    budget -= 1
+                    if len(self.trail_lim) == 0:
+                        self.ok = False
+                        return False
+                    learnt, back = self.analyze(confl)
+                    self.cancel_until(back)
+                    if len(learnt) == 1:
+                        self.enqueue(learnt[0], None)
+                    else:
+                        self.learnts.append(learnt)
+                        self.watches[learnt[0]].append(learnt)
+                        self.watches[learnt[1]].append(learnt)
+                        self.enqueue(learnt[0], learnt)
+                    self.var_inc /= 0.95
+                    continue
+                if max_conflicts is not None and conflicts >= max_conflicts:
+                    self.cancel_until(0)
+                    return None
+                if budget <= 0:
+                    self.cancel_until(0)
+                    break
+                nxt: int | None = None
+                while len(self.trail_lim) < len(assumed):
+                    p: int = assumed[len(self.trail_lim)]
+                    if self.val[p] == 1:
+                        # already implied : an empty decision level keeps the assumptions aligned with the levels
+                        self.trail_lim.append(len(self.trail))
+                    elif self.val[p] == -1:
+                        self.cancel_until(0)
+                        return False
+                    else:
+                        nxt = p
+                        break
+                if nxt is None:
+                    nxt = self.pick_branch()
+                    if nxt is None:
+                        self.model = [False] + [self.val[2 * v] == 1 for v in range(1, self.n_vars + 1)]
+                        self.cancel_until(0)
+                        return True
+                self.trail_lim.append(len(self.trail))
+                self.enqueue(nxt, None)
@@ -1,3 +1,41 @@
+import re
+import random
+from math import log
+
+# `name = value` pairs of a dot attribute list, the value being quoted or not
+ATTRIBUTE_RE = re.compile(r'(\w+)\s*=\s*("(?:[^"\\]|\\.)*"|[^,;\s\]]+)')
+# `id [attributes];`
+NODE_RE = re.compile(r'\s*(-?\d+)\s*\[(.*)\]\s*;?\s*$')
+# `src->tgt;` or `src->tgt [attributes];`
+EDGE_RE = re.compile(r'\s*(-?\d+)\s*->\s*(-?\d+)\s*(?:\[(.*)\])?\s*;?\s*$')
+# lines of a dot file that hold neither a node nor an edge
+SKIPPED_RE = re.compile(r'\s*(?:(?:di)?graph\b.*\{|\}|//.*|#.*)?\s*$')
+# a token of a boolean formula : a variable, a constant or an operator (or anything else, which is an error)
+TOKEN_RE = re.compile(r"\s*(?:([A-Za-z_][\w']*)|([01])\b|([()~&^|])|(\S))")
+
+
+def parse_attributes(s: str) -> dict[str, str]:
+    """
+    Parse a dot attribute list such as `label="*label*", type=*type*` into `{"label": "*label*", "type": "*type*"}`.
+    Quoted values are unquoted and unescaped.
+
+    Parameters
+    ----------
+    s : str
+        The content of the brackets.
+
+    Return
+    ----------
+    A `dict` mapping each attribute name to its value.
+    """
+    res: dict[str, str] = {}
+    for name, value in ATTRIBUTE_RE.findall(s):
+        if value.startswith('"'):
+            value = value[1:-1].replace('\\"', '"')
+        res[name] = value
+    return res
+
+
 def split_line(s: str) -> tuple[str, str, str]:
     """
     Split a string like "id [label="*label*", type=*type*]" into ("*id*", "*label*", "*type*").
@@ -11,43 +49,161 @@ def split_line(s: str) -> tuple[str, str, str]:
     Return
     ----------
     A triplet of strings ("*id*", "*label*", "*type*")
+
+    Raise
+    ----------
+    ValueError if `s` isn't a node declaration.
+    """
+    m = NODE_RE.match(s)
+    if m is None:
+        raise ValueError(f"\"{s.strip()}\" isn't a node declaration.")
+    attributes: dict[str, str] = parse_attributes(m.group(2))
+    return m.group(1), attributes.get("label", ""), attributes.get("type", "0")
+
+
+def parse_dot_line(s: str) -> tuple[str, int, str | int, int] | None:
+    """
+    Parse a line of a `.dot` file.
+
+    Parameters
+    ----------
+    s : str
+        The line we want to parse
+
+    Return
+    ----------
+    - `("node", id, label, type)` for a node declaration
+    - `("edge", src, tgt, multiplicity)` for an edge, the multiplicity being read from the `mult` attribute (default to 1)
+    - `None` for the header, the closing bracket, comments and blank lines
+
+    Raise
+    ----------
+    ValueError if the line can't be parsed.
+    """
+    m = EDGE_RE.match(s) if "->" in s else None
+    if m is not None:
+        mult: int = int(parse_attributes(m.group(3)).get(
+            "mult", 1)) if m.group(3) else 1
+        return "edge", int(m.group(1)), int(m.group(2)), mult
+    m = NODE_RE.match(s)
+    if m is not None:
+        attributes: dict[str, str] = parse_attributes(m.group(2))
+        return "node", int(m.group(1)), attributes.get("label", ""), int(attributes.get("type", 0))
+    if SKIPPED_RE.match(s):
+        return None
+    raise ValueError(f"\"{s.strip()}\" can't be parsed.")
+
+
+def random_edges(n: int, bound: int, density: float, form: str = "free") -> list[tuple[int, int, int]]:
     """
-    idx_label: int = s.index("label") + 5
-    idx_type: int = s.index("type") + 4
-    identif: str = ""
-    label: str = ""
-    t: str = ""
+    Sample the edges of a random graph with `n` nodes, each candidate edge being kept with probability `density`.
+    The kept candidates are found by geometric skipping : the gap to the next one is drawn directly,
+    so the cost is proportional to `n` plus the number of edges, and not to `n*n`.
+
+    Possibilities (see `open_digraph.random`)
+    ----------
+    - `"free"` : every pair `(i, j)` is a candidate
+    - `"symetric"` : every pair `i <= j` is a candidate, added in both directions
+    - `"oriented"` : every pair `i <= j` is a candidate, added in a random direction
+    - `"dag"` : every pair `i < j` is a candidate, added from `i` to `j`
+    - `"null_diag"` flag : the pairs `(i, i)` aren't candidates
+
+    Parameters
+    ----------
+    n : int
+        The number of nodes.
+
+    bound : int
+        The maximum multiplicity (included), each multiplicity being chosen uniformly between 1 and `bound`.
 
+    density : float
+        The probability for each candidate to be an edge, between 0 and 1.
+
+    form : str
+        A string representing the type of graph we want.
+
+    Return
+    ----------
+    The list of the edges as `(src, tgt, multiplicity)` triplets.
+    """
+    triangular: bool = "free" not in form
+    diag: bool = "null_diag" not in form and "dag" not in form
+    symetric: bool = "symetric" in form
+    oriented: bool = "oriented" in form
+    res: list[tuple[int, int, int]] = []
+    if density <= 0 or n == 0:
+        return res
+    log_q: float = log(1 - density) if density < 1 else 0.0
+
+    # the candidates are numbered row by row, `pos` being the position of the current one in the row `i`
     i: int = 0
+    pos: int = -1
+    length: int = n if diag else n - 1
+    while True:
+        pos += 1 + (int(log(1 - random.random()) / log_q) if density < 1 else 0)
+        while pos >= length:
+            pos -= length
+            i += 1
+            if i >= n:
+                return res
+            length = (n - i if diag else n - i - 1) if triangular else (n if diag else n - 1)
+
+        if triangular:
+            j: int = i + pos if diag else i + 1 + pos
+        else:
+            j: int = pos if diag or pos < i else pos + 1
+        m: int = random.randint(1, bound) if bound > 1 else 1
+        if symetric:
+            res += [(i, j, m)] if i == j else [(i, j, m), (j, i, m)]
+        elif oriented and random.randint(0, 1):
+            res.append((j, i, m))
+        else:
+            res.append((i, j, m))
 
-    while s[i] != " " and s[i] != "[":
-        identif += s[i]
-        i += 1
 
-    i = idx_label
+def edge_triples(edges) -> list[tuple[int, int, int]]:
+    """
+    Normalize a batch of edges.
 
-    equal: bool = False
-    quote: bool = False
+    Parameters
+    ----------
+    edges : list | numpy.ndarray
+        Either `(src, tgt)` pairs (multiplicity 1) or `(src, tgt, multiplicity)` triples,
+        or a NumPy array with 2 or 3 columns.
 
-    while not (equal and quote):
-        if s[i] == "=":
-            equal = True
-        elif s[i] == "\"":
-            quote = True
-        i += 1
+    Return
+    ----------
+    The list of `(src, tgt, multiplicity)` triples.
+    """
+    if hasattr(edges, "tolist"):
+        # NumPy array : converted in a single call rather than element by element
+        edges = edges.tolist()
+    return [(e[0], e[1], 1) if len(e) == 2 else (e[0], e[1], e[2]) for e in edges]
 
-    while s[i] != "\"":
-        label += s[i]
-        i += 1
 
-    i = idx_type
-    while s[i] != "=":
-        i += 1
-    i += 1
+def tokenize_formula(s: str) -> list[str]:
+    """
+    Split a boolean formula into tokens.
 
-    while s[i] != "]":
-        if s[i] != " ":
-            t += s[i]
-        i += 1
+    Parameters
+    ----------
+    s : str
+        The formula, made of variables (`[A-Za-z_][A-Za-z0-9_']*`), constants ('0', '1'),
+        operators ('~', '&', '^', '|') and parentheses. The blanks are ignored.
 
-    return identif, label, t
+    Return
+    ----------
+    The list of tokens.
+
+    Raise
+    ----------
+    ValueError if `s` contains any other character.
+    """
+    res: list[str] = []
+    for m in TOKEN_RE.finditer(s):
+        if m.group(4) is not None:
+            raise ValueError(f"Unexpected character '{m.group(4)}' at position {m.start(4)} of '{s}'.")
+        token: str | None = m.group(1) or m.group(2) or m.group(3)
+        if token is not None:
+            res += [token]
+    return res
@@ -1,13 +1,29 @@
 from modules.open_digraph import open_digraph
 from modules.node import node
 from modules.bool_circ import bool_circ
+from modules.sat_solver import sat_solver
+from modules.bdd_manager import bdd_manager, FALSE, TRUE
 import unittest
+import random
+import itertools
 import sys
 import os
+try:
+    import numpy as np
+except ImportError:
+    np = None
 root = os.path.normpath(os.path.join(__file__, './../..'))
 sys.path.append(root)  # allows us to fetch files from the project root
 
 
+def patterns(k: int) -> tuple[list[int], int]:
+    """Packed input patterns for `k` inputs : every vector when there are few inputs, 1024 random (but fixed) ones otherwise."""
+    if k <= 10:
+        return [sum(((v >> i) & 1) << v for v in range(2**k)) for i in range(k)], 2**k
+    rng: random.Random = random.Random(k)
+    return [rng.getrandbits(1024) for _ in range(k)], 1024
+
+
 """ class InitTest(unittest.TestCase):
     def test_init_node(self):
         n0 = node(0, 'i', {}, {1: 1})
@@ -104,13 +120,479 @@ class BoolCircTest(unittest.TestCase):
         tmp[0].display(
             verbose=True, name="bool_circ.png")
 
+    def test_parse_formula(self):
+        circ, names = bool_circ.empty().from_string(
+            "((x0)&((x1)&(x2)))|((x1)&(~(x2)))", "x0 & x1 ^ x2 | ~x0", "x2 ^ 1 ^ (x1 | 0)", "x0 & x1 ^ x2 | ~x0")
+        self.assertEqual(names, ["x0", "x1", "x2"])
+        self.assertTrue(circ.is_well_formed())
+        prog = circ.compile()
+        for a in range(2):
+            for b in range(2):
+                for c in range(2):
+                    self.assertEqual(prog.evaluate([a, b, c]), [
+                        (a & b & c) | (b & (1 - c)), ((a & b) ^ c) | (1 - a), c ^ 1 ^ b, ((a & b) ^ c) | (1 - a)])
+        # the second and the fourth formulas share their gates
+        self.assertEqual(circ.value_of(circ.get_node_by_id(circ.outputs[1]).get_parents_ids()[0]),
+                         circ.value_of(circ.get_node_by_id(circ.outputs[3]).get_parents_ids()[0]))
+        self.assertEqual([n.get_label() for n in circ.nodes.values()].count('~'), 2)
+
+        # chains of an operator give a single gate
+        circ, names = bool_circ.empty().from_string("a & b & c & a")
+        self.assertEqual([n.get_label() for n in circ.nodes.values()].count('&'), 1)
+        self.assertTrue(circ.is_well_formed())
+
+        for s in ["", "x &", "(x | y", "x y", "x ) y", "& x", "x + y", "~"]:
+            with self.assertRaises(ValueError):
+                bool_circ.empty().from_string(s)
+
     def test_random_bool_circ(self):
         bool_circ.random_bool_circ(20, inputs=5, outputs=6).display(
             verbose=True, name="random_bool_circ.png")
 
+    def test_random_bool_circ_sparse(self):
+        for _ in range(50):
+            circ: bool_circ = bool_circ.random_bool_circ(30, inputs=3, outputs=2)
+            self.assertTrue(circ.is_well_formed())
+            self.assertEqual((len(circ.inputs), len(circ.outputs)), (3, 2))
+            circ.compile()
+        dense: bool_circ = bool_circ.random_bool_circ(10, density=1)
+        self.assertTrue(dense.is_well_formed())
+
     def test_adder(self):
         bool_circ.adder(1).display(verbose=True)
 
+    def test_truth_table(self):
+        for _ in range(20):
+            circ: bool_circ = bool_circ.random_bool_circ(30, inputs=3, outputs=3)
+            prog = circ.compile()
+            k: int = len(prog.inputs)
+            if k > 10:
+                continue
+            # `patterns` enumerates the vectors in the same order
+            self.assertEqual(circ.truth_table(), prog.run(*patterns(k)))
+
+        circ, _ = bool_circ.empty().from_string("a & b | c", "a ^ c")
+        self.assertEqual(circ.truth_table(), [0b11111000, 0b01011010])
+        self.assertEqual(circ.truth_table(), [0b11111000, 0b01011010])
+        # the cached tables are dropped by any modification
+        circ.get_node_by_id(circ.value_of(circ.get_node_by_id(circ.outputs[1]).get_parents_ids()[0])).set_label('|')
+        circ.invalidate_cache()
+        self.assertEqual(circ.truth_table(), [0b11111000, 0b11111010])
+
+        adder: bool_circ = bool_circ.make_adder(4, "brent-kung")
+        self.assertEqual(adder.truth_table(processes=3), adder.compile().truth_table())
+
+    def test_sat_solver(self):
+        rng: random.Random = random.Random(1)
+        for _ in range(100):
+            n: int = rng.randint(1, 10)
+            clauses: list[list[int]] = [[rng.choice([-1, 1]) * rng.randint(1, n) for _ in range(rng.randint(1, 3))]
+                                        for _ in range(rng.randint(1, 50))]
+            solver: sat_solver = sat_solver()
+            for _ in range(n):
+                solver.new_var()
+            for c in clauses:
+                solver.add_clause(c)
+            assumptions: list[int] = [rng.choice([-1, 1]) * rng.randint(1, n) for _ in range(rng.randint(0, 2))]
+            expected: bool = any(all(any(x[abs(lit) - 1] == (lit > 0) for lit in c) for c in clauses + [[a] for a in assumptions])
+                                 for x in itertools.product([False, True], repeat=n))
+            self.assertEqual(solver.solve(assumptions), expected)
+            if expected:
+                for c in clauses + [[a] for a in assumptions]:
+                    self.assertTrue(any(solver.value(abs(lit)) == (lit > 0) for lit in c))
+
+    def test_equivalent(self):
+        ref: bool_circ = bool_circ.make_adder(64)
+        for architecture in ["lookahead", "brent-kung"]:
+            self.assertEqual(ref.equivalent(bool_circ.make_adder(64, architecture)), (True, None))
+
+        faulty: bool_circ = bool_circ.make_adder(16, "kogge-stone")
+        gate: int = next(k for k, n in faulty.nodes.items() if n.get_label() == '^')
+        faulty.get_node_by_id(gate).set_label('|')
+        faulty.invalidate_cache()
+        same, counterexample = bool_circ.make_adder(16).equivalent(faulty)
+        self.assertFalse(same)
+        self.assertNotEqual(bool_circ.make_adder(16).compile().evaluate(counterexample),
+                            faulty.compile().evaluate(counterexample))
+
+        # a difference on a single input vector, that random simulation can't find
+        a, _ = bool_circ.empty().from_string(" & ".join(f"x{i}" for i in range(40)))
+        b, _ = bool_circ.empty().from_string(" & ".join(f"x{i}" for i in range(40)) + " & 0")
+        self.assertEqual(a.equivalent(b), (False, [1] * 40))
+        self.assertEqual(b.equivalent(b.copy()), (True, None))
+        with self.assertRaises(ValueError):
+            a.equivalent(ref)
+
+    def test_to_bdd(self):
+        for _ in range(20):
+            circ: bool_circ = bool_circ.random_bool_circ(30, inputs=3, outputs=3)
+            k: int = len(circ.source_ids())
+            if k > 10:
+                continue
+            # a tiny computed table : its entries are constantly replaced
+            manager, outputs = circ.to_bdd(bdd_manager(k, circ.bdd_order(), cache_size=4))
+            for f, table in zip(outputs, circ.truth_table()):
+                self.assertEqual(manager.count(f), bin(table).count('1'))
+                for v in range(2**k):
+                    self.assertEqual(manager.evaluate(f, [(v >> i) & 1 for i in range(k)]), (table >> v) & 1)
+                models: int = 0
+                for cube in manager.satisfying(f):
+                    models += 2**(k - len(cube))
+                    self.assertEqual((table >> sum(b << i for i, b in cube.items())) & 1, 1)
+                self.assertEqual(models, manager.count(f))
+
+        # canonical forms : the same function gives the same node
+        manager, reference = bool_circ.make_adder(32).to_bdd()
+        self.assertEqual(manager.order[:5], [0, 32, 64, 1, 33])
+        self.assertEqual(bool_circ.make_adder(32, "kogge-stone").to_bdd(manager)[1], reference)
+        self.assertEqual(len(set(reference)), len(reference))
+        self.assertEqual(manager.count(reference[0]), 2**64)
+        circ, _ = bool_circ.empty().from_string("a & ~a", "a | ~b | b")
+        self.assertEqual(circ.to_bdd()[1], [FALSE, TRUE])
+        with self.assertRaises(ValueError):
+            circ.to_bdd(manager)
+
+    def test_fault_simulate(self):
+        for seed in range(10):
+            circ: bool_circ = bool_circ.random_bool_circ(25, inputs=3, outputs=3)
+            prog = circ.compile()
+            rng: random.Random = random.Random(seed)
+            values: list[int] = [rng.getrandbits(100) for _ in prog.inputs]
+            good: list[int] = prog.run(values, 100)
+            faults: list[tuple[int, int | None, int]] = circ.faults(collapse=False)
+            report = circ.fault_simulate(values, 100, faults)
+            for u, c, v in faults:
+                # the same fault, made explicit : the stuck node or edge is fed by a constant
+                faulty: bool_circ = circ.copy()
+                const: int = faulty.add_node(str(v))
+                moved: dict[int, int] = faulty.get_node_by_id(u).get_children().copy() if c is None else \
+                    {c: faulty.get_node_by_id(u).get_child_multiplicity(c)}
+                for k, m in moved.items():
+                    faulty.remove_parallel_edges(u, k)
+                    faulty.add_edges([(const, k, m)])
+                bad: list[int] = faulty.compile().run(values, 100)
+                if c is None and circ.is_output(u):
+                    bad[circ.outputs.index(u)] = (1 << 100) - 1 if v else 0
+                diff: int = 0
+                for g, b in zip(good, bad):
+                    diff |= g ^ b
+                self.assertEqual(report.detected.get((u, c, v)),
+                                 (diff & -diff).bit_length() - 1 if diff != 0 else None)
+            self.assertTrue(set(circ.faults()) <= set(faults))
+
+        adder: bool_circ = bool_circ.adder(6)
+        self.assertLess(len(adder.faults()), len(adder.faults(collapse=False)) * 2 / 3)
+        report = adder.fault_simulate()
+        self.assertEqual(report.coverage(), 1.0)
+        self.assertEqual(report.undetected(), [])
+        # a single vector doesn't detect every fault
+        self.assertLess(adder.fault_simulate(width=1).coverage(), 1.0)
+
+    def test_make_adder(self):
+        for architecture in ("ripple", "lookahead", "kogge-stone", "brent-kung"):
+            for width in [1, 2, 3, 5, 8, 13]:
+                for carry_in in (True, False):
+                    adder: bool_circ = bool_circ.make_adder(width, architecture, carry_in)
+                    self.assertTrue(adder.is_well_formed())
+                    prog = adder.compile()
+                    labels: list[str] = [adder[i].get_label() for i in prog.inputs]
+                    out_labels: list[str] = [adder[o].get_label() for o in prog.outputs]
+                    for _ in range(20):
+                        a, b = random.getrandbits(width), random.getrandbits(width)
+                        c: int = random.getrandbits(1) if carry_in else 0
+                        bits: dict[str, int] = {"c": c}
+                        for i in range(width):
+                            bits[f"a{i}"], bits[f"b{i}"] = (a >> i) & 1, (b >> i) & 1
+                        res: dict[str, int] = dict(zip(out_labels, prog.evaluate([bits[l] for l in labels])))
+                        total: int = sum(res[f"r{i}"] << i for i in range(width)) + (res["c'"] << width)
+                        self.assertEqual(total, a + b + c)
+
+        depths: dict[str, int] = {architecture: bool_circ.make_adder(64, architecture).timing().delay()
+                                  for architecture in ("ripple", "lookahead", "kogge-stone", "brent-kung")}
+        self.assertLess(depths["kogge-stone"], depths["brent-kung"])
+        self.assertLess(depths["brent-kung"], depths["lookahead"])
+        self.assertLess(depths["lookahead"], depths["ripple"])
+        self.assertRaises(ValueError, bool_circ.make_adder, 0)
+        self.assertRaises(ValueError, bool_circ.make_adder, 4, "carry-save")
+        self.assertEqual(len(bool_circ.half_adder(2).inputs), 8)
+
+    def test_incremental_validation(self):
+        adder: bool_circ = bool_circ.adder(1)
+        self.assertTrue(adder.is_well_formed())
+        self.assertEqual(adder._dirty, set())
+        self.assertTrue(adder.copy().is_well_formed(incremental=True))
+        copy_id: int = adder.add_node("", {adder.inputs[0]: 1})
+        self.assertFalse(adder.is_well_formed(incremental=True))
+        self.assertTrue({copy_id, adder.inputs[0]} <= adder._dirty)
+        adder.remove_node_by_id(copy_id)
+        self.assertTrue(adder.is_well_formed(incremental=True))
+        self.assertEqual(adder._dirty, set())
+        # untouched nodes aren't checked again
+        adder.get_node_by_id(adder.outputs[0]).add_child_id(adder.outputs[1])
+        self.assertTrue(adder.is_well_formed(incremental=True))
+        adder.invalidate_cache(adder.outputs[0])
+        self.assertFalse(adder.is_well_formed(incremental=True))
+        self.assertFalse(adder.is_well_formed())
+
+        bad: open_digraph = open_digraph([], [], [node(0, "&", {}, {})])
+        self.assertRaises(AssertionError, bool_circ, bad)
+        bool_circ(bad, validate=False)
+
+        # the topological order is repaired locally, and cycles are found from the dirty nodes
+        g: open_digraph = open_digraph([], [], [node(i, "", {}, {}) for i in range(5)])
+        g.add_edges([(0, 1), (1, 2), (3, 4)])
+        self.assertTrue(g.rebuild_order())
+        g.add_edge(4, 0)
+        self.assertTrue(g.update_order({4, 0}))
+        self.assertTrue(all(g._order[u] < g._order[c] for u in g.nodes for c in g.nodes[u].get_children()))
+        g.add_edge(2, 3)
+        self.assertFalse(g.update_order({2, 3}))
+        rng: random.Random = random.Random(0)
+        for _ in range(20):
+            g = open_digraph([], [], [node(i, "", {}, {}) for i in range(30)])
+            self.assertTrue(g.rebuild_order())
+            acyclic: bool = True
+            while acyclic:
+                u, v = rng.randrange(30), rng.randrange(30)
+                g.add_edge(u, v)
+                acyclic = not g.is_cyclic()
+                self.assertEqual(g.update_order({u, v}), acyclic)
+                if acyclic:
+                    self.assertTrue(all(g._order[k] < g._order[c] for k in g.nodes for c in g.nodes[k].get_children()))
+            self.assertFalse(g.rebuild_order())
+
+    def test_compile(self):
+        adder: bool_circ = bool_circ.adder(1)
+        prog = adder.compile()
+        labels: list[str] = [adder[i].get_label() for i in prog.inputs]
+        out_labels: list[str] = [adder[o].get_label() for o in prog.outputs]
+        # every vector (a, b, c) packed in a single pass, one bit per vector
+        vectors = [(a, b, c) for a in range(4) for b in range(4) for c in range(2)]
+        values: dict[str, int] = {}
+        for k, (a, b, c) in enumerate(vectors):
+            for name, bit in [("a0", a & 1), ("a1", a >> 1), ("b0", b & 1), ("b1", b >> 1), ("c", c)]:
+                values[name] = values.get(name, 0) | (bit << k)
+        res: dict[str, int] = dict(
+            zip(out_labels, prog.run([values[l] for l in labels], len(vectors))))
+        for k, (a, b, c) in enumerate(vectors):
+            total: int = ((res["r0"] >> k) & 1) + (((res["r1"] >> k) & 1) << 1) + (((res["c'"] >> k) & 1) << 2)
+            self.assertEqual(total, a + b + c)
+
+        const: bool_circ = bool_circ(open_digraph([0], [3, 4], [
+            node(0, "i0", {}, {2: 1}),
+            node(1, "1", {}, {2: 1}),
+            node(2, "^", {0: 1, 1: 1}, {3: 1}),
+            node(3, "o0", {2: 1}, {}),
+            node(4, "o1", {5: 1}, {}),
+            node(5, "~", {6: 1}, {4: 1}),
+            node(6, "0", {}, {5: 1}),
+        ]))
+        self.assertEqual(const.compile().evaluate([0]), [1, 1])
+        self.assertEqual(const.compile().evaluate([1]), [0, 1])
+
+    def test_simplify(self):
+        def table(circ: bool_circ) -> list[int]:
+            # the input vectors packed in a single pass
+            prog = circ.compile()
+            k: int = len(prog.inputs)
+            vectors, width = patterns(k)
+            return prog.run(vectors, width)
+
+        for _ in range(30):
+            circ: bool_circ = bool_circ.random_bool_circ(20, inputs=3, outputs=2)
+            for identif in list(circ.nodes):
+                if circ[identif].get_label() in ('&', '|'):
+                    circ.add_node('0', children={identif: 1})
+                elif circ[identif].get_label() == '^':
+                    circ.add_node('1', children={identif: 1})
+            before: list[int] = table(circ)
+            inputs, outputs = list(circ.inputs), list(circ.outputs)
+            circ.simplify()
+            self.assertTrue(circ.is_well_formed())
+            self.assertEqual(table(circ), before)
+            self.assertEqual((circ.inputs, circ.outputs), (inputs, outputs))
+            self.assertEqual(circ.simplify(), 0)
+
+        # o0 = ~~(x ^ 1), o1 = (x | x) & 1
+        circ = bool_circ(open_digraph([0], [1, 2], [
+            node(0, "i0", {}, {3: 1}),
+            node(1, "o0", {7: 1}, {}),
+            node(2, "o1", {9: 1}, {}),
+            node(3, "", {0: 1}, {5: 1, 8: 2}),
+            node(4, "1", {}, {5: 1}),
+            node(5, "^", {3: 1, 4: 1}, {6: 1}),
+            node(6, "~", {5: 1}, {7: 1}),
+            node(7, "~", {6: 1}, {1: 1}),
+            node(8, "|", {3: 2}, {9: 1}),
+            node(9, "&", {8: 1, 10: 1}, {2: 1}),
+            node(10, "1", {}, {9: 1}),
+        ]))
+        before = table(circ)
+        self.assertGreater(circ.simplify(), 0)
+        self.assertEqual(table(circ), before)
+        self.assertEqual(len(circ.nodes), 5)
+        self.assertEqual(circ.compile().program, [(2, 1, (0,))])
+
+        # x ^ 1 with several children
+        circ, _ = bool_circ.empty().from_string('(1 ^ (a ^ 1)) & (1 ^ a) ^ ~a')
+        before = table(circ)
+        circ.simplify()
+        self.assertTrue(circ.is_well_formed())
+        self.assertEqual(table(circ), before)
+
+        # user rules are plugged in the same worklist
+        def rule_or_to_and(circ, identif):
+            if circ[identif].get_label() != '|':
+                return None
+            circ[identif].set_label('&')
+            circ.invalidate_cache(identif)
+            return [identif]
+        circ = bool_circ.adder(1)
+        n_or: int = [n.get_label() for n in circ.nodes.values()].count('|')
+        self.assertEqual(circ.simplify([rule_or_to_and]), n_or)
+        self.assertEqual([n.get_label() for n in circ.nodes.values()].count('|'), 0)
+
+    def test_strash(self):
+        # o0 = x & y, o1 = ~(y & x), o2 = ~(x & y) : both '~' are merged once both '&' are
+        circ: bool_circ = bool_circ(open_digraph([0, 1], [2, 3, 4], [
+            node(0, "i0", {}, {5: 1}),
+            node(1, "i1", {}, {6: 1}),
+            node(2, "o0", {7: 1}, {}),
+            node(3, "o1", {10: 1}, {}),
+            node(4, "o2", {11: 1}, {}),
+            node(5, "", {0: 1}, {7: 1, 8: 1, 9: 1}),
+            node(6, "", {1: 1}, {7: 1, 8: 1, 9: 1}),
+            node(7, "&", {5: 1, 6: 1}, {2: 1}),
+            node(8, "&", {6: 1, 5: 1}, {10: 1}),
+            node(9, "&", {5: 1, 6: 1}, {11: 1}),
+            node(10, "~", {8: 1}, {3: 1}),
+            node(11, "~", {9: 1}, {4: 1}),
+        ]))
+        before: list[int] = [circ.compile().evaluate([a, b]) for a in range(2) for b in range(2)]
+        self.assertEqual(circ.strash(), 3)
+        self.assertTrue(circ.is_well_formed())
+        self.assertEqual([n.get_label() for n in circ.nodes.values()].count('&'), 1)
+        self.assertEqual([n.get_label() for n in circ.nodes.values()].count('~'), 1)
+        self.assertEqual([circ.compile().evaluate([a, b]) for a in range(2) for b in range(2)], before)
+        self.assertEqual(circ.strash(), 0)
+
+        # hash-consed construction
+        circ = bool_circ(open_digraph([0, 1], [], [node(0, "i0", {}, {}), node(1, "i1", {}, {})]), validate=False)
+        x: int = circ.add_gate("", {0: 1})
+        y: int = circ.add_gate("", {1: 1})
+        self.assertEqual(circ.add_gate("", {0: 1}), x)
+        g: int = circ.add_gate("^", {x: 1, y: 1})
+        self.assertEqual(circ.add_gate("^", {y: 1, x: 1}), g)
+        circ.set_output_ids([circ.add_node("o0", {circ.add_gate("|", {x: 1, y: 1}): 1}),
+                             circ.add_node("o1", {circ.add_gate("|", {y: 1, x: 1}): 1})])
+        self.assertTrue(circ.is_well_formed())
+        self.assertEqual([n.get_label() for n in circ.nodes.values()].count('|'), 1)
+        # the unique table survives the hash-consed construction, not the other modifications
+        table = circ.unique_table()
+        circ.add_gate("&", {x: 1, y: 1})
+        self.assertIs(circ.unique_table(), table)
+        circ.add_node("&")
+        self.assertIsNone(circ._unique)
+
+        for _ in range(30):
+            circ = bool_circ.random_bool_circ(30, inputs=3, outputs=3)
+            prog = circ.compile()
+            k: int = len(prog.inputs)
+            vectors, width = patterns(k)
+            before = prog.run(vectors, width)
+            circ.strash()
+            self.assertTrue(circ.is_well_formed())
+            self.assertEqual(circ.compile().run(vectors, width), before)
+
+    def test_cones(self):
+        for _ in range(20):
+            circ: bool_circ = bool_circ.random_bool_circ(40, inputs=4, outputs=4)
+            prog = circ.compile()
+            k: int = len(prog.inputs)
+            vectors, width = patterns(k)
+            values: dict[int, int] = dict(zip(prog.inputs, vectors))
+            res: dict[int, int] = dict(zip(prog.outputs, prog.run(vectors, width)))
+            for o in circ.outputs:
+                cone: bool_circ = circ.fanin_cone([o])
+                self.assertIsInstance(cone, bool_circ)
+                self.assertTrue(cone.is_well_formed())
+                self.assertLessEqual(len(cone.nodes), len(circ.nodes))
+                sliced = cone.compile()
+                self.assertEqual(sliced.run([values[i] for i in sliced.inputs], width), [res[o]])
+
+            # the fanout cone of a gate reads the values of the nodes it was cut from
+            good: list[int] = prog.simulate(vectors, width)
+            for k in list(circ.nodes)[::8]:
+                cone = circ.fanout_cone([k])
+                self.assertTrue(cone.is_well_formed())
+                ids: set[int] = circ.fanout_ids([k])
+                cut: list[int] = sorted({p for c in ids for p in circ[c].get_parents() if p not in ids})
+                inputs: list[int] = [i for i in circ.inputs if i in ids] + cut
+                self.assertEqual(len(cone.inputs), len(inputs))
+                known: dict[int, int] = dict(zip(cone.inputs, (good[prog.node_slots[i]] for i in inputs)))
+                sliced = cone.compile()
+                self.assertEqual(sliced.run([known[i] for i in sliced.inputs], width), [res[o] for o in sliced.outputs])
+
+        adder: bool_circ = bool_circ.adder(2)
+        n: int = len(adder.nodes)
+        adder.remove_node_by_id(adder.outputs[0])
+        adder.set_output_ids(adder.outputs[1:])
+        self.assertGreater(adder.sweep(), 0)
+        self.assertLess(len(adder.nodes), n)
+        self.assertTrue(adder.is_well_formed())
+        # every node left is used, apart from the inputs of the removed output and their new copy node
+        cone: set[int] = adder.fanin_ids(adder.outputs)
+        for k in adder.nodes:
+            self.assertTrue(k in cone or adder.is_input(k) or adder.is_input(adder[k].get_parents_ids()[0]))
+
+    def test_timing(self):
+        # o0 = ~(x & y) ^ y
+        circ: bool_circ = bool_circ(open_digraph([0, 1], [2], [
+            node(0, "i0", {}, {3: 1}),
+            node(1, "i1", {}, {4: 1}),
+            node(2, "o0", {6: 1}, {}),
+            node(3, "&", {0: 1, 4: 1}, {5: 1}),
+            node(4, "", {1: 1}, {3: 1, 6: 1}),
+            node(5, "~", {3: 1}, {6: 1}),
+            node(6, "^", {5: 1, 4: 1}, {2: 1}),
+        ]))
+        report = circ.timing()
+        self.assertEqual(report.delay(), 3)
+        self.assertEqual(report.critical_path, [0, 3, 5, 6, 2])
+        self.assertEqual(report.arrival, {0: 0, 1: 0, 4: 0, 3: 1, 5: 2, 6: 3, 2: 3})
+        self.assertEqual(report.slack(4), 0)
+        self.assertEqual(report.required[4], 0)
+        report = circ.timing({"^": 2, "~": 0.5}, required=5)
+        self.assertEqual(report.delay(), 3.5)
+        self.assertEqual(report.slack(6), 1.5)
+        self.assertEqual(min(report.slacks().values()), 1.5)
+
+        adder: bool_circ = bool_circ.adder(2)
+        report = adder.timing()
+        self.assertTrue(adder.is_output(report.critical_path[-1]))
+        self.assertTrue(adder.is_input(report.critical_path[0]))
+        self.assertEqual(adder.longuest_path(report.critical_path[0], report.critical_path[-1])[0], report.critical_path)
+        self.assertTrue(all(report.slack(k) == 0 for k in report.critical_path))
+        self.assertTrue(all(s >= 0 for s in report.slacks().values()))
+
+        # the slowest paths, lazily : only 20 of them are built
+        paths: list[tuple[list[int], float]] = list(bool_circ.adder(6).critical_paths(20))
+        self.assertEqual(len(paths), 20)
+        self.assertEqual([d for _, d in paths], sorted([d for _, d in paths], reverse=True))
+        self.assertEqual(next(adder.critical_paths()), (report.critical_path, report.delay()))
+
+    @unittest.skipIf(np is None, "NumPy isn't installed")
+    def test_simulate_batch(self):
+        adder: bool_circ = bool_circ.adder(2)
+        prog = adder.compile()
+        inputs = np.random.default_rng(0).integers(
+            0, 2**63, size=(len(prog.inputs), 10), dtype=np.uint64)
+        res = adder.simulate_batch(inputs)
+        self.assertEqual(res.shape, (len(prog.outputs), 10))
+        for w in range(10):
+            self.assertEqual([int(v) for v in res[:, w]], prog.run(
+                [int(v) for v in inputs[:, w]]))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,15 @@
 from modules.open_digraph import open_digraph
 from modules.node import node
 from modules.bool_circ import bool_circ
+from modules.circuit_view import circuit_view
 import unittest
+import tempfile
 import sys
 import os
+try:
+    import numpy as np
+except ImportError:
+    np = None
 root = os.path.normpath(os.path.join(__file__, './../..'))
 sys.path.append(root)  # allows us to fetch files from the project root
 
@@ -38,6 +44,16 @@ class NodeTest(unittest.TestCase):
     def test_cpy(self):
         self.assertIsNot(self.n0.copy(), self.n0)
 
+    def test_remove_multiplicity(self):
+        n: node = node(0, 'a', {2: 3}, {1: 5})
+        n.remove_child_id(1, 2)
+        self.assertEqual(n.get_children(), {1: 3})
+        n.remove_child_id(1, 4)
+        self.assertEqual(n.get_children(), {})
+        n.remove_parent_id(2)
+        n.remove_parent_id(7)
+        self.assertEqual(n.get_parents(), {})
+
 
 class OpenDigraphTest(unittest.TestCase):
     def setUp(self):
@@ -132,6 +148,70 @@ class OpenDigraphTest(unittest.TestCase):
         self.assertIsNot(C.get_node_by_id(0), self.G.get_node_by_id(0))
         self.assertTrue(self.G.is_well_formed())
 
+    def test_csr(self):
+        c = self.G.to_csr()
+        self.assertEqual(c.get_node_ids(), self.G.get_node_ids())
+        self.assertEqual(dict(c[1].get_children()), {2: 2, 5: 1})
+        self.assertEqual(c[2].get_parent_multiplicity(1), 2)
+        self.assertEqual(c[2].get_parent_multiplicity(4), -1)
+        self.assertEqual(c[0].indegree(), 2)
+        self.assertEqual(c.topo_sort(), self.G.topo_sort())
+        self.assertEqual(open_digraph.from_csr(c), self.G)
+        self.assertEqual(c.edge_count(), sum(sum(n.get_children().values()) for n in self.G.nodes.values()))
+        # sparse ids are indexed by a dict
+        sparse = open_digraph([], [], [node(0, "a", {}, {1000: 1}), node(1000, "b", {0: 1}, {})]).to_csr()
+        self.assertEqual(dict(sparse[0].get_children()), {1000: 1})
+        self.assertTrue(1000 in sparse.nodes and 999 not in sparse.nodes and 5000 not in c.nodes)
+        # the whole array-backed graph (index and labels included) against the nodes and dicts of the mutable one
+        adder: bool_circ = bool_circ.adder(8)
+        mutable: int = sys.getsizeof(adder.nodes) + sum(sys.getsizeof(n) + sys.getsizeof(n.get_parents()) + sys.getsizeof(n.get_children())
+                                                        for n in adder.nodes.values())
+        csr = adder.to_csr()
+        self.assertLess(4 * csr.nbytes(), mutable)
+        # under 40 bytes per edge, the distinct input and output names included
+        self.assertLess(csr.nbytes(), 40 * csr.edge_count())
+        self.assertEqual(csr.get_input_ids(), adder.get_input_ids())
+        self.assertEqual(open_digraph.from_csr(csr), adder)
+        self.assertIsInstance(bool_circ.from_csr(csr), bool_circ)
+
+    def test_circuit_view(self):
+        v: circuit_view = circuit_view.from_open_digraph(self.G)
+        self.assertIs(v.copy(), v)
+        self.assertEqual(hash(v), hash(circuit_view.from_open_digraph(self.G)))
+        self.assertEqual(v.topo_sort(), self.G.topo_sort())
+        b = v.edit()
+        # reading doesn't copy anything
+        self.assertEqual(b.topo_sort(), self.G.topo_sort())
+        self.assertIs(b.get_node_by_id(1), v.get_node_by_id(1))
+        # the snapshot was never validated
+        self.assertFalse(circuit_view((0,), (), {0: node(0, 'i', {}, {})}).edit().is_well_formed(incremental=True))
+        b.add_node("d", {1: 1}, {2: 1})
+        b.remove_node_by_id(4)
+        w: circuit_view = b.freeze()
+        # the snapshot is untouched, and shares the nodes that weren't modified
+        self.assertEqual(v, circuit_view.from_open_digraph(self.G))
+        self.assertNotEqual(v, w)
+        self.assertIs(w.get_node_by_id(6), v.get_node_by_id(6))
+        self.assertIsNot(w.get_node_by_id(1), v.get_node_by_id(1))
+        self.assertNotIn(4, w.get_node_ids())
+        self.assertTrue(w.thaw().is_well_formed())
+        self.assertEqual(v.thaw(), self.G)
+
+        # a bool_circ transformation on an edited view leaves the view untouched
+        adder: bool_circ = bool_circ.adder(2)
+        view: circuit_view = circuit_view.from_open_digraph(adder)
+        h: int = hash(view)
+        edited: bool_circ = bool_circ(view.edit())
+        for identif in list(edited.nodes):
+            if edited[identif].get_label() == '&':
+                edited.add_node('1', children={identif: 1})
+        self.assertEqual(view.thaw(), adder)
+        self.assertGreater(edited.simplify(), 0)
+        self.assertTrue(edited.is_well_formed())
+        self.assertEqual(edited.truth_table(), adder.truth_table())
+        self.assertEqual(view.thaw(), adder)
+        self.assertEqual(hash(circuit_view.from_open_digraph(view.thaw())), h)
+
     def test_add_node(self):
         newId: int = self.G.add_node("d", {1: 1}, {2: 1})
         newNode: node = self.G.get_node_by_id(newId)
@@ -142,12 +222,79 @@ class OpenDigraphTest(unittest.TestCase):
         self.assertTrue(newId in self.G.get_node_by_id(2).get_parents_ids())
         self.assertTrue(self.G.is_well_formed())
 
+    def test_bulk_edges(self):
+        self.G.add_edges([(3, 1, 2), (1, 6), (0, 2, 0)])
+        self.assertEqual(self.G.get_node_by_id(3).get_children(), {0: 1, 1: 2})
+        self.assertEqual(self.G.get_node_by_id(1).get_parents(), {0: 1, 3: 2})
+        self.assertEqual(self.G.get_node_by_id(6).get_parents(), {2: 1, 1: 1})
+        self.G.remove_edges([(3, 1, 1), (1, 6, 5), (1, 2)])
+        self.assertEqual(self.G.get_node_by_id(1).get_parents(), {0: 1, 3: 1})
+        self.assertEqual(self.G.get_node_by_id(1).get_children(), {2: 1, 5: 1})
+        self.assertEqual(self.G.get_node_by_id(2).get_parents(), {0: 1, 1: 1})
+        self.G.remove_several_parallel_edges([(3, 1)])
+        self.assertTrue(self.G.is_well_formed())
+        self.assertEqual(self.G.node_depth(2), 4)
+
+    @unittest.skipIf(np is None, "NumPy isn't installed")
+    def test_bulk_edges_numpy(self):
+        g: open_digraph = open_digraph([], [], [node(i, "", {}, {}) for i in range(100)])
+        src = np.arange(99)
+        g.add_edges(np.stack([src, src + 1, np.full(99, 3)], axis=1))
+        g.add_edges(np.stack([src, src + 1], axis=1))
+        self.assertTrue(all(g[i].get_child_multiplicity(i + 1) == 4 for i in range(99)))
+        g.remove_edges(np.stack([src, src + 1, np.full(99, 4)], axis=1))
+        self.assertTrue(all(n.get_children() == {} and n.get_parents() == {} for n in g.nodes.values()))
+
     def test_remove_node(self):
         self.G.remove_node_by_id(3)
         self.assertFalse(3 in self.G.get_node_ids())
         self.assertFalse(3 in self.G.get_node_by_id(0).get_parents_ids())
         self.assertTrue(self.G.is_well_formed())
 
+    def test_new_id(self):
+        empty: open_digraph = open_digraph.empty()
+        self.assertEqual([empty.add_node() for _ in range(3)], [0, 1, 2])
+        self.assertEqual(self.G.new_id(), 7)
+        self.G.remove_node_by_id(6)
+        # ids are never handed out twice, even once freed
+        self.assertEqual(self.G.add_node("d"), 8)
+        self.G.nodes[9] = node(9, "e", {}, {})
+        self.assertEqual(self.G.add_node("f"), 10)
+        self.G.shift_indices(5)
+        self.assertEqual(self.G.new_id(), 16)
+
+    def test_io_index(self):
+        self.assertTrue(self.G.is_input(3) and self.G.is_output(6))
+        self.assertFalse(self.G.is_input(0) or self.G.is_output(3))
+        self.G.remove_node_by_id(3)
+        self.assertFalse(self.G.is_input(3))
+        self.assertEqual(self.G.inputs, [4])
+        newId: int = self.G.add_output_node(2)
+        self.assertTrue(self.G.is_output(newId))
+        self.G.shift_indices(10)
+        self.assertTrue(self.G.is_input(14) and not self.G.is_input(4))
+        self.G.iparallel(open_digraph([0], [1], [node(0, "i", {}, {1: 1}), node(1, "o", {0: 1}, {})]))
+        self.assertEqual([i for i in self.G.nodes if self.G.is_input(i)], self.G.inputs)
+        self.assertEqual(sorted(o for o in self.G.nodes if self.G.is_output(o)), sorted(self.G.outputs))
+        self.G.set_input_ids([0])
+        self.assertTrue(self.G.is_input(0) and not self.G.is_input(24))
+
+        # removals keep the order of the other inputs and outputs
+        g: open_digraph = open_digraph(list(range(0, 1000, 2)), list(range(1, 1000, 2)),
+                                       [node(i, "", {}, {}) for i in range(1000)])
+        for i in range(0, 1000, 4):
+            g.remove_node_by_id(i)
+            g.remove_output_id(i + 1)
+        g.add_input_id(1)
+        self.assertEqual(g.inputs, list(range(2, 1000, 4)) + [1])
+        self.assertEqual(g.outputs, list(range(3, 1000, 4)))
+        self.assertTrue(g.is_input(1) and g.is_output(3) and not g.is_output(1))
+        # the lists handed out are copies
+        g.get_input_ids().append(3)
+        g.outputs.clear()
+        self.assertEqual(g.inputs, list(range(2, 1000, 4)) + [1])
+        self.assertEqual(g.outputs, list(range(3, 1000, 4)))
+
     def test_add_input(self):
         newId: int = self.G.add_input_node(3)
         self.assertTrue(newId in self.G.get_node_by_id(3).get_parents_ids())
@@ -179,6 +326,28 @@ class OpenDigraphTest(unittest.TestCase):
             self.assertTrue(open_digraph.random(
                 5, 10, form="dag").is_well_formed())
 
+    def test_random_sparse(self):
+        for _ in range(20):
+            dag: open_digraph = open_digraph.random(30, 3, form="dag", density=0.2)
+            self.assertFalse(dag.is_cyclic())
+            self.assertTrue(all(0 < m <= 3 for n in dag.get_nodes()
+                            for m in n.get_children().values()))
+            sym: open_digraph = open_digraph.random(
+                30, 3, form="symetric null_diag", density=0.2)
+            mat: list[list[int]] = sym.adjacencyMatrix()
+            ids: list[int] = [sym.mapIntToId()[i] for i in range(30)
+                              if i not in sym.inputs and i not in sym.outputs]
+            self.assertTrue(all(mat[i][j] == mat[j][i] for i in ids for j in ids))
+            self.assertTrue(all(mat[i][i] == 0 for i in range(30)))
+            ori: open_digraph = open_digraph.random(30, 3, form="oriented", density=0.5)
+            mat = ori.adjacencyMatrix()
+            self.assertTrue(all(mat[i][j] == 0 or mat[j][i] == 0 for i in range(30) for j in range(30) if i != j))
+        self.assertTrue(all(n.get_children() == {} for n in open_digraph.random(
+            30, 3, form="free", density=0).get_nodes()))
+        full: open_digraph = open_digraph.random(30, 1, form="free null_diag", density=1)
+        self.assertEqual(full.get_node_by_id(5).get_children_ids(),
+                         [j for j in range(30) if j not in (0, 1, 5)])
+
     def test_save(self):
         for i in range(100):
             t: open_digraph = open_digraph.random(
@@ -187,6 +356,37 @@ class OpenDigraphTest(unittest.TestCase):
             self.assertEqual(
                 t, open_digraph.from_dot_file(f"temp/T{i+1}.dot"))
 
+    def test_dot_multiplicity(self):
+        with tempfile.TemporaryDirectory() as d:
+            path: str = os.path.join(d, "G.dot")
+            self.G.save_as_dot_file(path)
+            with open(path) as f:
+                content: str = f.read()
+            self.assertIn("1->2 [mult=2];", content)
+            self.assertEqual(self.G, open_digraph.from_dot_file(path))
+            self.G.save_as_dot_file(path, multi_edges=True)
+            self.assertEqual(self.G, open_digraph.from_dot_file(path))
+            with open(path, "a") as f:
+                f.write("\n0 -> \n")
+            self.assertRaises(ValueError, open_digraph.from_dot_file, path)
+
+    def test_binary(self):
+        with tempfile.TemporaryDirectory() as d:
+            path: str = os.path.join(d, "G.bin")
+            self.G.save_binary(path)
+            self.assertEqual(self.G, open_digraph.load_binary(path))
+            with open_digraph.load_binary(path, lazy=True) as lazy:
+                self.assertEqual(lazy.get_input_ids(), self.G.get_input_ids())
+                self.assertEqual(lazy[1], self.G[1])
+                self.assertNotIn(42, lazy.nodes)
+                self.assertEqual(lazy.topo_sort(), self.G.topo_sort())
+            adder: bool_circ = bool_circ.adder(2)
+            adder.save_binary(path)
+            self.assertEqual(adder, bool_circ.load_binary(path))
+            with open(path, "wb") as f:
+                f.write(b"digraph G {}" + bytes(64))
+            self.assertRaises(ValueError, open_digraph.load_binary, path)
+
     def test_display(self):
         self.G.display(verbose=True)
 
@@ -204,6 +404,17 @@ class OpenDigraphTest(unittest.TestCase):
             self.assertFalse(
                 bool_circ(open_digraph.random(5, 10, form="dag")).is_cyclic())
 
+    def test_cyclic(self):
+        self.assertFalse(self.G.is_cyclic())
+        self.assertFalse(open_digraph.empty().is_cyclic())
+        self.G.add_edge(2, 0)
+        self.assertTrue(self.G.is_cyclic())
+        self.assertRaises(AssertionError, bool_circ, self.G)
+        # no recursion : long chains are fine
+        chain: open_digraph = open_digraph([0], [9999], [node(0, "i0", {}, {1: 1}), node(9999, "o0", {9998: 1}, {})] + [
+                                           node(i, "~", {i-1: 1}, {i+1: 1}) for i in range(1, 9999)])
+        self.assertFalse(bool_circ(chain).is_cyclic())
+
     def test_parallel(self):
         for _ in range(100):
             tmp: open_digraph = open_digraph.random(5, 10, form="dag")
@@ -228,6 +439,17 @@ class OpenDigraphTest(unittest.TestCase):
         res: open_digraph = tmp.components_list()[0]
         res.shift_indices(-7)
         self.assertEqual(res, self.G)
+        # nodes unreachable from the inputs get their own component
+        tmp.add_node("x", {}, {tmp.add_node("y"): 1})
+        count, d = tmp.connected_components()
+        self.assertEqual(count, 3)
+        self.assertEqual(d[7], d[13])
+        self.assertNotEqual(d[0], d[7])
+        self.assertEqual(sorted(len(g.nodes) for g in tmp.components_list()), [2, 7, 7])
+        adder: bool_circ = bool_circ.adder(6)
+        twice: bool_circ = adder.parallel(adder)
+        self.assertEqual(twice.connected_components()[0], 2)
+        self.assertTrue(all(isinstance(g, bool_circ) and g.is_well_formed() for g in twice.components_list()))
 
     def test_dijkstra(self):
         self.assertEqual(self.G.dijkstra(
@@ -247,6 +469,19 @@ class OpenDigraphTest(unittest.TestCase):
                 self.assertEqual(self.G.dijkstra(i, None, j)[
                                  0][j], self.G.dijkstra(i, None)[0][j])
 
+    def test_weighted_dijkstra(self):
+        # multi-source
+        self.assertEqual(self.G.bfs([3, 1], 1)[0], {3: 0, 1: 0, 0: 1, 2: 1, 5: 1, 6: 2})
+        self.assertEqual(self.G.bfs(3, 1, 0), ({3: 0, 0: 1}, {0: 3}))
+        # entering 1 is expensive : the direct edge 0 -> 2 is shorter than going through 1
+        dist, prev = self.G.dijkstra(3, 1, weights={1: 5, "c": 2})
+        self.assertEqual(dist, {3: 0, 0: 1, 1: 6, 2: 3, 5: 7, 6: 4})
+        self.assertEqual(prev[2], 0)
+        self.assertEqual(self.G.dijkstra(3, 1, weights={})[0], self.G.bfs(3, 1)[0])
+        self.assertEqual(self.G.shortest_path(3, 6), [3, 0, 2, 6])
+        self.assertEqual(self.G.shortest_path(4, 5, {"b": 0}), [4, 0, 1, 5])
+        self.assertRaises(ValueError, self.G.shortest_path, 6, 3)
+
     def test_common_ancestor_dist(self):
         self.assertEqual(self.GTD7.common_ancestor_dist(
             5, 8), {0: (2, 3), 3: (1, 2), 1: (1, 1)})
@@ -254,6 +489,36 @@ class OpenDigraphTest(unittest.TestCase):
     def test_topo_sort(self):
         self.assertEqual(self.G.topo_sort(), [{3, 4}, {0}, {1}, {2, 5}, {6}])
 
+    def test_level_index(self):
+        layers, level = self.G.level_index()
+        self.assertEqual(layers, [{3, 4}, {0}, {1}, {2, 5}, {6}])
+        self.assertEqual(level[2], 4)
+        self.assertIs(self.G.level_index(), self.G.level_index())  # cached
+        newId: int = self.G.add_node("d", {6: 1})
+        self.assertEqual(self.G.node_depth(newId), 6)
+        self.G.remove_node_by_id(newId)
+        self.assertEqual(self.G.depth(), 5)
+        self.G.add_edge(6, 3)
+        self.assertRaises(AttributeError, self.G.topo_sort)
+
+    def test_cones(self):
+        self.assertEqual(self.G.fanin_ids([5]), {5, 1, 0, 3, 4})
+        self.assertEqual(self.G.fanout_ids([1]), {1, 2, 5, 6})
+        cone: open_digraph = self.G.fanin_cone([5])
+        self.assertEqual((cone.inputs, cone.outputs), ([3, 4], [5]))
+        self.assertEqual(cone.get_node_by_id(1).get_children(), {5: 1})
+        self.assertTrue(cone.is_well_formed())
+        self.assertEqual(self.G.fanin_cone(), self.G)
+        cone = self.G.fanout_cone([2])
+        self.assertEqual((cone.inputs, cone.outputs), ([], [6]))
+        self.assertEqual(cone.get_node_by_id(2).get_parents(), {})
+
+        self.G.add_node("u", {2: 1})
+        self.G.add_node("v", {self.G.add_node("w", {}): 1})
+        self.assertEqual(self.G.sweep(), 3)
+        self.assertEqual(sorted(self.G.nodes), [0, 1, 2, 3, 4, 5, 6])
+        self.assertTrue(self.G.is_well_formed())
+
     def test_depth(self):
         self.assertEqual(self.G.depth(), 5)
         self.assertEqual(open_digraph.empty().depth(), -1)
@@ -264,7 +529,18 @@ class OpenDigraphTest(unittest.TestCase):
         self.assertEqual(self.G.longuest_path(4, 2), ([4, 0, 1, 2], 3))
         self.assertEqual(self.G.longuest_path(3, 2), ([3, 0, 1, 2], 3))
         self.assertEqual(self.G.longuest_path(4, 0), ([4, 0], 1))
-
+        self.assertEqual(self.G.longuest_path(3, 6), ([3, 0, 1, 2, 6], 4))
+        self.assertRaises(ValueError, self.G.longuest_path, 5, 6)
+
+
+    def test_longuest_paths(self):
+        self.assertEqual(list(self.G.longuest_paths()), [
+            ([3, 0, 1, 2, 6], 4), ([4, 0, 1, 2, 6], 4), ([3, 0, 1, 5], 3),
+            ([4, 0, 1, 5], 3), ([3, 0, 2, 6], 3), ([4, 0, 2, 6], 3)])
+        self.assertEqual(list(self.G.longuest_paths(1, [4], [6])), [([4, 0, 1, 2, 6], 4)])
+        self.assertEqual(next(self.G.longuest_paths(weights={"b": 0, 6: 10}))[1], 12)
+        self.assertEqual(list(self.G.longuest_paths(sources=[5])), [([5], 0)])
+        self.assertEqual(list(self.G.longuest_paths(sources=[6], sinks=[3])), [])
 
 if __name__ == '__main__':
     unittest.main()